@@ -0,0 +1,295 @@
+"""data/responses 통합 데이터셋 (증분 집계 CLI)
+
+data/responses의 참가자별 요약 CSV와 _trials.parquet를 읽어 data/combined 아래의
+Parquet 데이터셋에 추가한다. 이미 읽은 파일은 manifest(경로, 크기, mtime)에 기록해 두고
+다음 실행 때는 새로 생기거나 바뀐 파일만 프로세스 풀에서 읽는다. 짝이 되는 _trials.parquet의
+크기와 mtime도 함께 기록하므로, CSV만 먼저 읽힌 뒤 parquet가 생기거나 바뀌어도 다시 읽는다.
+
+실행할 때마다 새 part 파일(summary/part-NNNNN.parquet, trials/part-NNNNN.parquet)을 하나씩 쓰고,
+manifest에는 각 원본 파일이 어느 part에 들어 있는지 기록한다. 바뀐 파일은 새 part에 다시 들어가고,
+load_combined()는 manifest가 가리키는 part의 행만 돌려준다 (삭제된 원본의 행도 제외).
+--compact 로 part들을 하나로 합칠 수 있다.
+
+사용법:
+    python aggregate.py                  # 새 파일만 추가
+    python aggregate.py --jobs 8         # 프로세스 8개로 읽기
+    python aggregate.py --compact        # 추가 후 part 파일 합치기
+    python aggregate.py --rebuild        # manifest를 무시하고 처음부터 다시
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from trial_data import summary_to_trials
+
+RESPONSES_DIR = Path("data/responses")
+COMBINED_DIR = Path("data/combined")
+MANIFEST_NAME = "manifest.json"
+
+# 숫자처럼 보여도 문자열로 두는 요약 컬럼 (참가자 ID가 숫자일 수 있음)
+STRING_COLUMNS = {'source_file', 'participant_id', 'date', 'timestamp_start', 'timestamp_end'}
+STRING_SUFFIXES = ('_word', '_cond', '_color', '_resp')
+
+# 새 파일이 이보다 적으면 프로세스 풀 없이 바로 읽음 (풀 시작 비용이 더 큼)
+POOL_MIN_FILES = 32
+# 작업자 하나가 한 번에 받는 파일 수
+CHUNK_SIZE = 64
+
+
+# ========== manifest ==========
+def load_manifest(out_dir):
+    """{'next_part': int, 'files': {파일명: {'size', 'mtime_ns', 'trials', 'part'}}}
+
+    trials는 짝이 되는 _trials.parquet의 [size, mtime_ns] (없으면 None)
+    """
+    path = Path(out_dir) / MANIFEST_NAME
+    if not path.exists():
+        return {'next_part': 0, 'files': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    """임시 파일에 쓴 뒤 교체 (중간에 중단돼도 이전 manifest 유지)"""
+    path = Path(out_dir) / MANIFEST_NAME
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def scan_responses(responses_dir):
+    """요약 CSV 목록 {파일명: (size, mtime_ns, trials)} (os.scandir로 stat 한 번씩)
+
+    trials는 짝이 되는 _trials.parquet의 [size, mtime_ns] (없으면 None)
+    """
+    csv_stats, parquet_stats = {}, {}
+    with os.scandir(responses_dir) as entries:
+        for entry in entries:
+            if not entry.is_file():
+                continue
+            if entry.name.endswith('.csv'):
+                stat = entry.stat()
+                csv_stats[entry.name] = (stat.st_size, stat.st_mtime_ns)
+            elif entry.name.endswith('_trials.parquet'):
+                stat = entry.stat()
+                parquet_stats[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return {name: (size, mtime_ns, parquet_stats.get(f"{name[:-len('.csv')]}_trials.parquet"))
+            for name, (size, mtime_ns) in csv_stats.items()}
+
+
+def plan_ingest(found, manifest):
+    """새 파일 / 바뀐 파일 / 사라진 파일 목록"""
+    known = manifest['files']
+    new, changed = [], []
+    for name, (size, mtime_ns, trials) in found.items():
+        entry = known.get(name)
+        if entry is None:
+            new.append(name)
+        elif entry['size'] != size or entry['mtime_ns'] != mtime_ns or entry.get('trials') != trials:
+            changed.append(name)
+    removed = [name for name in known if name not in found]
+    return sorted(new), sorted(changed), sorted(removed)
+
+
+# ========== 파일 읽기 (작업자 프로세스) ==========
+def parse_file(path):
+    """요약 CSV 하나와 짝이 되는 _trials.parquet를 읽음
+
+    요약 CSV는 한 행이지만 컬럼이 900개가 넘어 pandas/pyarrow CSV 파서의 컬럼별 타입 추론이
+    대부분의 시간을 차지하므로, csv 모듈로 문자열만 읽고 타입 변환은 묶음 단위로 한 번에 한다.
+    _trials.parquet가 없는 이전 데이터는 요약 행의 t{i}_* 컬럼에서 시행 표를 만든다.
+
+    Returns:
+        (요약 행 dict {컬럼: 문자열 또는 None}, trials pyarrow Table)
+    """
+    path = Path(path)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        values = next(reader)
+    row = {'source_file': path.name}
+    row.update((name, value if value != '' else None) for name, value in zip(header, values))
+
+    trials_path = path.with_name(f"{path.stem}_trials.parquet")
+    if trials_path.exists():
+        trials = pq.read_table(trials_path, use_threads=False)
+    else:
+        summary = pd.read_csv(path, encoding='utf-8-sig')
+        trials = pa.Table.from_pandas(summary_to_trials(summary), preserve_index=False)
+    trials = trials.add_column(0, 'source_file', pa.array([path.name] * trials.num_rows, pa.string()))
+    return row, trials
+
+
+def parse_files(paths):
+    """파일 묶음을 읽음 (프로세스 간 전송 횟수 줄이기)"""
+    parsed = [parse_file(p) for p in paths]
+    return [row for row, _ in parsed], [trials for _, trials in parsed]
+
+
+def read_all(paths, jobs):
+    """파일들을 병렬로 읽어 (summary Table, trials Table) 반환"""
+    if len(paths) < POOL_MIN_FILES or jobs <= 1:
+        rows, trials = parse_files(paths)
+    else:
+        chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+        rows, trials = [], []
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for chunk_rows, chunk_trials in pool.map(parse_files, chunks):
+                rows += chunk_rows
+                trials += chunk_trials
+    return summary_table(rows), pa.concat_tables(trials, promote_options='permissive')
+
+
+def summary_table(rows):
+    """요약 행 dict 리스트를 Table로 (컬럼마다 숫자로 변환 가능하면 float64, 아니면 문자열)"""
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    arrays = []
+    for name in columns:
+        strings = pa.array([row.get(name) for row in rows], pa.string())
+        if name in STRING_COLUMNS or name.endswith(STRING_SUFFIXES):
+            arrays.append(strings)
+            continue
+        try:
+            arrays.append(pc.cast(strings, pa.float64()))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            arrays.append(strings)
+    return pa.table(arrays, names=columns)
+
+
+# ========== 통합 데이터셋 ==========
+def _part_path(out_dir, table, part):
+    return Path(out_dir) / table / f"part-{part:05d}.parquet"
+
+
+def _write_part(out_dir, table, part, data):
+    path = _part_path(out_dir, table, part)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    pq.write_table(data, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+def _read_table(out_dir, table, manifest):
+    """manifest가 가리키는 part의 행만 (바뀐/삭제된 원본의 이전 행 제외), pyarrow Table"""
+    current = {name: entry['part'] for name, entry in manifest['files'].items()}
+    tables = []
+    for part in sorted(set(current.values())):
+        path = _part_path(out_dir, table, part)
+        if not path.exists():
+            continue
+        data = pq.read_table(path)
+        names = [name for name, p in current.items() if p == part]
+        keep = pc.is_in(data['source_file'], value_set=pa.array(names, pa.string()))
+        tables.append(data.filter(keep))
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='permissive')
+
+
+def load_combined(out_dir=COMBINED_DIR):
+    """통합 데이터셋 (summary, trials) DataFrame"""
+    manifest = load_manifest(out_dir)
+    tables = [_read_table(out_dir, table, manifest) for table in ('summary', 'trials')]
+    return tuple(pd.DataFrame() if t is None else t.to_pandas() for t in tables)
+
+
+def compact(out_dir, manifest):
+    """모든 part를 하나로 합침 (manifest도 새 part를 가리키도록 갱신)"""
+    old_parts = {entry['part'] for entry in manifest['files'].values()}
+    if len(old_parts) <= 1:
+        return
+    part = manifest['next_part']
+    for table in ('summary', 'trials'):
+        _write_part(out_dir, table, part, _read_table(out_dir, table, manifest))
+    for entry in manifest['files'].values():
+        entry['part'] = part
+    manifest['next_part'] = part + 1
+    save_manifest(out_dir, manifest)
+    for old in old_parts:
+        for table in ('summary', 'trials'):
+            _part_path(out_dir, table, old).unlink(missing_ok=True)
+
+
+def ingest(responses_dir=RESPONSES_DIR, out_dir=COMBINED_DIR, jobs=None, rebuild=False):
+    """새/바뀐 파일만 읽어 통합 데이터셋에 part 하나로 추가
+
+    Args:
+        responses_dir: 참가자별 저장 폴더
+        out_dir: 통합 데이터셋 폴더
+        jobs: 프로세스 수 (None이면 CPU 수)
+        rebuild: True면 기존 데이터셋을 지우고 처음부터
+
+    Returns:
+        dict: scanned, new, changed, removed, summary_rows, trial_rows, seconds
+    """
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+    if rebuild and out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(out_dir)
+    found = scan_responses(responses_dir)
+    new, changed, removed = plan_ingest(found, manifest)
+    to_read = new + changed
+    summary_rows = trial_rows = 0
+
+    if to_read:
+        summary, trials = read_all([str(Path(responses_dir) / name) for name in to_read], jobs or os.cpu_count())
+        part = manifest['next_part']
+        # 데이터 part를 먼저 쓰고 manifest를 나중에 교체 (중단되면 이번 part는 무시됨)
+        _write_part(out_dir, 'summary', part, summary)
+        _write_part(out_dir, 'trials', part, trials)
+        for name in to_read:
+            size, mtime_ns, trials_stat = found[name]
+            manifest['files'][name] = {'size': size, 'mtime_ns': mtime_ns, 'trials': trials_stat, 'part': part}
+        manifest['next_part'] = part + 1
+        summary_rows, trial_rows = summary.num_rows, trials.num_rows
+
+    for name in removed:
+        del manifest['files'][name]
+    if to_read or removed:
+        save_manifest(out_dir, manifest)
+
+    return {
+        'scanned': len(found), 'new': len(new), 'changed': len(changed), 'removed': len(removed),
+        'summary_rows': summary_rows, 'trial_rows': trial_rows,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--responses', default=str(RESPONSES_DIR), help='참가자별 저장 폴더')
+    parser.add_argument('--out', default=str(COMBINED_DIR), help='통합 데이터셋 폴더')
+    parser.add_argument('--jobs', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--compact', action='store_true', help='추가 후 part 파일을 하나로 합침')
+    parser.add_argument('--rebuild', action='store_true', help='manifest를 무시하고 처음부터 다시 만듦')
+    args = parser.parse_args()
+
+    result = ingest(args.responses, args.out, jobs=args.jobs, rebuild=args.rebuild)
+    print(f"scanned {result['scanned']} files: {result['new']} new, {result['changed']} changed, "
+          f"{result['removed']} removed")
+    print(f"appended {result['summary_rows']} participants / {result['trial_rows']} trials "
+          f"in {result['seconds']:.2f}s")
+    if args.compact:
+        started = time.perf_counter()
+        compact(args.out, load_manifest(args.out))
+        print(f"compacted in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
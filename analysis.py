@@ -0,0 +1,227 @@
+"""집단 수준 정서 간섭 효과 분석
+
+시행 단위 데이터(trial_data.load_trial_data() 또는 aggregate.load_combined()의 trials)에서
+참가자별 조건 평균 RT(정답 시행)를 구하고, 간섭 효과(negative - neutral, positive - neutral)의
+집단 평균과 bootstrap 신뢰구간, sign-flip permutation 검정 p값을 계산한다.
+재표집은 Python 반복문 없이 (batch × 참가자) 행렬 연산으로 한다.
+
+사용법:
+    python analysis.py                       # data/combined (없으면 data/responses의 parquet)
+    python analysis.py --resamples 10000 --seed 1
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CONDITIONS = ('positive', 'negative', 'neutral')
+
+# 간섭 효과: 이름 -> (정서 조건, 기준 조건)
+EFFECTS = {
+    'interference_negative': ('negative', 'neutral'),
+    'interference_positive': ('positive', 'neutral'),
+}
+
+N_RESAMPLES = 10000
+# 재표집 한 번에 만드는 행렬 크기 상한 (batch × 참가자 원소 수)
+MAX_BATCH_ELEMENTS = 4_000_000
+
+
+def trial_arrays(trials):
+    """참가자 코드, 조건 코드(CONDITIONS 순서, 그 외 -1), 정답 여부, RT 배열
+
+    Returns:
+        (participants, participant_code, condition_code, correct, rt)
+    """
+    participant_code, participants = pd.factorize(trials['participant_id'])
+    condition = trials['condition']
+    if isinstance(condition.dtype, pd.CategoricalDtype):
+        # category 코드만 CONDITIONS 순서로 다시 매김 ('practice' 등 다른 category는 -1)
+        mapping = np.append(pd.Index(CONDITIONS).get_indexer(condition.cat.categories), -1)
+        condition_code = mapping[condition.cat.codes.to_numpy()].astype(np.intp)
+    else:
+        condition_code = pd.Index(CONDITIONS).get_indexer(condition).astype(np.intp)
+    rt = trials['rt'].to_numpy(dtype=np.float64, na_value=np.nan)
+    correct = (trials['accuracy'].to_numpy(dtype=np.float64, na_value=0) == 1) & ~np.isnan(rt)
+    return participants, participant_code, condition_code, correct, rt
+
+
+def condition_means(trials, mask=None):
+    """참가자 × 조건 평균 RT (정답 시행만, summary의 rt_{condition}_mean과 같은 정의)
+
+    Args:
+        trials: 시행 단위 DataFrame (participant_id, condition, accuracy, rt)
+        mask: trials와 같은 길이의 bool 배열, True인 시행만 사용 (예: trimming 결과)
+
+    Returns:
+        (participants, means, counts) - means/counts는 (참가자 수, 3) 배열, 시행이 없으면 nan
+    """
+    if 'phase' in trials.columns:
+        experimental = (trials['phase'] == 'experimental').to_numpy()
+        trials = trials[experimental]
+        if mask is not None:
+            mask = np.asarray(mask)[experimental]
+    participants, participant_code, condition_code, correct, rt = trial_arrays(trials)
+    use = correct & (condition_code >= 0)
+    if mask is not None:
+        use &= np.asarray(mask, dtype=bool)
+    k = len(CONDITIONS)
+    key = participant_code[use] * k + condition_code[use]
+    size = len(participants) * k
+    counts = np.bincount(key, minlength=size).reshape(-1, k)
+    sums = np.bincount(key, weights=rt[use], minlength=size).reshape(-1, k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    return participants, means, counts
+
+
+def interference_scores(trials, mask=None):
+    """참가자별 간섭 점수 DataFrame (index: participant_id, columns: EFFECTS)
+
+    Args:
+        trials: 시행 단위 DataFrame
+        mask: 사용할 시행만 True인 bool 배열 (condition_means 참고)
+    """
+    participants, means, _ = condition_means(trials, mask)
+    index = {name: i for i, name in enumerate(CONDITIONS)}
+    scores = {effect: means[:, index[emotional]] - means[:, index[baseline]]
+              for effect, (emotional, baseline) in EFFECTS.items()}
+    return pd.DataFrame(scores, index=pd.Index(participants, name='participant_id'))
+
+
+def _batches(n_resamples, n):
+    batch = max(1, min(n_resamples, MAX_BATCH_ELEMENTS // max(n, 1)))
+    for start in range(0, n_resamples, batch):
+        yield min(batch, n_resamples - start)
+
+
+def bootstrap_means(values, n_resamples=N_RESAMPLES, rng=None):
+    """평균의 bootstrap 분포 (복원추출, batch 행렬 연산)
+
+    Args:
+        values: 1차원 배열 (참가자별 점수)
+        n_resamples: 재표집 횟수
+        rng: np.random.Generator
+
+    Returns:
+        길이 n_resamples 배열
+    """
+    rng = rng or np.random.default_rng()
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    out = []
+    for size in _batches(n_resamples, n):
+        idx = rng.integers(0, n, size=(size, n), dtype=np.int32)
+        out.append(values[idx].mean(axis=1))
+    return np.concatenate(out)
+
+
+def permutation_p(values, n_resamples=N_RESAMPLES, rng=None):
+    """평균 = 0 검정의 양측 sign-flip permutation p값 (대응 차이 점수용)"""
+    rng = rng or np.random.default_rng()
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    observed = abs(values.mean())
+    exceed = 0
+    for size in _batches(n_resamples, n):
+        signs = rng.integers(0, 2, size=(size, n)).astype(np.float64) * 2 - 1
+        exceed += int(np.count_nonzero(np.abs(signs @ values) / n >= observed - 1e-12))
+    return (exceed + 1) / (n_resamples + 1)
+
+
+def summarize_scores(scores, n_resamples=N_RESAMPLES, ci=0.95, rng=None):
+    """참가자별 점수 컬럼마다 집단 평균, bootstrap 신뢰구간, permutation p값
+
+    Args:
+        scores: 참가자별 점수 DataFrame (컬럼마다 따로 요약, nan인 참가자는 제외)
+        n_resamples: bootstrap/permutation 재표집 횟수
+        ci: 신뢰수준
+        rng: np.random.Generator
+
+    Returns:
+        pd.DataFrame (index: scores의 컬럼) - n, mean, sd, dz, ci_low, ci_high, p_perm
+    """
+    rng = rng or np.random.default_rng()
+    alpha = (1 - ci) / 2
+    rows = {}
+    for column in scores.columns:
+        values = scores[column].dropna().to_numpy()
+        n = len(values)
+        if n < 2:
+            rows[column] = {'n': n, 'mean': values.mean() if n else np.nan, 'sd': np.nan, 'dz': np.nan,
+                            'ci_low': np.nan, 'ci_high': np.nan, 'p_perm': np.nan}
+            continue
+        boot = bootstrap_means(values, n_resamples, rng)
+        sd = values.std(ddof=1)
+        rows[column] = {
+            'n': n,
+            'mean': values.mean(),
+            'sd': sd,
+            'dz': values.mean() / sd if sd > 0 else np.nan,
+            'ci_low': np.quantile(boot, alpha),
+            'ci_high': np.quantile(boot, 1 - alpha),
+            'p_perm': permutation_p(values, n_resamples, rng),
+        }
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def group_interference(trials, n_resamples=N_RESAMPLES, ci=0.95, seed=None, mask=None):
+    """간섭 효과의 집단 평균, bootstrap 신뢰구간, permutation p값
+
+    두 조건 모두 정답 시행이 있는 참가자만 사용한다.
+
+    Args:
+        trials: 시행 단위 DataFrame
+        n_resamples: bootstrap/permutation 재표집 횟수
+        ci: 신뢰수준
+        seed: 난수 시드
+        mask: 사용할 시행만 True인 bool 배열 (예: trimming.trim_trials(trials) == 'kept')
+
+    Returns:
+        pd.DataFrame (index: effect) - n, mean, sd, dz, ci_low, ci_high, p_perm (RT 단위는 초)
+    """
+    scores = interference_scores(trials, mask)
+    return summarize_scores(scores, n_resamples, ci, np.random.default_rng(seed))
+
+
+def format_ms(result):
+    """summarize_scores 결과를 보기 쉽게 ms 단위로 (출력용)"""
+    shown = result.copy()
+    for column in ('mean', 'sd', 'ci_low', 'ci_high'):
+        shown[column] = shown[column] * 1000
+    return (shown.round({'mean': 1, 'sd': 1, 'ci_low': 1, 'ci_high': 1, 'dz': 3, 'p_perm': 4})
+            .rename(columns={'mean': 'mean(ms)', 'sd': 'sd(ms)', 'ci_low': 'ci_low(ms)', 'ci_high': 'ci_high(ms)'}))
+
+
+def load_trials(combined_dir="data/combined", responses_dir="data/responses"):
+    """통합 데이터셋(aggregate.py)이 있으면 그 trials, 없으면 참가자별 _trials.parquet"""
+    if (Path(combined_dir) / "manifest.json").exists():
+        from aggregate import load_combined
+        return load_combined(combined_dir)[1]
+    from trial_data import load_trial_data
+    return load_trial_data(responses_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--combined', default='data/combined', help='aggregate.py 통합 데이터셋 폴더')
+    parser.add_argument('--responses', default='data/responses', help='참가자별 저장 폴더')
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES)
+    parser.add_argument('--ci', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trim', action='store_true', help='trimming.py 기본 기준으로 시행 제외 후 분석')
+    args = parser.parse_args()
+
+    trials = load_trials(args.combined, args.responses)
+    mask = None
+    if args.trim:
+        from trimming import trim_trials
+        mask = (trim_trials(trials) == 'kept').to_numpy()
+    result = group_interference(trials, n_resamples=args.resamples, ci=args.ci, seed=args.seed, mask=mask)
+    print(f"participants: {trials['participant_id'].nunique()}, trials: {len(trials)}")
+    print(format_ms(result))
+
+
+if __name__ == '__main__':
+    main()
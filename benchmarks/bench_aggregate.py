@@ -0,0 +1,55 @@
+"""증분 집계(aggregate.py) 벤치마크
+
+참가자 N명 분량의 저장 파일로 통합 데이터셋을 처음 만든 뒤, 하루치 신규 참가자(기본 50명)를
+추가하고 다시 실행했을 때 걸리는 시간을 잰다. 비교용으로 전체를 다시 읽는 시간도 출력한다.
+
+사용법:
+    python benchmarks/bench_aggregate.py --participants 5000 --new 50 --jobs 4
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import aggregate  # noqa: E402
+from bench_trial_load import write_files  # noqa: E402
+
+
+def report(label, result):
+    print(f"{label:22s} {result['seconds']:8.2f}s  new={result['new']:5d} changed={result['changed']} "
+          f"removed={result['removed']} participants+={result['summary_rows']} trials+={result['trial_rows']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=2000, help='기존 참가자 수')
+    parser.add_argument('--new', type=int, default=50, help='다시 실행하기 전에 추가할 참가자 수')
+    parser.add_argument('--jobs', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp())
+    responses, combined = root / 'responses', root / 'combined'
+    responses.mkdir()
+
+    started = time.perf_counter()
+    write_files(responses, args.participants)
+    print(f"wrote {args.participants} participants in {time.perf_counter() - started:.1f}s")
+
+    report('initial ingest', aggregate.ingest(responses, combined, jobs=args.jobs))
+    report('no-op re-run', aggregate.ingest(responses, combined, jobs=args.jobs))
+    write_files(responses, args.new, start=args.participants)
+    report(f'+{args.new} participants', aggregate.ingest(responses, combined, jobs=args.jobs))
+    report('full rebuild', aggregate.ingest(responses, combined, jobs=args.jobs, rebuild=True))
+
+    started = time.perf_counter()
+    summary, trials = aggregate.load_combined(combined)
+    print(f"load_combined: {len(summary)} participants, {len(trials)} trials "
+          f"in {time.perf_counter() - started:.2f}s")
+    assert len(summary) == args.participants + args.new
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,340 @@
+"""동시 참가자 부하 테스트 (Streamlit AppTest 기반, 브라우저 없음)
+
+stroop_streamlit_full.py를 참가자마다 AppTest 세션 하나로 띄우고, N명이 동시에 전체 과제를 진행하게 한다.
+
+- 안내 화면 / 블록 안내 / 연습 재시도: N 키 버튼 클릭 (읽는 시간만큼 기다린 뒤)
+- 연습 시행: 🔴/🟢 버튼을 ex-Gaussian RT 뒤에 클릭, RT가 최대 응답 시간을 넘으면 event_bridge가 보낼
+  timeout 값을 session_state로 넣음
+- 본 시행 블록 / 휴식: 브라우저 컴포넌트(block_runner, break_timer)가 보낼 값을 블록 진행 시간
+  (fixation + RT + ITI 합)만큼 기다린 뒤 session_state로 넣음
+
+동시 참가자 수 단계마다 rerun 처리량, rerun 지연(클릭 → 화면 갱신 완료, AppTest 요소 트리 변환 포함)
+p50/p95/p99, 세션당 CPU 시간과 RSS 증가량을 잰다. 먼저 참가자 1명 단계(기준선)를 재고,
+p95가 기준(기본 50ms)을 넘는 첫 단계와 기준선 p95보다 기준만큼 더 늘어난 첫 단계를 함께 보고한다
+(CPU가 적은 환경에서는 1명일 때부터 50ms를 넘을 수 있으므로 동시성 때문에 늘어난 지연은 후자로 본다).
+실제 시간은 --time-scale 배로 압축한다 (기본 0.05 → 20배 빠르게, 블록 1개 약 4초).
+
+저장 파일과 outbox는 임시 폴더에 쓰고, 백업은 가짜 시트(STROOP_SHEETS_BACKEND=fake)로 보낸다.
+
+AppTest 세션 여러 개를 한 프로세스에서 동시에 돌리려고 streamlit 내부(Runtime.instance, ScriptCache)를
+바꿔 끼우므로, 확인한 streamlit 버전(TESTED_STREAMLIT)이 아니면 바로 멈춘다.
+
+사용법:
+    python benchmarks/bench_concurrent_sessions.py --levels 1 5 10 20 40 80
+    python benchmarks/bench_concurrent_sessions.py --mode pilot --levels 1 10 --time-scale 0.02
+"""
+import argparse
+import os
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import streamlit
+
+# 앱 스크립트가 outbox/sheets_backup을 처음 import하기 전에 설정 (실제 시트로 보내지 않음)
+os.environ['STROOP_SHEETS_BACKEND'] = 'fake'
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from streamlit import logger as streamlit_logger  # noqa: E402
+from streamlit.runtime import Runtime  # noqa: E402
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache  # noqa: E402
+from streamlit.testing.v1 import AppTest, app_test, local_script_runner  # noqa: E402
+
+from simulate import (FIXATION_DURATION, MAX_RESPONSE_TIME, PRACTICE_FEEDBACK, RT_MU, RT_SIGMA,  # noqa: E402
+                      RT_TAU)
+
+APP_PATH = ROOT / "stroop_streamlit_full.py"
+TRIALS_PER_BLOCK = {'pilot': 15, 'full': 36}   # stroop_streamlit_full.py와 같은 값
+READING_TIME = (2.0, 5.0)      # 안내 화면 한 장 읽는 시간 (초, 균등분포)
+BREAK_TIME = (30.0, 60.0)      # 휴식 시간 (초)
+ERROR_RATE = 0.05
+# N 키로 누르는 안내 화면 버튼 key 접두어
+N_KEY_BUTTONS = ('instruction_btn_', 'exp_instruction_btn_', 'redo_practice_')
+LATENCY_LIMIT_MS = 50.0
+# _share_server_state()가 바꿔 끼우는 내부 구조를 확인한 streamlit 버전 (major, minor)
+TESTED_STREAMLIT = {(1, 66)}
+
+
+def _rss_bytes():
+    """현재 프로세스 RSS (Linux /proc, 없으면 최대 RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _share_server_state(allow_untested=False):
+    """AppTest 세션들이 실제 서버처럼 Runtime과 ScriptCache를 하나씩 같이 쓰게 함
+
+    AppTest.run()은 끝날 때 전역 Runtime._instance를 None으로 되돌리므로, 다른 스레드에서 돌던 세션의
+    스크립트가 'Runtime hasn't been created!'로 중간에 끊긴다. 마지막으로 만들어진 mock Runtime을
+    계속 돌려주게 바꾼다. 또 run()마다 새 ScriptCache로 스크립트를 다시 컴파일하는데(동시에 하면
+    ast.parse가 깨짐), 서버는 컴파일 결과를 모든 세션이 공유하므로 캐시 하나를 쓰게 한다.
+    """
+    _check_streamlit_internals(allow_untested)
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last['runtime'] = cls._instance
+        elif 'runtime' not in last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return cls._instance or last['runtime']
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in last)
+
+
+def _check_streamlit_internals(allow_untested=False):
+    """바꿔 끼울 내부 구조가 확인한 버전과 같은지 (다르면 RuntimeError)"""
+    version = tuple(int(part) for part in streamlit.__version__.split('.')[:2])
+    if version not in TESTED_STREAMLIT and not allow_untested:
+        tested = ', '.join(f"{major}.{minor}" for major, minor in sorted(TESTED_STREAMLIT))
+        raise RuntimeError(f"streamlit {streamlit.__version__}에서 확인하지 않은 부하 테스트입니다 (확인한 버전: {tested}). "
+                           "내부 구조가 같은지 확인한 뒤 --allow-untested-streamlit 으로 실행하세요.")
+    missing = [name for name, ok in (
+        ('Runtime._instance', hasattr(Runtime, '_instance')),
+        ('Runtime.instance', hasattr(Runtime, 'instance')),
+        ('Runtime.exists', hasattr(Runtime, 'exists')),
+        ('app_test.ScriptCache', hasattr(app_test, 'ScriptCache')),
+        ('local_script_runner.ScriptCache', hasattr(local_script_runner, 'ScriptCache')),
+    ) if not ok]
+    if missing:
+        raise RuntimeError(f"streamlit {streamlit.__version__}에 부하 테스트가 바꿔 끼우는 내부 구조가 없습니다: "
+                           f"{', '.join(missing)}")
+
+
+class Participant:
+    """AppTest 세션 하나로 과제 전체를 진행하는 가상 참가자"""
+
+    def __init__(self, index, mode, time_scale, latencies, seed, app_path=APP_PATH):
+        self.participant_id = f"LOAD{index:04d}"
+        self.mode = mode
+        self.time_scale = time_scale
+        self.latencies = latencies
+        self.rng = np.random.default_rng(seed)
+        self.at = AppTest.from_file(str(app_path), default_timeout=120)
+        self.at.query_params['mode'] = mode
+        self.error = None
+
+    def wait(self, seconds):
+        time.sleep(seconds * self.time_scale)
+
+    def rerun(self):
+        started = time.perf_counter()
+        self.at.run()
+        self.latencies.append(time.perf_counter() - started)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def rt(self):
+        """ex-Gaussian RT (초)"""
+        return self.rng.normal(RT_MU, RT_SIGMA) + self.rng.exponential(RT_TAU)
+
+    def click(self, key, seconds=0.0):
+        self.wait(seconds)
+        self.at.button(key=key).click()
+        self.rerun()
+
+    def block_payload(self, state):
+        """block_runner 컴포넌트가 블록 끝에 보낼 값과 블록 진행 시간"""
+        per_block = TRIALS_PER_BLOCK[self.mode]
+        first = state['trial_num']
+        last = min((first // per_block + 1) * per_block, len(state['exp_trials']))
+        onset = time.time() * 1000
+        responses, duration = [], 0.0
+        for i, trial in enumerate(state['exp_trials'].records(first, last)):
+            rt = self.rt()
+            if rt >= MAX_RESPONSE_TIME:
+                response, rt_ms = 'timeout', None
+            else:
+                correct = self.rng.random() >= ERROR_RATE
+                response = trial['letterColor'] if correct else ('green' if trial['letterColor'] == 'red' else 'red')
+                rt_ms = rt * 1000
+            responses.append({'trial_index': first + i, 'response': response, 'rt_ms': rt_ms,
+                              'onset_epoch_ms': onset + (duration + FIXATION_DURATION) * 1000,
+                              'iti_actual_ms': trial['iti'] * 1000 + 1.0})
+            duration += FIXATION_DURATION + min(rt, MAX_RESPONSE_TIME) + trial['iti']
+        return {'block': first // per_block + 1, 'first_trial': first, 'responses': responses}, duration
+
+    def step(self):
+        """현재 화면에 맞는 행동 하나 (끝나면 False)"""
+        at = self.at
+        state = at.session_state
+        keys = [b.key for b in at.button]
+        if not state['task_started']:
+            self.wait(self.rng.uniform(*READING_TIME))
+            at.text_input[0].input(self.participant_id)
+            at.button[0].click()
+            self.rerun()
+        elif any(k and k.startswith('practice_red_') for k in keys):
+            n = state['practice_trial_num']
+            trial = state['practice_trials'][n]
+            # 첫 시행은 fixation, 이후는 피드백 뒤에 자극이 나타남
+            delay = FIXATION_DURATION if n == 0 else PRACTICE_FEEDBACK + 0.3
+            rt = self.rt()
+            if rt >= MAX_RESPONSE_TIME:
+                self.wait(delay + MAX_RESPONSE_TIME)
+                state['event_bridge'] = {'screen': f"practice_{state['practice_attempt']}_{n}", 'kind': 'trial',
+                                         'seq': n + 1, 'busy_ms': 0, 'response': 'timeout', 'rt_ms': None}
+                self.rerun()
+            else:
+                color = trial['letterColor']
+                if self.rng.random() < ERROR_RATE:
+                    color = 'green' if color == 'red' else 'red'
+                self.click(f'practice_{color}_{n}', delay + rt)
+        elif 'practice_complete_btn' in keys or 'auto_complete_btn' in keys:
+            self.click('practice_complete_btn' if 'practice_complete_btn' in keys else 'auto_complete_btn',
+                       PRACTICE_FEEDBACK)
+        elif 'start_block_after_break' in keys:
+            self.click('start_block_after_break', self.rng.uniform(0.5, 2.0))
+        elif any(k and k.startswith(N_KEY_BUTTONS) for k in keys):
+            key = next(k for k in keys if k and k.startswith(N_KEY_BUTTONS))
+            self.click(key, self.rng.uniform(*READING_TIME))
+        elif state['task_completed']:
+            return False
+        elif state['showing_break']:
+            duration = self.rng.uniform(*BREAK_TIME)
+            self.wait(duration)
+            block = state['trial_num'] // TRIALS_PER_BLOCK[self.mode]
+            state[f'break_timer_{block}'] = {'block': block, 'duration_sec': duration, 'ended_by': 'key'}
+            self.rerun()
+        else:
+            payload, duration = self.block_payload(state)
+            self.wait(duration)
+            state[f"block_runner_{payload['block']}"] = payload
+            self.rerun()
+        return True
+
+    def run(self, start_delay=0.0):
+        try:
+            time.sleep(start_delay)
+            self.rerun()
+            while self.step():
+                pass
+        except Exception as e:  # 실패한 세션도 결과에 포함
+            self.error = f"{type(e).__name__}: {e}"
+
+
+def run_level(n, mode, time_scale, ramp, seed):
+    """동시 참가자 n명 한 단계"""
+    latencies = []
+    rss_before = _rss_bytes()
+    participants = [Participant(i, mode, time_scale, latencies, seed + i) for i in range(n)]
+    peak = [_rss_bytes()]
+    done = threading.Event()
+
+    def sample_rss():
+        while not done.wait(0.2):
+            peak[0] = max(peak[0], _rss_bytes())
+
+    monitor = threading.Thread(target=sample_rss, daemon=True)
+    monitor.start()
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=p.run, args=(ramp * i / max(n, 1),)) for i, p in enumerate(participants)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_before
+    done.set()
+    monitor.join()
+
+    ms = sorted(x * 1000 for x in latencies)
+
+    def percentile(q):
+        return ms[min(len(ms) - 1, int(q * len(ms)))] if ms else float('nan')
+
+    return {
+        'n': n,
+        'reruns': len(ms),
+        'reruns_per_sec': len(ms) / wall,
+        'p50_ms': statistics.median(ms) if ms else float('nan'),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'cpu_sec_per_session': cpu / n,
+        'cpu_util': cpu / wall,
+        'rss_mb_per_session': (peak[0] - rss_before) / n / 2 ** 20,
+        'completed': sum(p.error is None and bool(p.at.session_state['task_completed']) for p in participants),
+        'errors': [p.error for p in participants if p.error],
+        'wall_sec': wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 5, 10, 20, 40, 80], help='동시 참가자 수 단계')
+    parser.add_argument('--mode', choices=['full', 'pilot'], default='full')
+    parser.add_argument('--time-scale', type=float, default=0.05, help='대기 시간 배율 (1 = 실제 시간)')
+    parser.add_argument('--ramp', type=float, default=0.0, help='참가자 시작을 이 시간(초)에 걸쳐 분산 (0 = 동시)')
+    parser.add_argument('--limit-ms', type=float, default=LATENCY_LIMIT_MS, help='p95 지연 기준 (ms)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allow-untested-streamlit', action='store_true',
+                        help='TESTED_STREAMLIT 밖의 streamlit 버전에서도 실행 (내부 구조 검사는 유지)')
+    args = parser.parse_args()
+    _share_server_state(args.allow_untested_streamlit)
+    levels = args.levels if args.levels[0] == 1 else [1] + args.levels
+
+    work_dir = Path(tempfile.mkdtemp(prefix='stroop_load_'))
+    os.chdir(work_dir)   # data/responses, data/outbox를 임시 폴더에
+    print(f"mode={args.mode}, time_scale={args.time_scale}, ramp={args.ramp}s, cpus={os.cpu_count()}")
+    print(f"{'N':>4} {'reruns':>7} {'rerun/s':>8} {'p50(ms)':>8} {'p95(ms)':>8} {'p99(ms)':>8} "
+          f"{'CPU s/sess':>10} {'CPU%':>5} {'RSS MB/sess':>11} {'done':>5} {'wall(s)':>8}")
+    # 첫 실행의 모듈 import / 자극 로드 비용은 측정에서 제외
+    AppTest.from_file(str(APP_PATH), default_timeout=120).run()
+    # components.html 사용 중단 안내 등 세션마다 반복되는 로그 숨김 (앱이 만든 logger까지 적용되도록 첫 실행 뒤에)
+    streamlit_logger.set_log_level('error')
+    # 기준선: 참가자 1명일 때의 p95 (levels에 1이 없어도 먼저 잼)
+    baseline = degraded = added = None
+    try:
+        for n in levels:
+            r = run_level(n, args.mode, args.time_scale, args.ramp, args.seed)
+            print(f"{r['n']:4d} {r['reruns']:7d} {r['reruns_per_sec']:8.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+                  f"{r['p99_ms']:8.1f} {r['cpu_sec_per_session']:10.2f} {r['cpu_util'] * 100:5.0f} "
+                  f"{r['rss_mb_per_session']:11.2f} {r['completed']:5d} {r['wall_sec']:8.1f}", flush=True)
+            for error in r['errors'][:3]:
+                print(f"     error: {error}")
+            if baseline is None:
+                baseline = r['p95_ms']
+            if degraded is None and r['p95_ms'] > args.limit_ms:
+                degraded = n
+            if added is None and r['p95_ms'] > baseline + args.limit_ms:
+                added = n
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"single-session baseline p95: {baseline:.1f} ms")
+    if degraded is None:
+        print(f"p95 stayed under {args.limit_ms:g} ms up to {levels[-1]} concurrent participants")
+    elif degraded == 1:
+        print(f"p95 exceeded {args.limit_ms:g} ms already with 1 participant (per-rerun cost, not concurrency)")
+    else:
+        print(f"p95 exceeded {args.limit_ms:g} ms at {degraded} concurrent participants")
+    if added is None:
+        print(f"p95 stayed within baseline + {args.limit_ms:g} ms up to {levels[-1]} concurrent participants")
+    else:
+        print(f"p95 exceeded baseline + {args.limit_ms:g} ms ({baseline + args.limit_ms:.1f} ms) "
+              f"at {added} concurrent participants")
+
+
+if __name__ == '__main__':
+    main()
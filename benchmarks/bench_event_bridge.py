@@ -0,0 +1,195 @@
+"""연습 시행의 브라우저 메인 스레드 시간: 시행마다 새 components.html iframe (before) vs event_bridge (after)
+
+실제 브라우저(Playwright + headless Chromium)로 앱을 띄워 안내 화면과 연습 시행을 키보드로 진행하고,
+연습 시행마다 (자극 화면이 나타난 때부터 다음 시행 화면이 나타날 때까지)
+- 새로 만들어진 iframe 수
+- long task 시간 합 (PerformanceObserver 'longtask')
+- CDP Performance.getMetrics의 ScriptDuration / TaskDuration 증가량
+을 잰다. before는 --baseline-rev 커밋의 앱을 git archive로 임시 폴더에 풀어서, after는 현재 작업 트리를
+복사해서 각각 `streamlit run`으로 띄운다 (백업은 가짜 시트).
+
+필요: pip install playwright && playwright install chromium
+
+사용법:
+    python benchmarks/bench_event_bridge.py --baseline-rev <event_bridge 이전 커밋>
+    python benchmarks/bench_event_bridge.py --baseline-rev <event_bridge 이전 커밋> --headed
+"""
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.request
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_NAME = "stroop_streamlit_full.py"
+RESPONSE_WAIT_MS = 600          # 자극이 나타난 뒤 키를 누르기까지 (자극 지연 + RT 흉내)
+INSTRUCTION_WAIT_MS = 2300      # 안내 화면 N 키 활성화(2초) 대기
+
+# 페이지가 만들어질 때마다 (iframe 안 포함) 주입: long task와 iframe 생성 수 기록
+INIT_SCRIPT = """
+(() => {
+    if (window !== window.top) return;
+    window.__bench = {longTaskMs: 0, iframes: 0};
+    try {
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) window.__bench.longTaskMs += entry.duration;
+        }).observe({type: 'longtask', buffered: true});
+    } catch (e) {}
+    const watch = () => new MutationObserver(records => {
+        for (const record of records) {
+            for (const node of record.addedNodes) {
+                if (node.nodeType !== 1) continue;
+                if (node.tagName === 'IFRAME') window.__bench.iframes += 1;
+                window.__bench.iframes += node.querySelectorAll ? node.querySelectorAll('iframe').length : 0;
+            }
+        }
+    }).observe(document.documentElement, {childList: true, subtree: true});
+    if (document.documentElement) watch(); else document.addEventListener('DOMContentLoaded', watch);
+})();
+"""
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def export_revision(rev, dest):
+    """git archive로 rev의 트리를 dest에 풀기"""
+    data = subprocess.run(['git', 'archive', '--format=tar', rev], cwd=ROOT, check=True,
+                          capture_output=True).stdout
+    with tarfile.open(fileobj=BytesIO(data)) as tar:
+        tar.extractall(dest)
+
+
+def copy_worktree(dest):
+    shutil.copytree(ROOT, dest, dirs_exist_ok=True,
+                    ignore=shutil.ignore_patterns('.git', 'data', '__pycache__', '*.pyc'))
+
+
+def start_app(app_dir, port):
+    env = dict(os.environ, STROOP_SHEETS_BACKEND='fake')
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_NAME, '--server.headless', 'true',
+         '--server.port', str(port), '--browser.gatherUsageStats', 'false'],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.3)
+    proc.kill()
+    raise RuntimeError(f"streamlit did not start in {app_dir}")
+
+
+def _snapshot(page, cdp):
+    metrics = {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+    bench = page.evaluate("window.__bench")
+    return {
+        'iframes': bench['iframes'],
+        'long_task_ms': bench['longTaskMs'],
+        'script_ms': metrics.get('ScriptDuration', 0.0) * 1000,
+        'task_ms': metrics.get('TaskDuration', 0.0) * 1000,
+    }
+
+
+def _stimulus_key(page):
+    """화면에 보이는 자극 글자 색에 맞는 키 (빨강 F, 초록 J)"""
+    color = page.locator('h1').last.evaluate("e => getComputedStyle(e).color")
+    return 'f' if color.startswith('rgb(255, 0, 0') else 'j'
+
+
+def run_practice(page, cdp, url):
+    """안내 화면 → 연습 시행 끝까지 진행하고 시행별 측정값 리스트 반환"""
+    page.goto(url)
+    page.get_by_placeholder("예: P001").fill("BENCH")
+    page.get_by_role("button", name="과제 시작").click()
+    page.wait_for_selector('.st-key-instruction_btn_0', state='attached')
+    for i in range(3):
+        page.wait_for_selector(f'.st-key-instruction_btn_{i}', state='attached')
+        page.wait_for_timeout(INSTRUCTION_WAIT_MS)
+        page.keyboard.press('n')
+
+    trials = []
+    n = 0
+    while True:
+        page.wait_for_selector(f'.st-key-practice_red_{n}', state='attached', timeout=15000)
+        before = _snapshot(page, cdp)
+        page.wait_for_timeout(RESPONSE_WAIT_MS + (500 if n == 0 else 1300))
+        page.keyboard.press(_stimulus_key(page))
+        page.wait_for_selector(
+            f'.st-key-practice_red_{n + 1}, .st-key-practice_complete_btn, .st-key-auto_complete_btn',
+            state='attached', timeout=15000)
+        after = _snapshot(page, cdp)
+        trials.append({name: after[name] - before[name] for name in before})
+        n += 1
+        if page.locator('.st-key-practice_complete_btn, .st-key-auto_complete_btn').count():
+            return trials
+
+
+def measure(app_dir, headed):
+    from playwright.sync_api import sync_playwright
+
+    port = _free_port()
+    proc = start_app(app_dir, port)
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=not headed)
+            page = browser.new_page(viewport={'width': 1280, 'height': 800})
+            page.add_init_script(INIT_SCRIPT)
+            cdp = page.context.new_cdp_session(page)
+            cdp.send('Performance.enable')
+            trials = run_practice(page, cdp, f"http://127.0.0.1:{port}/?mode=pilot")
+            browser.close()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return trials
+
+
+def _summary(values):
+    values = sorted(values)
+    p95 = values[min(len(values) - 1, int(0.95 * len(values)))]
+    return f"{statistics.mean(values):8.1f} {p95:8.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--baseline-rev', required=True, help='before로 쓸 커밋 (event_bridge 도입 이전)')
+    parser.add_argument('--headed', action='store_true', help='브라우저 창을 띄워서 실행')
+    args = parser.parse_args()
+
+    try:
+        import playwright  # noqa: F401
+    except ImportError:
+        sys.exit("playwright가 필요합니다: pip install playwright && playwright install chromium")
+
+    work_dir = Path(tempfile.mkdtemp(prefix='stroop_bridge_'))
+    try:
+        export_revision(args.baseline_rev, work_dir / 'before')
+        copy_worktree(work_dir / 'after')
+        results = {name: measure(work_dir / name, args.headed) for name in ('before', 'after')}
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"per practice trial (mean / p95), baseline={args.baseline_rev}")
+    print(f"{'':8} {'trials':>6} {'iframes':>8} {'long task ms':>17} {'script ms':>17} {'task ms':>17}")
+    for name, trials in results.items():
+        print(f"{name:8} {len(trials):6d} {statistics.mean(t['iframes'] for t in trials):8.1f} "
+              f"{_summary([t['long_task_ms'] for t in trials])} {_summary([t['script_ms'] for t in trials])} "
+              f"{_summary([t['task_ms'] for t in trials])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""ex-Gaussian 추정(exgauss.fit_exgauss) 벤치마크
+
+가상 참가자 N명 × 144시행(조건별 ex-Gaussian RT)으로
+- batch: 모든 참가자 × 조건 칸을 한 번에 추정하는 시간
+- per-cell: 같은 알고리즘을 칸 하나씩 호출하는 시간 (일부 칸으로 측정해 전체로 환산)
+을 비교하고, 추정치가 시뮬레이션 참값을 얼마나 복원하는지 확인한다.
+
+사용법:
+    python benchmarks/bench_exgauss.py --participants 5000
+"""
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analysis import CONDITIONS  # noqa: E402
+from exgauss import PARAMETERS, fit_exgauss, fit_rows, log_norm_cdf, parameter_effects  # noqa: E402
+from reliability import pack_trials  # noqa: E402
+
+
+def make_trials(participants, trials_per_condition=48, seed=0):
+    """조건별 ex-Gaussian RT 가상 시행 데이터 (negative 조건은 tau가 20ms 김)
+
+    Returns:
+        (trials DataFrame, 참값 (참가자 수, 3조건, 3모수) 배열)
+    """
+    rng = np.random.default_rng(seed)
+    k = len(CONDITIONS)
+    truth = np.empty((participants, k, 3))
+    truth[:, :, 0] = rng.normal(0.50, 0.05, (participants, 1)) + rng.normal(0, 0.01, (participants, k))
+    truth[:, :, 1] = rng.uniform(0.03, 0.07, (participants, k))
+    truth[:, :, 2] = (rng.uniform(0.08, 0.16, (participants, 1)) + np.array([0.005, 0.02, 0.0])
+                      + rng.normal(0, 0.01, (participants, k)))
+    truth[:, :, 2] = np.maximum(truth[:, :, 2], 0.02)
+
+    participant = np.repeat(np.arange(participants), k * trials_per_condition)
+    condition = np.tile(np.repeat(np.arange(k), trials_per_condition), participants)
+    mu, sigma, tau = (truth[participant, condition, i] for i in range(3))
+    rt = rng.normal(mu, sigma) + rng.exponential(tau)
+    trials = pd.DataFrame({
+        'participant_id': pd.Series(np.char.add('P', participant.astype(str))),
+        'phase': pd.Categorical(['experimental'] * len(participant), categories=['practice', 'experimental']),
+        'condition': pd.Categorical.from_codes(condition, categories=list(CONDITIONS) + ['practice']),
+        'accuracy': (rng.random(len(participant)) < 0.95).astype(np.int8),
+        'rt': rt,
+    })
+    return trials, truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=5000)
+    parser.add_argument('--per-cell-sample', type=int, default=200, help='per-cell 방식으로 잴 칸 수')
+    args = parser.parse_args()
+
+    # log Phi 근사 정확도 (math.erfc와 비교)
+    grid = np.linspace(-8, 8, 2001)
+    exact = np.log([0.5 * math.erfc(-u / math.sqrt(2)) for u in grid])
+    error = np.max(np.abs(log_norm_cdf(grid) - exact) / np.maximum(np.abs(exact), 1e-12))
+    print(f"log_norm_cdf max relative error on [-8, 8]: {error:.1e}")
+
+    trials, truth = make_trials(args.participants)
+    started = time.perf_counter()
+    fits = fit_exgauss(trials)
+    batch_seconds = time.perf_counter() - started
+    cells = len(fits)
+
+    # 같은 알고리즘을 칸 하나씩 (참가자 한 명씩 fit하던 방식)
+    _, packed, _ = pack_trials(trials)
+    rows = packed.reshape(cells, -1).astype(np.float64)[:args.per_cell_sample]
+    weights = ~np.isnan(rows)
+    rows[~weights] = 0.0
+    started = time.perf_counter()
+    for i in range(len(rows)):
+        fit_rows(rows[i:i + 1], weights[i:i + 1])
+    per_cell_seconds = (time.perf_counter() - started) / len(rows) * cells
+
+    estimates = fits[list(PARAMETERS)].to_numpy().reshape(args.participants, len(CONDITIONS), 3)
+    print(f"participants={args.participants}, cells={cells}, trials={len(trials)}, "
+          f"converged={fits['converged'].mean() * 100:.1f}%")
+    for i, name in enumerate(PARAMETERS):
+        bias = np.mean(estimates[:, :, i] - truth[:, :, i]) * 1000
+        r = np.corrcoef(estimates[:, :, i].ravel(), truth[:, :, i].ravel())[0, 1]
+        print(f"  {name:5s} bias {bias:6.1f} ms, r(estimate, truth) = {r:.3f}")
+    effect = parameter_effects(fits)['tau_interference_negative'].mean() * 1000
+    print(f"  tau negative - neutral: {effect:.1f} ms (truth 20.0 ms)")
+    print(f"batch:    {batch_seconds:7.2f}s")
+    print(f"per-cell: {per_cell_seconds:7.2f}s (estimated from {len(rows)} cells)")
+
+
+if __name__ == '__main__':
+    main()
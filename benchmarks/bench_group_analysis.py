@@ -0,0 +1,66 @@
+"""집단 간섭 분석(analysis.group_interference) 벤치마크
+
+가상 참가자 N명 × 144시행 데이터로 참가자별 조건 평균, bootstrap CI, permutation p값
+계산 시간을 잰다. 참가자별 간섭 점수는 pandas groupby 결과와 같은지 확인한다.
+
+사용법:
+    python benchmarks/bench_group_analysis.py --participants 5000 --resamples 10000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analysis import CONDITIONS, group_interference, interference_scores  # noqa: E402
+
+
+def make_trials(participants, trials_per_condition=48, seed=0):
+    """참가자마다 조건별 효과가 조금씩 다른 가상 시행 데이터 (RT는 lognormal, 초 단위)"""
+    rng = np.random.default_rng(seed)
+    n_trials = trials_per_condition * len(CONDITIONS)
+    condition = np.tile(np.repeat(np.arange(len(CONDITIONS)), trials_per_condition), participants)
+    participant = np.repeat(np.arange(participants), n_trials)
+    base = rng.normal(-0.55, 0.15, participants)[participant]
+    effect = np.array([0.01, 0.025, 0.0])[condition] + rng.normal(0, 0.02, participants * 3).reshape(-1, 3)[
+        participant, condition]
+    rt = np.exp(base + effect + rng.normal(0, 0.25, len(participant)))
+    return pd.DataFrame({
+        'participant_id': pd.Series(np.char.add('P', participant.astype(str))),
+        'phase': pd.Categorical(['experimental'] * len(participant), categories=['practice', 'experimental']),
+        'condition': pd.Categorical.from_codes(condition, categories=list(CONDITIONS) + ['practice']),
+        'accuracy': (rng.random(len(participant)) < 0.95).astype(np.int8),
+        'rt': rt,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=5000)
+    parser.add_argument('--resamples', type=int, default=10000)
+    args = parser.parse_args()
+
+    trials = make_trials(args.participants)
+
+    # 참가자별 간섭 점수 검증 (pandas groupby와 비교)
+    correct = trials[trials['accuracy'] == 1]
+    expected = correct.groupby(['participant_id', 'condition'], observed=True)['rt'].mean().unstack()
+    scores = interference_scores(trials)
+    np.testing.assert_allclose(scores['interference_negative'].to_numpy(),
+                               (expected['negative'] - expected['neutral']).loc[scores.index].to_numpy())
+
+    started = time.perf_counter()
+    result = group_interference(trials, n_resamples=args.resamples, seed=1)
+    seconds = time.perf_counter() - started
+
+    print(f"participants={args.participants}, trials={len(trials)}, resamples={args.resamples}")
+    print((result[['n', 'mean', 'ci_low', 'ci_high', 'p_perm']] * [1, 1000, 1000, 1000, 1]).round(3))
+    print(f"group_interference: {seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""ITI 처리 방식별 동시 세션 부하: 서버 time.sleep ITI (before) vs 클라이언트 블록 러너 (after)
+
+bench_concurrent_sessions.py의 AppTest 참가자로 실제 앱 스크립트를 돌린다. before는 --before-rev 커밋의
+앱을 git archive로 임시 폴더에 풀어서(기본: 서버에서 ITI를 time.sleep으로 기다리던 첫 커밋), after는
+현재 작업 트리의 앱을 쓴다. 참가자 N명이 동시에 안내 화면과 연습을 지나 첫 본 시행 블록을 진행한다.
+
+- before: 본 시행마다 🔴/🟢 버튼을 RT 뒤에 클릭. 클릭 한 번의 run()이 반응 기록 → ITI 분기(time.sleep)
+  → 다음 시행 화면까지 이어지므로 스크립트 스레드가 ITI 동안 잡혀 있다. 블록 마지막 시행은 휴식 화면의
+  1초 sleep 루프로 넘어가므로 재지 않는다 (블록당 시행 수 - 1개).
+- after: 블록 진행 시간만큼 기다린 뒤 block_runner 값을 넣고 run() 한 번.
+
+단계(N)마다 본 시행 구간에서
+- 시행당 스크립트 스레드 점유 시간 (run() 시간 합 / 시행 수)
+- 시행당 서버 지연 p50/p95: before는 run() 시간에서 앱이 일부러 기다린 ITI(current_iti_duration)를 뺀 값,
+  after는 블록 run() 시간을 시행 수로 나눈 값
+- 동시에 실행 중인 스크립트 수 (평균 = 전체 run() 시간 합 / 단계 시간, 최대)
+- 세션당 CPU 시간 (안내 화면·연습 포함, 프로세스 전체)
+를 재고, 서버 지연 p95가 N=1보다 기준(기본 50ms) 넘게 늘어난 첫 N을 보고한다.
+
+--time-scale은 참가자 쪽 대기(읽기, RT, after의 블록 진행 시간)에만 적용된다. before의 ITI sleep은
+앱 안에 있으므로 실제 시간(0.8~1.2초) 그대로다.
+
+사용법:
+    python benchmarks/bench_iti_concurrency.py --levels 1 4 8 16
+    python benchmarks/bench_iti_concurrency.py --before-rev <커밋> --mode pilot --levels 1 4
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_concurrent_sessions import (APP_PATH, ERROR_RATE, LATENCY_LIMIT_MS, N_KEY_BUTTONS,  # noqa: E402
+                                       ROOT, TRIALS_PER_BLOCK, Participant, _cpu_seconds,
+                                       _share_server_state)
+from bench_event_bridge import APP_NAME, export_revision  # noqa: E402
+from simulate import FIXATION_DURATION, MAX_RESPONSE_TIME, PRACTICE_FEEDBACK  # noqa: E402
+from streamlit import logger as streamlit_logger  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+
+class _InFlight:
+    """동시에 실행 중인 스크립트 수"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.now = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.now += 1
+            self.peak = max(self.peak, self.now)
+
+    def leave(self):
+        with self.lock:
+            self.now -= 1
+
+
+class ItiParticipant(Participant):
+    """첫 본 시행 블록까지만 진행하고 본 시행 구간의 run() 시간을 따로 기록하는 참가자"""
+
+    def __init__(self, index, mode, time_scale, latencies, seed, app_path, server_iti, in_flight):
+        super().__init__(index, mode, time_scale, latencies, seed, app_path=app_path)
+        self.server_iti = server_iti
+        self.in_flight = in_flight
+        per_block = TRIALS_PER_BLOCK[mode]
+        self.target = per_block - 1 if server_iti else per_block
+        self.trials = 0
+        self.held = []       # 본 시행 run() 시간 (초)
+        self.excess = []     # 시행당 서버 지연 (초, 앱의 ITI 대기 제외)
+
+    def rerun(self):
+        self.in_flight.enter()
+        try:
+            super().rerun()
+        finally:
+            self.in_flight.leave()
+
+    def step(self):
+        if self.trials >= self.target:
+            return False
+        at = self.at
+        state = at.session_state
+        keys = [b.key or '' for b in at.button]
+        if self.server_iti and any(k.startswith('practice_red_') for k in keys):
+            # before 앱: 연습 시행표가 DataFrame이고 timeout은 숨은 버튼
+            n = state['practice_trial_num']
+            delay = FIXATION_DURATION if n == 0 else PRACTICE_FEEDBACK + 0.3
+            rt = self.rt()
+            if rt >= MAX_RESPONSE_TIME:
+                self.click(f'practice_timeout_{n}', delay + MAX_RESPONSE_TIME)
+            else:
+                self.click(f'practice_{self._color(state["practice_trials"].iloc[n])}_{n}', delay + rt)
+        elif self.server_iti and any(k.startswith('red_') for k in keys):
+            n = state['trial_num']
+            rt = self.rt()
+            if rt >= MAX_RESPONSE_TIME:
+                self.click(f'timeout_{n}', MAX_RESPONSE_TIME)
+            else:
+                self.click(f'{self._color(state["exp_trials"].iloc[n])}_{n}', rt)
+            held = self.latencies[-1]
+            self.held.append(held)
+            self.excess.append(held - (state['current_iti_duration'] or 0.0))
+            self.trials += 1
+        elif (not self.server_iti and state['instructions_exp_shown'] and not state['showing_break']
+              and 'start_block_after_break' not in keys and not any(k.startswith(N_KEY_BUTTONS) for k in keys)):
+            payload, duration = self.block_payload(state)
+            self.wait(duration)
+            state[f"block_runner_{payload['block']}"] = payload
+            self.rerun()
+            held = self.latencies[-1]
+            self.held.append(held)
+            self.excess.extend([held / len(payload['responses'])] * len(payload['responses']))
+            self.trials += len(payload['responses'])
+        else:
+            return super().step()
+        return True
+
+    def _color(self, trial):
+        color = trial['letterColor']
+        if self.rng.random() < ERROR_RATE:
+            color = 'green' if color == 'red' else 'red'
+        return color
+
+
+def run_level(n, mode, time_scale, seed, app_path, server_iti):
+    """동시 참가자 n명 한 단계"""
+    latencies = []
+    in_flight = _InFlight()
+    participants = [ItiParticipant(i, mode, time_scale, latencies, seed + i, app_path, server_iti, in_flight)
+                    for i in range(n)]
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=p.run) for p in participants]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    cpu = _cpu_seconds() - cpu_before
+
+    trials = sum(p.trials for p in participants)
+    excess = sorted(x * 1000 for p in participants for x in p.excess)
+    return {
+        'n': n,
+        'trials': trials,
+        'held_ms_per_trial': sum(sum(p.held) for p in participants) * 1000 / max(trials, 1),
+        'excess_p50_ms': statistics.median(excess) if excess else float('nan'),
+        'excess_p95_ms': excess[min(len(excess) - 1, int(0.95 * len(excess)))] if excess else float('nan'),
+        'in_flight_mean': sum(latencies) / wall,
+        'in_flight_peak': in_flight.peak,
+        'cpu_sec_per_session': cpu / n,
+        'errors': [p.error for p in participants if p.error],
+        'wall_sec': wall,
+    }
+
+
+def measure(label, app_path, work_dir, server_iti, args):
+    """한 리비전의 단계별 결과 출력, 기준선 대비 지연이 기준을 넘은 첫 N 반환"""
+    print(f"\n[{label}] {app_path}")
+    print(f"{'N':>4} {'trials':>7} {'held ms/trial':>13} {'delay p50':>9} {'delay p95':>9} "
+          f"{'scripts avg':>11} {'peak':>5} {'CPU s/sess':>10} {'wall(s)':>8}")
+    os.chdir(work_dir)   # 저장 파일은 임시 폴더에 (before 앱은 자극 파일도 작업 폴더 기준으로 읽음)
+    # 첫 실행의 모듈 import / 자극 로드 비용은 측정에서 제외
+    AppTest.from_file(str(app_path), default_timeout=120).run()
+    streamlit_logger.set_log_level('error')
+    baseline = added = None
+    for n in args.levels:
+        r = run_level(n, args.mode, args.time_scale, args.seed, app_path, server_iti)
+        print(f"{r['n']:4d} {r['trials']:7d} {r['held_ms_per_trial']:13.1f} {r['excess_p50_ms']:9.1f} "
+              f"{r['excess_p95_ms']:9.1f} {r['in_flight_mean']:11.2f} {r['in_flight_peak']:5d} "
+              f"{r['cpu_sec_per_session']:10.2f} {r['wall_sec']:8.1f}", flush=True)
+        for error in r['errors'][:3]:
+            print(f"     error: {error}")
+        if baseline is None:
+            baseline = r['excess_p95_ms']
+        elif added is None and r['excess_p95_ms'] > baseline + args.limit_ms:
+            added = n
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--before-rev', default=None, help='서버 time.sleep ITI 리비전 (기본: 첫 커밋)')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 8, 16], help='동시 참가자 수 단계')
+    parser.add_argument('--mode', choices=['full', 'pilot'], default='full')
+    parser.add_argument('--time-scale', type=float, default=0.05, help='참가자 쪽 대기 시간 배율 (1 = 실제 시간)')
+    parser.add_argument('--limit-ms', type=float, default=LATENCY_LIMIT_MS, help='기준선 대비 지연 증가 기준 (ms)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--allow-untested-streamlit', action='store_true',
+                        help='TESTED_STREAMLIT 밖의 streamlit 버전에서도 실행 (내부 구조 검사는 유지)')
+    args = parser.parse_args()
+    _share_server_state(args.allow_untested_streamlit)
+    if args.levels[0] != 1:
+        args.levels = [1] + args.levels
+    before_rev = args.before_rev or subprocess.run(
+        ['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, check=True, capture_output=True,
+        text=True).stdout.split()[0]
+
+    before_dir = Path(tempfile.mkdtemp(prefix='stroop_iti_before_'))
+    after_dir = Path(tempfile.mkdtemp(prefix='stroop_iti_after_'))
+    print(f"mode={args.mode}, time_scale={args.time_scale}, before={before_rev}, cpus={os.cpu_count()}")
+    try:
+        export_revision(before_rev, before_dir)
+        knees = {
+            'before': measure('before: server time.sleep ITI', before_dir / APP_NAME, before_dir, True, args),
+            'after': measure('after: client block runner', APP_PATH, after_dir, False, args),
+        }
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(before_dir, ignore_errors=True)
+        shutil.rmtree(after_dir, ignore_errors=True)
+
+    print()
+    for label, knee in knees.items():
+        if knee is None:
+            print(f"{label}: delay p95 stayed within N=1 + {args.limit_ms:g} ms up to {args.levels[-1]} participants")
+        else:
+            print(f"{label}: delay p95 exceeded N=1 + {args.limit_ms:g} ms at {knee} participants")
+
+
+if __name__ == '__main__':
+    main()
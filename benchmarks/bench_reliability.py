@@ -0,0 +1,36 @@
+"""split-half 신뢰도(reliability.split_half_reliability) 벤치마크
+
+가상 참가자 N명 × 144시행, 무작위 분할 S회의 계산 시간을 잰다.
+
+사용법:
+    python benchmarks/bench_reliability.py --participants 1000 --splits 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_group_analysis import make_trials  # noqa: E402
+from reliability import split_half_reliability  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=1000)
+    parser.add_argument('--splits', type=int, default=5000)
+    args = parser.parse_args()
+
+    trials = make_trials(args.participants)
+    started = time.perf_counter()
+    result, _ = split_half_reliability(trials, n_splits=args.splits, seed=1)
+    seconds = time.perf_counter() - started
+
+    print(f"participants={args.participants}, trials={len(trials)}, splits={args.splits}")
+    print(result.round(3))
+    print(f"split_half_reliability: {seconds:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
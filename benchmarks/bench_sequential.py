@@ -0,0 +1,97 @@
+"""순차 효과 분석(sequential.py) 벤치마크
+
+가상 참가자 N명 × 4블록 × 36시행(섞인 순서)에 부정 단어 다음 시행 +15ms, 오답 다음 시행 +40ms
+효과를 넣고, lag 특징 생성과 carry-over 점수 계산 시간을 잰다.
+lag 특징은 pandas groupby().shift() 결과와 같은지 확인한다.
+
+사용법:
+    python benchmarks/bench_sequential.py --participants 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from analysis import CONDITIONS  # noqa: E402
+from sequential import carryover_scores, group_carryover, lag_features  # noqa: E402
+
+BLOCKS = 4
+TRIALS_PER_BLOCK = 36
+
+
+def make_trials(participants, seed=0):
+    """블록/시행 번호와 ITI가 있는 가상 시행 데이터 (행 순서는 섞어 둠)"""
+    rng = np.random.default_rng(seed)
+    n_trials = BLOCKS * TRIALS_PER_BLOCK
+    total = participants * n_trials
+    participant = np.repeat(np.arange(participants), n_trials)
+    trial = np.tile(np.arange(1, n_trials + 1), participants)
+    # 참가자마다 조건 순서를 무작위로 섞음 (create_exp_trials와 같이)
+    condition = rng.permuted(np.tile(np.repeat(np.arange(3), n_trials // 3), (participants, 1)), axis=1).ravel()
+    correct = rng.random(total) < 0.93
+
+    previous_negative = np.zeros(total, dtype=bool)
+    previous_error = np.zeros(total, dtype=bool)
+    within_block = (trial - 1) % TRIALS_PER_BLOCK != 0
+    previous_negative[1:] = (condition[:-1] == 1) & within_block[1:]
+    previous_error[1:] = ~correct[:-1] & within_block[1:]
+    rt = (rng.normal(0.6, 0.06, participants)[participant] + np.array([0.01, 0.02, 0.0])[condition]
+          + 0.015 * previous_negative + 0.04 * previous_error + rng.exponential(0.1, total))
+
+    trials = pd.DataFrame({
+        'participant_id': pd.Series(np.char.add('P', participant.astype(str))),
+        'phase': pd.Categorical(['experimental'] * total, categories=['practice', 'experimental']),
+        'block': pd.array((trial - 1) // TRIALS_PER_BLOCK + 1, dtype='Int8'),
+        'trial': pd.array(trial, dtype='Int16'),
+        'condition': pd.Categorical.from_codes(condition, categories=list(CONDITIONS) + ['practice']),
+        'accuracy': pd.array(correct.astype(np.int8), dtype='Int8'),
+        'rt': rt,
+        'iti_planned': rng.uniform(0.8, 1.2, total),
+        'iti_actual': np.nan,
+    })
+    return trials.sample(frac=1, random_state=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=5000)
+    parser.add_argument('--resamples', type=int, default=10000)
+    args = parser.parse_args()
+
+    trials = make_trials(args.participants)
+
+    started = time.perf_counter()
+    features = lag_features(trials)
+    feature_seconds = time.perf_counter() - started
+
+    # pandas groupby().shift() 기준과 비교 (시행 번호가 연속이므로 shift와 같아야 함)
+    ordered = trials.sort_values(['participant_id', 'block', 'trial'])
+    grouped = ordered.groupby(['participant_id', 'block'], observed=True)
+    for lag in (1, 2):
+        expected = grouped['condition'].shift(lag).astype(object).where(lambda s: s != 'practice')
+        actual = features.loc[ordered.index, f'prev{lag}_condition'].astype(object)
+        assert expected.fillna('-').equals(actual.fillna('-')), f"lag {lag} condition 다름"
+        np.testing.assert_allclose(features.loc[ordered.index, f'prev{lag}_iti'].to_numpy(),
+                                   grouped['iti_planned'].shift(lag).to_numpy())
+
+    started = time.perf_counter()
+    scores = carryover_scores(trials)
+    score_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    result = group_carryover(trials, n_resamples=args.resamples, seed=1)
+    group_seconds = time.perf_counter() - started
+
+    print(f"participants={args.participants}, trials={len(trials)}")
+    print((result[['n', 'mean', 'ci_low', 'ci_high']] * [1, 1000, 1000, 1000]).round(1))
+    print(f"lag_features (lag 1, 2): {feature_seconds:.2f}s")
+    print(f"carryover_scores:        {score_seconds:.2f}s ({scores.shape[1]} scores)")
+    print(f"group_carryover:         {group_seconds:.2f}s (bootstrap/permutation {args.resamples})")
+
+
+if __name__ == '__main__':
+    main()
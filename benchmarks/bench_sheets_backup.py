@@ -0,0 +1,155 @@
+"""Google Sheets 백업 경로 처리량/지연 벤치마크 (가짜 시트 사용, 네트워크 불필요)
+
+N명이 동시에 과제를 마쳤을 때 완료 화면에서 백업에 걸리는 시간을 측정한다.
+
+- legacy: 기존 방식 (get_all_values로 시트 전체 확인 + 행마다 append_row)
+- direct: backup_to_google_sheets (1행만 확인 + append_rows 1회)
+- outbox: queue_backup 경로 (로컬 outbox 기록만, 전송은 업로더가 묶어서 처리)
+
+사용법:
+    python benchmarks/bench_sheets_backup.py --concurrency 1,10,50,100,500 --latency 0.2
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import outbox  # noqa: E402
+import sheets_backup  # noqa: E402
+from fake_sheets import FakeSheetsBackend  # noqa: E402
+from summary import summary_schema  # noqa: E402
+
+# create_summary_row와 같은 폭의 행 (요약 + practice 6시행 + 144시행 + 휴식 + trimming)
+SUMMARY_COLUMNS = list(summary_schema(6)[0])
+
+
+def make_summary(i):
+    row = {col: 0.5 for col in SUMMARY_COLUMNS}
+    row['participant_id'] = f'P{i:05d}'
+    row['timestamp_start'] = f'2026-01-01T00:00:{i:05d}'
+    return pd.DataFrame([row])
+
+
+def legacy_backup(worksheet, df):
+    """기존 backup_to_google_sheets의 시트 접근 방식"""
+    existing_data = worksheet.get_all_values()
+    expected_headers = df.columns.tolist()
+    if len(existing_data) == 0 or existing_data[0] != expected_headers:
+        if len(existing_data) == 0:
+            worksheet.append_row(expected_headers)
+        else:
+            worksheet.insert_row(expected_headers, 1)
+    for row in sheets_backup.dataframe_to_rows(df):
+        worksheet.append_row(row)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(mode, n, args):
+    backend = FakeSheetsBackend(
+        latency=args.latency, latency_jitter=args.latency / 2,
+        per_cell_latency=args.per_cell_latency, quota_per_min=args.quota,
+        max_concurrency=args.server_concurrency,
+    )
+    worksheet = backend.worksheet
+    # 이전 참가자 행이 쌓인 시트
+    worksheet.rows = [list(SUMMARY_COLUMNS)] + [[0.5] * len(SUMMARY_COLUMNS) for _ in range(args.existing_rows)]
+    sheets_backup.set_backend(backend)
+
+    box = uploader = None
+    if mode == 'outbox':
+        box = outbox.Outbox(Path(tempfile.mkdtemp()) / 'outbox.jsonl')
+        uploader = outbox.Uploader(box, flush_interval=args.flush_interval)
+
+    frames = [make_summary(i) for i in range(n)]
+    latencies = [None] * n
+    ok = [False] * n
+    barrier = threading.Barrier(n)
+
+    def complete(i):
+        barrier.wait()  # 모든 참가자가 같은 순간에 완료
+        started = time.perf_counter()
+        try:
+            if mode == 'legacy':
+                legacy_backup(worksheet, frames[i])
+                ok[i] = True
+            elif mode == 'direct':
+                ok[i], _ = sheets_backup.backup_to_google_sheets(frames[i])
+            else:
+                for row in sheets_backup.dataframe_to_rows(frames[i]):
+                    box.enqueue(frames[i].columns.tolist(), row)
+                uploader.notify()
+                ok[i] = True
+        except Exception:
+            ok[i] = False
+        latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if uploader:
+        uploader.start()
+    threads = [threading.Thread(target=complete, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # outbox: 모든 행이 시트에 들어갈 때까지 (전송 완료 시간)
+    if box is not None:
+        deadline = time.perf_counter() + args.drain_timeout
+        while box.depth() > 0 and time.perf_counter() < deadline:
+            time.sleep(0.05)
+    wall = time.perf_counter() - started
+
+    stored = len(worksheet.rows) - 1 - args.existing_rows
+    return {
+        'n': n,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'throughput': stored / wall if wall else 0.0,
+        'stored': stored,
+        'failed': ok.count(False) if mode != 'outbox' else box.depth(),
+        'headers': worksheet.header_count(SUMMARY_COLUMNS),
+        'requests': sum(worksheet.requests.values()),
+        'wall_s': wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='legacy,direct,outbox')
+    parser.add_argument('--concurrency', default='1,10,50,100,500', help='동시 완료 수 목록')
+    parser.add_argument('--latency', type=float, default=0.2, help='요청당 지연 (초)')
+    parser.add_argument('--per-cell-latency', type=float, default=2e-7, help='읽은 셀당 추가 지연 (초)')
+    parser.add_argument('--existing-rows', type=int, default=1000, help='시트에 이미 있는 참가자 행 수')
+    parser.add_argument('--quota', type=int, default=60, help='분당 요청 한도 (0이면 무제한)')
+    parser.add_argument('--server-concurrency', type=int, default=10, help='시트 서버 동시 처리 한도')
+    parser.add_argument('--flush-interval', type=float, default=1.0, help='outbox 업로더 flush 간격 (초)')
+    parser.add_argument('--drain-timeout', type=float, default=120.0)
+    args = parser.parse_args()
+    args.quota = args.quota or None
+
+    print(f"latency={args.latency}s, existing rows={args.existing_rows}, quota/min={args.quota}, "
+          f"columns={len(SUMMARY_COLUMNS)}")
+    print(f"{'mode':7s} {'N':>5s} {'p50(ms)':>9s} {'p99(ms)':>9s} {'rows/s':>8s} "
+          f"{'stored':>7s} {'failed':>7s} {'headers':>8s} {'requests':>9s} {'wall(s)':>8s}")
+    for mode in args.modes.split(','):
+        for n in (int(x) for x in args.concurrency.split(',')):
+            r = run(mode, n, args)
+            print(f"{mode:7s} {r['n']:5d} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} {r['throughput']:8.1f} "
+                  f"{r['stored']:7d} {r['failed']:7d} {r['headers']:8d} {r['requests']:9d} {r['wall_s']:8.2f}")
+    print()
+    print("p50/p99: 완료 화면에서 참가자 1명이 기다리는 시간, failed: 실패(outbox는 전송되지 않고 남은 행)")
+
+
+if __name__ == '__main__':
+    main()
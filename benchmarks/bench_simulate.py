@@ -0,0 +1,59 @@
+"""가상 참가자 생성(simulate.py) 벤치마크
+
+N명을 임시 폴더의 통합 데이터셋으로 생성/기록하는 시간과 다시 읽는 시간을 재고,
+생성된 데이터가 설정한 모수(시행 수, 오답/timeout/server 비율)와 맞는지 확인한다.
+
+사용법:
+    python benchmarks/bench_simulate.py --participants 100000
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from aggregate import load_combined  # noqa: E402
+from simulate import ERROR_RATE, LAPSE_RATE, SERVER_RATE, simulate_sessions, write_combined  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=100000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    batch = simulate_sessions(min(args.participants, 10000), seed=0)
+    generate_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    batch.trial_table()
+    table_seconds = time.perf_counter() - started
+
+    out_dir = Path(tempfile.mkdtemp())
+    try:
+        result = write_combined(args.participants, out_dir, seed=1)
+        started = time.perf_counter()
+        _, trials = load_combined(out_dir)
+        load_seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(out_dir)
+
+    experimental = trials[trials['phase'] == 'experimental']
+    per_participant = experimental.groupby('participant_id').size()
+    assert per_participant.nunique() == 1 and per_participant.iloc[0] == 144, "참가자별 본 시행 수가 다름"
+    source = experimental['rt_source'].value_counts(normalize=True)
+    print(f"participants={args.participants}, trials={result['trial_rows']}, parts={result['parts']}")
+    print(f"  error rate   {1 - experimental['accuracy'].mean():.3f} (errors {ERROR_RATE} + timeouts)")
+    print(f"  timeout rate {source['timeout']:.3f} (lapse {LAPSE_RATE} + RT > 3s)")
+    print(f"  server RT    {source['server']:.3f} (setting {SERVER_RATE})")
+    for name, seconds in (('generate (10,000 participants)', generate_seconds),
+                          ('arrow table (10,000 participants)', table_seconds),
+                          (f'write_combined ({args.participants} participants)', result['seconds']),
+                          ('load_combined', load_seconds)):
+        print(f"{name:40s} {seconds:6.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""요약 행(create_summary_row) 생성 시간 벤치마크
+
+- before: 조건마다 DataFrame 필터 + 144회 .iloc + 연습 iterrows로 dict를 한 칸씩 채우는 기존 방식
+- after: summary.build_summary_row (grouped 통계 1회 + 미리 계산한 헤더에 slice로 채움)
+
+두 결과가 기존 컬럼에 대해 같은 CSV를 만드는지도 확인한다.
+
+사용법:
+    python benchmarks/bench_summary_row.py --trials 144
+"""
+import argparse
+import io
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from summary import build_summary_row  # noqa: E402
+
+
+def make_responses(n, phase, rng):
+    conditions = ['positive', 'negative', 'neutral'] if phase == 'experimental' else ['practice']
+    responses = []
+    for i in range(n):
+        color = rng.choice(['red', 'green'])
+        timeout = rng.random() < 0.03
+        response = 'timeout' if timeout else (color if rng.random() < 0.93 else ('red' if color == 'green' else 'green'))
+        responses.append({
+            'participant_id': 'P001', 'word': f'단어{i}', 'condition': conditions[i % len(conditions)],
+            'color': color, 'response': response, 'accuracy': int(response == color),
+            'rt': 3.0 if timeout else rng.lognormvariate(-0.5, 0.25), 'rt_source': 'client',
+            'timestamp': datetime.now().isoformat(), 'phase': phase,
+        })
+    return responses
+
+
+def legacy_summary_row(participant_id, responses, practice_responses, start_time, end_time, break_log):
+    """기존 create_summary_row (session_state 대신 인자 사용)"""
+    exp_df = pd.DataFrame(responses)
+    total_duration = (end_time - start_time).total_seconds() if start_time else None
+    summary = {
+        'participant_id': participant_id,
+        'date': end_time.strftime("%Y-%m-%d"),
+        'timestamp_start': start_time.isoformat() if start_time else None,
+        'timestamp_end': end_time.isoformat(),
+        'total_duration_sec': round(total_duration, 2) if total_duration else None,
+    }
+    for condition in ['positive', 'negative', 'neutral']:
+        cond_data = exp_df[exp_df['condition'] == condition]
+        correct_data = cond_data[cond_data['accuracy'] == 1]
+        summary[f'rt_{condition}_mean'] = round(correct_data['rt'].mean(), 4) if len(correct_data) > 0 else None
+        summary[f'rt_{condition}_sd'] = round(correct_data['rt'].std(), 4) if len(correct_data) > 1 else None
+        summary[f'acc_{condition}'] = round(cond_data['accuracy'].mean(), 4) if len(cond_data) > 0 else None
+        summary[f'n_{condition}'] = len(cond_data)
+    if summary.get('rt_neutral_mean') and summary.get('rt_negative_mean'):
+        summary['interference_negative'] = round(summary['rt_negative_mean'] - summary['rt_neutral_mean'], 4)
+    if summary.get('rt_neutral_mean') and summary.get('rt_positive_mean'):
+        summary['interference_positive'] = round(summary['rt_positive_mean'] - summary['rt_neutral_mean'], 4)
+    correct_all = exp_df[exp_df['accuracy'] == 1]
+    summary['rt_overall_mean'] = round(correct_all['rt'].mean(), 4) if len(correct_all) > 0 else None
+    summary['acc_overall'] = round(exp_df['accuracy'].mean(), 4)
+    summary['n_total'] = len(exp_df)
+    practice_df = pd.DataFrame(practice_responses)
+    for i, (_, row) in enumerate(practice_df.iterrows(), 1):
+        summary[f'p{i}_word'] = row['word']
+        summary[f'p{i}_color'] = row['color']
+        summary[f'p{i}_resp'] = row['response']
+        summary[f'p{i}_acc'] = row['accuracy']
+        summary[f'p{i}_rt'] = round(row['rt'], 4)
+    if len(practice_df) > 0:
+        practice_correct = practice_df[practice_df['accuracy'] == 1]
+        summary['practice_acc'] = round(practice_df['accuracy'].mean(), 4)
+        summary['practice_rt_mean'] = round(practice_correct['rt'].mean(), 4) if len(practice_correct) > 0 else None
+    for i in range(1, 145):
+        if i <= len(exp_df):
+            row = exp_df.iloc[i - 1]
+            summary[f't{i}_word'] = row['word']
+            summary[f't{i}_cond'] = row['condition'][:3]
+            summary[f't{i}_color'] = row['color']
+            summary[f't{i}_resp'] = row['response']
+            summary[f't{i}_acc'] = row['accuracy']
+            summary[f't{i}_rt'] = round(row['rt'], 4)
+        else:
+            for field in ('word', 'cond', 'color', 'resp', 'acc', 'rt'):
+                summary[f't{i}_{field}'] = None
+    break_durations = {b['block']: b['duration_sec'] for b in break_log}
+    for i in range(1, 4):
+        summary[f'break{i}_sec'] = break_durations.get(i)
+    return pd.DataFrame([summary])
+
+
+def to_csv(df):
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False)
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, default=144, help='본 시행 수 (144 = full, 30 = pilot)')
+    parser.add_argument('--number', type=int, default=200, help='반복 수')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    end_time = datetime.now()
+    inputs = ('P001', make_responses(args.trials, 'experimental', rng), make_responses(6, 'practice', rng),
+              end_time - timedelta(minutes=12), end_time,
+              [{'block': b, 'duration_sec': 30.0 + b, 'ended_by': 'key'} for b in (1, 2, 3)])
+
+    # 기존 컬럼은 같은 값 (trimming 컬럼은 맨 뒤에 추가됨)
+    legacy = legacy_summary_row(*inputs)
+    assert to_csv(legacy) == to_csv(build_summary_row(*inputs)[legacy.columns]), "CSV가 다름"
+
+    for name, build in (('legacy', legacy_summary_row), ('vectorized', build_summary_row)):
+        seconds = min(timeit.repeat(lambda: build(*inputs), number=args.number, repeat=5)) / args.number
+        print(f"{name:10s} {args.trials} trials: {seconds * 1000:8.3f} ms/row")
+
+
+if __name__ == '__main__':
+    main()
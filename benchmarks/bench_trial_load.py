@@ -0,0 +1,95 @@
+"""분석용 시행 데이터 로드 시간 벤치마크
+
+참가자 N명 분량의 저장 파일을 임시 폴더에 만든 뒤 두 방식으로 시행 단위 표를 얻는 시간을 비교한다.
+
+- wide CSV: 참가자별 요약 CSV(921 컬럼)를 모두 읽고 long format으로 melt
+- parquet: 참가자별 *_trials.parquet (trial_data.load_trial_data)
+
+사용법:
+    python benchmarks/bench_trial_load.py --participants 200
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from summary import build_summary_row  # noqa: E402
+from trial_data import build_trial_table, load_trial_data, summary_to_trials, write_trial_table  # noqa: E402
+
+
+def make_responses(participant_id, n, phase, rng):
+    conditions = ['positive', 'negative', 'neutral'] if phase == 'experimental' else ['practice']
+    responses = []
+    for i in range(n):
+        color = rng.choice(['red', 'green'])
+        response = color if rng.random() < 0.93 else ('red' if color == 'green' else 'green')
+        responses.append({
+            'participant_id': participant_id, 'word': f'단어{i % 48}', 'condition': conditions[i % len(conditions)],
+            'color': color, 'response': response, 'accuracy': int(response == color),
+            'rt': rng.lognormvariate(-0.5, 0.25), 'rt_source': 'client',
+            'timestamp': datetime.now().isoformat(), 'phase': phase,
+            'block': 0 if phase == 'practice' else i // 36 + 1, 'trial': i + 1,
+            'iti_planned': rng.uniform(0.8, 1.2) if phase == 'experimental' else None,
+            'iti_actual': rng.uniform(0.8, 1.2) if phase == 'experimental' else None,
+        })
+    return responses
+
+
+def write_files(directory, participants, start=0):
+    """참가자 start ~ start + participants - 1 의 요약 CSV와 _trials.parquet 저장"""
+    rng = random.Random(start)
+    end_time = datetime.now()
+    for p in range(start, start + participants):
+        participant_id = f'P{p:04d}'
+        responses = make_responses(participant_id, 144, 'experimental', rng)
+        practice = make_responses(participant_id, 6, 'practice', rng)
+        summary = build_summary_row(participant_id, responses, practice, end_time - timedelta(minutes=12),
+                                    end_time, [])
+        stem = f'{participant_id}_20260101_000000'
+        summary.to_csv(directory / f'{stem}.csv', index=False, encoding='utf-8-sig')
+        write_trial_table(build_trial_table(responses, practice), directory / f'{stem}_trials.parquet')
+
+
+def load_from_csv(directory):
+    paths = sorted(Path(directory).glob('*_000000.csv'))
+    summary = pd.concat([pd.read_csv(p, encoding='utf-8-sig') for p in paths], ignore_index=True)
+    return summary_to_trials(summary)
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=200)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp())
+    write_files(directory, args.participants)
+    csv_bytes = sum(p.stat().st_size for p in directory.glob('*_000000.csv'))
+    parquet_bytes = sum(p.stat().st_size for p in directory.glob('*_trials.parquet'))
+
+    csv_seconds, csv_trials = timed(load_from_csv, directory)
+    parquet_seconds, parquet_trials = timed(load_trial_data, directory)
+    parquet_trials = parquet_trials[parquet_trials['phase'] == 'experimental']
+    assert len(csv_trials) == len(parquet_trials) == args.participants * 144
+
+    print(f"participants={args.participants}, experimental trials={len(csv_trials)}")
+    print(f"{'':12s} {'load(s)':>8s} {'size(KB)':>9s}")
+    print(f"{'wide CSV':12s} {csv_seconds:8.2f} {csv_bytes / 1024:9.0f}")
+    print(f"{'parquet':12s} {parquet_seconds:8.2f} {parquet_bytes / 1024:9.0f}")
+    print(f"speedup: {csv_seconds / parquet_seconds:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""세션별 시행 목록 메모리/접근 비용 벤치마크
+
+- before: 시행 목록을 pandas DataFrame으로 저장하고 .iloc[n] / .iloc[a:b].to_dict('records')로 접근
+- after: TrialPlan (단어 인덱스/조건 코드/색 코드/ITI 배열)
+
+세션 하나가 들고 있는 바이트 수(tracemalloc으로 객체 생성 시 남은 할당량)와
+rerun마다 하는 접근(현재 시행 1개, 블록 36시행) 비용을 비교한다.
+
+사용법:
+    python benchmarks/bench_trial_plan.py --sessions 500
+"""
+import argparse
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from stimulus_store import get_exp_stimuli, get_practice_stimuli  # noqa: E402
+from trial_plan import TrialPlan  # noqa: E402
+
+N_PER_CONDITION = 48
+TRIALS_PER_BLOCK = 36
+
+
+def make_trials(stimuli):
+    """기존 create_exp_trials와 같은 내용의 (단어 인덱스, 조건, 색, ITI) 목록"""
+    trials = []
+    for condition in ['positive', 'negative', 'neutral']:
+        for idx in random.sample(range(stimuli.size(condition)), N_PER_CONDITION):
+            trials.append((stimuli.word_index(condition, idx), condition,
+                           random.choice(['red', 'green']), random.uniform(0.8, 1.2)))
+    random.shuffle(trials)
+    return trials
+
+
+def make_practice(stimuli):
+    return [(i, 'practice', random.choice(['red', 'green']), None) for i in range(len(stimuli.word_table))]
+
+
+def as_dataframe(stimuli, trials):
+    rows = []
+    for word_idx, condition, color, iti in trials:
+        row = {'text': stimuli.word_table[word_idx], 'letterColor': color, 'corrAns': color, 'condition': condition}
+        if iti is not None:
+            row['iti'] = iti
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def as_plan(stimuli, trials):
+    word_idx, conditions, colors, itis = zip(*trials)
+    return TrialPlan(stimuli.word_table, word_idx, conditions, colors,
+                     iti=None if itis[0] is None else itis)
+
+
+def session_bytes(build, sessions):
+    """세션 sessions개 분량의 (practice, exp) 시행 목록을 만들었을 때 세션당 남은 할당 바이트"""
+    exp_stimuli, practice_stimuli = get_exp_stimuli(), get_practice_stimuli()
+    inputs = [(make_practice(practice_stimuli), make_trials(exp_stimuli)) for _ in range(sessions)]
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = [(build(practice_stimuli, p), build(exp_stimuli, e)) for p, e in inputs]
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / sessions
+
+
+def access_cost(obj, single, block, number):
+    """현재 시행 1개 읽기와 블록 하나를 dict 리스트로 만드는 비용 (μs)"""
+    n = len(obj)
+    one = min(timeit.repeat(lambda: single(obj, random.randrange(n)), number=number, repeat=5)) / number
+    many = min(timeit.repeat(lambda: block(obj, 36, 72), number=number // 10, repeat=5)) / (number // 10)
+    return one * 1e6, many * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=500, help='메모리 측정에 쓸 세션 수')
+    parser.add_argument('--number', type=int, default=20000, help='접근 비용 측정 반복 수')
+    args = parser.parse_args()
+
+    stimuli = get_exp_stimuli()
+    trials = make_trials(stimuli)
+    df = as_dataframe(stimuli, trials)
+    plan = as_plan(stimuli, trials)
+    assert [t['text'] for _, t in df.iterrows()] == [t['text'] for t in plan]
+
+    df_bytes = session_bytes(as_dataframe, args.sessions)
+    plan_bytes = session_bytes(as_plan, args.sessions)
+
+    df_one, df_block = access_cost(df, lambda d, i: d.iloc[i]['text'],
+                                   lambda d, a, b: d.iloc[a:b].to_dict('records'), args.number)
+    plan_one, plan_block = access_cost(plan, lambda p, i: p[i]['text'],
+                                       lambda p, a, b: p.records(a, b), args.number)
+
+    print(f"trials/session: practice {len(get_practice_stimuli().word_table)} + exp {len(plan)}, "
+          f"sessions={args.sessions}")
+    print(f"{'':10s} {'bytes/session':>14s} {'trial access(us)':>17s} {'block records(us)':>18s}")
+    print(f"{'DataFrame':10s} {df_bytes:14,.0f} {df_one:17.2f} {df_block:18.1f}")
+    print(f"{'TrialPlan':10s} {plan_bytes:14,.0f} {plan_one:17.2f} {plan_block:18.1f}")
+    print(f"(TrialPlan 배열 크기: {plan.nbytes()} bytes, 단어 문자열은 프로세스 전체가 공유)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""참가자 × 조건별 ex-Gaussian RT 분포 추정
+
+정답 시행 RT를 정규분포(mu, sigma) + 지수분포(tau)의 합으로 보고 최대우도로 추정한다.
+정서 간섭은 평균보다 느린 꼬리(tau)에 나타나는 경우가 많아서 조건별 tau 차이를 따로 본다.
+
+모든 참가자 × 조건 칸을 (칸 수, 최대 시행 수) 행렬로 모은 뒤(빈 칸은 가중치 0),
+칸마다 Nelder-Mead simplex를 동시에 진행한다. 로그우도는 행렬 전체에 대해 한 번에 계산하고,
+수렴한 칸은 다음 반복부터 제외한다. (scipy 없이 numpy만 사용)
+
+사용법:
+    python exgauss.py                   # 통합 데이터셋 조건별 평균 mu/sigma/tau와 간섭 효과
+    python exgauss.py --trim            # trimming.py 기준으로 제외한 뒤 추정
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis import CONDITIONS, EFFECTS, load_trials
+from reliability import pack_trials
+
+PARAMETERS = ('mu', 'sigma', 'tau')
+MIN_TRIALS = 10      # 추정에 필요한 칸별 최소 정답 시행 수 (pilot 조건당 10시행)
+MAX_ITER = 600       # 칸별 최대 simplex 반복 수
+XATOL = 1e-4         # 수렴 기준: simplex 크기 (mu는 초, sigma/tau는 log 단위)
+FATOL = 1e-7         # 수렴 기준: 시행당 평균 음의 로그우도 차이
+
+# erfc 근사 계수 (Numerical Recipes erfcc, 상대 오차 < 1.2e-7)
+_ERFC_COEFFS = (0.17087277, -0.82215223, 1.48851587, -1.13520398, 0.27886807,
+                -0.18628806, 0.09678418, 0.37409196, 1.00002368, -1.26551223)
+_LOG_HALF = np.log(0.5)
+
+
+def _log_erfc(z):
+    """log(erfc(z)) - z가 커도 underflow 없이 log 공간에서 계산"""
+    t = 1.0 / (1.0 + 0.5 * np.abs(z))
+    poly = np.zeros_like(t)
+    for c in _ERFC_COEFFS:
+        poly = poly * t + c
+    log_tail = np.log(t) - z * z + poly     # z >= 0일 때 log(erfc(z))
+    return np.where(z >= 0, log_tail, np.log(2.0 - np.exp(np.minimum(log_tail, 0.0))))
+
+
+def log_norm_cdf(u):
+    """표준정규 누적분포의 로그 log(Phi(u))"""
+    return _LOG_HALF + _log_erfc(-u / np.sqrt(2.0))
+
+
+def exgauss_logpdf(x, mu, sigma, tau):
+    """ex-Gaussian 로그 밀도 (broadcast)"""
+    return (-np.log(tau) + (mu - x) / tau + sigma * sigma / (2 * tau * tau)
+            + log_norm_cdf((x - mu) / sigma - sigma / tau))
+
+
+def moment_estimates(values, weights, counts):
+    """적률 추정치 (simplex 시작점) - 왜도로 tau를 정하고 나머지 분산을 sigma에 배분
+
+    Returns:
+        (칸 수, 3) 배열 [mu, log sigma, log tau]
+    """
+    mean = (values * weights).sum(axis=1) / counts
+    centered = (values - mean[:, None]) * weights
+    var = (centered ** 2).sum(axis=1) / counts
+    sd = np.sqrt(var)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skew = (centered ** 3).sum(axis=1) / counts / var ** 1.5
+    # ex-Gaussian의 왜도는 0~2 사이이므로 범위 안으로 자름
+    skew = np.clip(np.nan_to_num(skew, nan=0.5), 0.1, 1.8)
+    tau = sd * (skew / 2) ** (1 / 3)
+    sigma = np.sqrt(np.maximum(var - tau ** 2, (0.1 * sd) ** 2))
+    return np.column_stack([mean - tau, np.log(sigma), np.log(tau)])
+
+
+def fit_rows(values, weights, max_iter=MAX_ITER, xatol=XATOL, fatol=FATOL):
+    """행(칸)마다 ex-Gaussian 최대우도 추정 (모든 행의 Nelder-Mead를 동시에 진행)
+
+    Args:
+        values: (칸 수, 최대 시행 수) RT 배열 (초), 빈 칸 값은 아무 유한값
+        weights: values와 같은 모양의 0/1 배열 (1 = 사용할 시행)
+        max_iter: 최대 반복 수
+        xatol, fatol: 수렴 기준
+
+    Returns:
+        (params, loglik, converged) - params는 (칸 수, 3) [mu, sigma, tau],
+        loglik은 칸별 로그우도 합, converged는 bool 배열
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    counts = weights.sum(axis=1)
+    n_rows, dim = len(values), len(PARAMETERS)
+
+    def objective(theta, rows):
+        # 시행당 평균 음의 로그우도 (theta: [mu, log sigma, log tau])
+        logpdf = exgauss_logpdf(values[rows], theta[:, 0:1], np.exp(theta[:, 1:2]), np.exp(theta[:, 2:3]))
+        with np.errstate(invalid='ignore'):
+            nll = -(logpdf * weights[rows]).sum(axis=1) / counts[rows]
+        return np.where(np.isfinite(nll), nll, np.inf)
+
+    # 시작 simplex: 적률 추정치와 좌표별로 조금씩 옮긴 점 3개
+    start = moment_estimates(values, weights, counts)
+    sd = np.sqrt(np.exp(2 * start[:, 1]) + np.exp(2 * start[:, 2]))
+    simplex = np.repeat(start[:, None, :], dim + 1, axis=1)
+    simplex[:, 1, 0] += 0.25 * sd
+    simplex[:, 2, 1] += 0.25
+    simplex[:, 3, 2] += 0.25
+    fsim = np.column_stack([objective(simplex[:, i], np.arange(n_rows)) for i in range(dim + 1)])
+
+    converged = np.zeros(n_rows, dtype=bool)
+    active = np.arange(n_rows)
+    for _ in range(max_iter):
+        order = np.argsort(fsim[active], axis=1)
+        s = np.take_along_axis(simplex[active], order[:, :, None], axis=1)
+        f = np.take_along_axis(fsim[active], order, axis=1)
+
+        done = (f[:, -1] - f[:, 0] <= fatol) & (np.abs(s[:, 1:] - s[:, :1]).max(axis=(1, 2)) <= xatol)
+        if done.any():
+            converged[active[done]] = True
+            simplex[active[done]], fsim[active[done]] = s[done], f[done]
+            active, s, f = active[~done], s[~done], f[~done]
+        if len(active) == 0:
+            break
+
+        centroid = s[:, :-1].mean(axis=1)
+        worst, f_worst = s[:, -1], f[:, -1]
+        reflected = 2 * centroid - worst
+        f_reflected = objective(reflected, active)
+        new_point, new_f = reflected.copy(), f_reflected.copy()
+
+        # 반사점이 가장 좋으면 확장
+        expand = np.flatnonzero(f_reflected < f[:, 0])
+        if len(expand):
+            expanded = 3 * centroid[expand] - 2 * worst[expand]
+            f_expanded = objective(expanded, active[expand])
+            better = f_expanded < f_reflected[expand]
+            new_point[expand[better]], new_f[expand[better]] = expanded[better], f_expanded[better]
+
+        # 반사점이 두 번째로 나쁜 점보다 나쁘면 수축 (반사점이 최악점보다 나으면 바깥쪽, 아니면 안쪽)
+        contract = np.flatnonzero(f_reflected >= f[:, -2])
+        shrink = np.zeros(len(active), dtype=bool)
+        if len(contract):
+            outside = f_reflected[contract] < f_worst[contract]
+            toward = np.where(outside[:, None], reflected[contract], worst[contract])
+            contracted = 0.5 * (centroid[contract] + toward)
+            f_contracted = objective(contracted, active[contract])
+            accept = np.where(outside, f_contracted <= f_reflected[contract], f_contracted < f_worst[contract])
+            new_point[contract[accept]], new_f[contract[accept]] = contracted[accept], f_contracted[accept]
+            shrink[contract[~accept]] = True
+
+        s[:, -1], f[:, -1] = new_point, new_f
+        # 수축도 실패하면 가장 좋은 점 쪽으로 simplex 축소
+        if shrink.any():
+            rows = np.flatnonzero(shrink)
+            s[rows, 1:] = s[rows, :1] + 0.5 * (s[rows, 1:] - s[rows, :1])
+            for i in range(1, dim + 1):
+                f[rows, i] = objective(s[rows, i], active[rows])
+        simplex[active], fsim[active] = s, f
+
+    best = np.argmin(fsim, axis=1)
+    theta = simplex[np.arange(n_rows), best]
+    params = np.column_stack([theta[:, 0], np.exp(theta[:, 1]), np.exp(theta[:, 2])])
+    return params, -fsim[np.arange(n_rows), best] * counts, converged
+
+
+def fit_exgauss(trials, min_trials=MIN_TRIALS, **options):
+    """참가자 × 조건별 ex-Gaussian 추정 (본 시행 정답 시행)
+
+    Args:
+        trials: 시행 단위 DataFrame (participant_id, condition, accuracy, rt, [phase])
+        min_trials: 칸별 최소 정답 시행 수, 모자라면 추정값 nan
+        **options: fit_rows의 max_iter, xatol, fatol
+
+    Returns:
+        pd.DataFrame (index: participant_id, condition) - n, mu, sigma, tau, loglik, converged (RT 단위는 초)
+    """
+    participants, packed, counts = pack_trials(trials)
+    n, k, width = packed.shape
+    values = packed.reshape(n * k, width).astype(np.float64)
+    counts = counts.reshape(-1)
+    weights = ~np.isnan(values)
+    values[~weights] = 0.0
+
+    params = np.full((n * k, len(PARAMETERS)), np.nan)
+    loglik = np.full(n * k, np.nan)
+    converged = np.zeros(n * k, dtype=bool)
+    rows = np.flatnonzero(counts >= max(min_trials, 3))
+    if len(rows):
+        params[rows], loglik[rows], converged[rows] = fit_rows(values[rows], weights[rows], **options)
+
+    index = pd.MultiIndex.from_product([pd.Index(participants, name='participant_id'),
+                                        pd.Index(CONDITIONS, name='condition')])
+    result = pd.DataFrame(params, index=index, columns=list(PARAMETERS))
+    result.insert(0, 'n', counts)
+    result['loglik'] = loglik
+    result['converged'] = converged
+    return result
+
+
+def parameter_effects(fits):
+    """참가자별 모수 간섭 효과 (예: tau_interference_negative = tau(negative) - tau(neutral))
+
+    Args:
+        fits: fit_exgauss 결과
+
+    Returns:
+        pd.DataFrame (index: participant_id)
+    """
+    wide = fits[list(PARAMETERS)].unstack('condition')
+    columns = {}
+    for param in PARAMETERS:
+        for effect, (emotional, baseline) in EFFECTS.items():
+            columns[f'{param}_{effect}'] = wide[(param, emotional)] - wide[(param, baseline)]
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--combined', default='data/combined', help='aggregate.py 통합 데이터셋 폴더')
+    parser.add_argument('--responses', default='data/responses', help='참가자별 저장 폴더')
+    parser.add_argument('--min-trials', type=int, default=MIN_TRIALS)
+    parser.add_argument('--trim', action='store_true', help='trimming.py 기본 기준으로 시행 제외 후 추정')
+    args = parser.parse_args()
+
+    trials = load_trials(args.combined, args.responses)
+    if args.trim:
+        from trimming import trim_trials
+        trials = trials[(trim_trials(trials) == 'kept').to_numpy()]
+    fits = fit_exgauss(trials, min_trials=args.min_trials)
+    fitted = fits.dropna(subset=['mu'])
+    print(f"participants: {trials['participant_id'].nunique()}, fitted cells: {len(fitted)}, "
+          f"converged: {int(fitted['converged'].sum())}")
+    # 보기 쉽게 ms 단위로 출력
+    print((fitted.groupby(level='condition')[list(PARAMETERS)].mean() * 1000).round(1))
+    print()
+    effects = parameter_effects(fits)
+    print((effects.agg(['count', 'mean', 'std']).T * [1, 1000, 1000]).round(1)
+          .rename(columns={'mean': 'mean(ms)', 'std': 'sd(ms)'}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Google Sheets 백업 경로를 오프라인에서 실행/측정하기 위한 가짜 시트
+
+gspread Worksheet 중 백업 코드가 쓰는 메서드(get_all_values, row_values, col_values,
+append_row, append_rows, insert_row)를 메모리 안에서 흉내 낸다.
+요청마다 지연 시간, quota 초과(분당 요청 수), 무작위 오류, 서버 측 동시 처리 한도를
+주입할 수 있다.
+
+사용법:
+    import sheets_backup
+    from fake_sheets import FakeSheetsBackend
+    sheets_backup.set_backend(FakeSheetsBackend(latency=0.2, quota_per_min=60))
+
+또는 STROOP_SHEETS_BACKEND=fake 환경변수로 앱 전체에서 사용.
+"""
+import random
+import threading
+import time
+from collections import Counter, deque
+
+
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError 대용 (status_code 포함)"""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"[{status_code}] {message}")
+        self.status_code = status_code
+
+
+class FakeWorksheet:
+    """메모리 안의 워크시트
+
+    Args:
+        latency: 요청당 기본 지연 (초)
+        latency_jitter: 지연에 더할 무작위 범위 (초, 0~jitter 균등분포)
+        per_cell_latency: 읽기 요청에서 셀 하나당 추가 지연 (초) - 시트가 커질수록 느려지는
+            get_all_values 같은 전체 읽기를 흉내 냄
+        quota_per_min: 최근 60초 요청 수가 이 값을 넘으면 429 오류 (None이면 무제한)
+        error_rate: 요청이 503 오류로 실패할 확률
+        auth_error_rate: 요청이 401 오류로 실패할 확률 (재인증 경로 확인용)
+        max_concurrency: 동시에 처리되는 요청 수 한도 (초과 요청은 대기, None이면 무제한)
+        seed: 무작위 시드
+    """
+
+    id = 0
+    spreadsheet_id = 'fake-spreadsheet'
+
+    def __init__(self, latency=0.0, latency_jitter=0.0, per_cell_latency=0.0,
+                 quota_per_min=None, error_rate=0.0, auth_error_rate=0.0,
+                 max_concurrency=None, seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.per_cell_latency = per_cell_latency
+        self.quota_per_min = quota_per_min
+        self.error_rate = error_rate
+        self.auth_error_rate = auth_error_rate
+        self._random = random.Random(seed)
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._lock = threading.Lock()
+        self._request_times = deque()
+        self.rows = []
+        self.requests = Counter()   # 메서드별 요청 수
+        self.rejected = Counter()   # 오류 종류별 실패 수
+
+    # ========== 요청 시뮬레이션 ==========
+    def _request(self, method, cells_read=0):
+        if self._slots:
+            self._slots.acquire()
+        try:
+            with self._lock:
+                self.requests[method] += 1
+                now = time.monotonic()
+                while self._request_times and now - self._request_times[0] > 60:
+                    self._request_times.popleft()
+                self._request_times.append(now)
+                over_quota = self.quota_per_min is not None and len(self._request_times) > self.quota_per_min
+                roll = self._random.random()
+                jitter = self._random.uniform(0, self.latency_jitter) if self.latency_jitter else 0.0
+
+            time.sleep(self.latency + jitter + cells_read * self.per_cell_latency)
+
+            if over_quota:
+                self._reject('quota')
+                raise FakeAPIError(429, "Quota exceeded for quota metric 'Write requests'")
+            if roll < self.auth_error_rate:
+                self._reject('auth')
+                raise FakeAPIError(401, "Request had invalid authentication credentials")
+            if roll < self.auth_error_rate + self.error_rate:
+                self._reject('unavailable')
+                raise FakeAPIError(503, "The service is currently unavailable")
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    def _reject(self, reason):
+        with self._lock:
+            self.rejected[reason] += 1
+
+    def _cell_count(self):
+        with self._lock:
+            return sum(len(row) for row in self.rows)
+
+    # ========== gspread Worksheet 메서드 ==========
+    def get_all_values(self):
+        self._request('get_all_values', cells_read=self._cell_count())
+        with self._lock:
+            return [[self._to_cell(v) for v in row] for row in self.rows]
+
+    def row_values(self, row):
+        with self._lock:
+            values = list(self.rows[row - 1]) if len(self.rows) >= row else []
+        self._request('row_values', cells_read=len(values))
+        return [self._to_cell(v) for v in values]
+
+    def col_values(self, col):
+        with self._lock:
+            values = [row[col - 1] if len(row) >= col else None for row in self.rows]
+        self._request('col_values', cells_read=len(values))
+        return [self._to_cell(v) for v in values]
+
+    def append_row(self, values, value_input_option='RAW'):
+        self._request('append_row')
+        with self._lock:
+            self.rows.append(list(values))
+
+    def append_rows(self, values, value_input_option='RAW'):
+        self._request('append_rows')
+        with self._lock:
+            self.rows.extend(list(row) for row in values)
+
+    def insert_row(self, values, index=1, value_input_option='RAW'):
+        self._request('insert_row')
+        with self._lock:
+            self.rows.insert(index - 1, list(values))
+
+    @staticmethod
+    def _to_cell(value):
+        """Sheets API처럼 모든 값을 문자열로 돌려줌 (빈 칸은 '')"""
+        return '' if value is None else str(value)
+
+    # ========== 검사용 ==========
+    def header_count(self, header):
+        """시트 안에 헤더 행이 몇 번 들어 있는지 (중복 헤더 확인용)"""
+        header = list(header)
+        with self._lock:
+            return sum(1 for row in self.rows if list(row) == header)
+
+
+class FakeSheetsBackend:
+    """sheets_backup의 backend 인터페이스를 따르는 가짜 backend"""
+
+    name = 'fake'
+    available = True
+
+    def __init__(self, worksheet=None, **worksheet_options):
+        self.worksheet = worksheet or FakeWorksheet(**worksheet_options)
+        self.resets = 0
+
+    def open_worksheet(self):
+        return self.worksheet
+
+    def reset(self):
+        self.resets += 1
+
+    def is_auth_error(self, error):
+        return isinstance(error, FakeAPIError) and error.status_code == 401
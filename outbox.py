@@ -0,0 +1,452 @@
+"""결과 백업용 로컬 outbox + 백그라운드 업로더
+
+완료 화면은 결과 행을 data/outbox/outbox.jsonl 에 기록(fsync)만 하고 바로 끝난다.
+프로세스당 1개의 백그라운드 스레드가 모든 세션의 행을 모아 Google Sheets로 보낸다.
+
+- FLUSH_INTERVAL초마다 또는 FLUSH_MAX_ROWS행이 쌓이면 append_rows 한 번으로 전송
+- Sheets 쓰기 quota에 맞춘 token bucket으로 요청 속도 제한
+- 실패하면 지수 backoff로 다시 시도. 일시 오류가 아닌데 거부된 묶음은 한 행씩 다시 보내고,
+  MAX_REJECTIONS번 거부된 행은 failed로 기록해 뒤 행들을 막지 않게 함 (행 데이터는 파일에 남음)
+- backend를 쓸 수 없으면 (gspread 미설치 등) 행은 outbox에 남겨 두고 쓸 수 있게 될 때까지 기다림
+- 이전 프로세스가 남긴 대기 행은 앱의 첫 rerun에서 resume_pending()이 업로더를 시작해 보냄
+
+outbox 파일은 append-only 이벤트 로그이며 각 줄은 다음 중 하나:
+    {"op": "enqueue", "key", "header", "row", "created"}
+    {"op": "attempt", "key"}   전송 시작 (전송 도중 프로세스가 죽었는지 판단용)
+    {"op": "sent", "key"}      전송 완료
+    {"op": "failed", "key", "error"}   계속 거부되어 전송을 포기함 (dead letter)
+
+key(idempotency key)는 participant_id와 timestamp_start로 만든다. 같은 key는 한 번만
+전송되며, attempt 후 sent가 없는 행은 시트에 이미 있는지 확인한 뒤 다시 보낸다.
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+import sheets_backup
+
+OUTBOX_PATH = Path("data/outbox/outbox.jsonl")
+
+# idempotency key를 만드는 summary 컬럼
+KEY_COLUMNS = ('participant_id', 'timestamp_start')
+
+# 묶어서 보내기 (어느 쪽이든 먼저 도달하면 전송)
+FLUSH_INTERVAL = 5.0    # 가장 오래된 대기 행의 최대 대기 시간 (초)
+FLUSH_MAX_ROWS = 50     # 한 번에 보낼 최대 행 수
+
+# Google Sheets API 쓰기 quota (사용자/프로젝트당 분당 60 요청)
+SHEETS_WRITE_QUOTA_PER_MIN = 60
+SHEETS_WRITE_BURST = 10
+
+# 재시도 간격 (초)
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 300.0
+IDLE_POLL = 30.0  # 대기열이 비었을 때 확인 주기
+# 일시 오류가 아닌 거부를 이 횟수만큼 받은 행은 failed로 기록하고 넘어감
+MAX_REJECTIONS = 5
+
+
+def make_key(header, row):
+    """행의 idempotency key ('participant_id|timestamp_start')"""
+    return '|'.join('' if row[header.index(name)] is None else str(row[header.index(name)]) for name in KEY_COLUMNS)
+
+
+class Outbox:
+    """fsync로 내구성을 보장하는 append-only 결과 대기열
+
+    파일은 처음 접근할 때 한 번만 읽고, 이후 상태는 메모리에서 함께 갱신한다
+    (한 프로세스가 파일을 소유한다고 가정).
+    """
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries = {}     # key -> enqueue 기록 (전송 전)
+        self._attempted = set()
+        self._sent = set()     # 전송 완료된 key (같은 key 재등록 무시, compact 후에도 유지)
+        self._failed = {}      # 전송을 포기한 key -> (enqueue 기록, failed 기록)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path.exists():
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                except json.JSONDecodeError:
+                    # 기록 도중 종료되어 잘린 마지막 줄은 무시
+                    continue
+
+    def _apply(self, record):
+        op = record.get('op')
+        key = record.get('key')
+        if op == 'enqueue':
+            if key not in self._sent and key not in self._failed:
+                self._entries.setdefault(key, record)
+        elif op == 'attempt':
+            self._attempted.add(key)
+        elif op == 'sent':
+            self._entries.pop(key, None)
+            self._attempted.discard(key)
+            self._sent.add(key)
+        elif op == 'failed':
+            entry = self._entries.pop(key, None)
+            self._attempted.discard(key)
+            if entry is not None:
+                self._failed[key] = (entry, record)
+
+    def _append(self, records):
+        with self._lock:
+            self._load()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            for record in records:
+                self._apply(record)
+
+    def enqueue(self, header, row):
+        """결과 행 1개를 대기열에 기록하고 key를 반환"""
+        header = list(header)
+        key = make_key(header, row)
+        self._append([{
+            'op': 'enqueue',
+            'key': key,
+            'header': header,
+            'row': list(row),
+            'created': datetime.now().isoformat(),
+        }])
+        return key
+
+    def mark_attempt(self, keys):
+        self._append([{'op': 'attempt', 'key': key} for key in keys])
+
+    def mark_sent(self, keys):
+        self._append([{'op': 'sent', 'key': key} for key in keys])
+
+    def mark_failed(self, key, error):
+        self._append([{'op': 'failed', 'key': key, 'error': error}])
+
+    def pending(self, limit=None):
+        """아직 전송되지 않은 행 목록 (key 중복 제거, 기록 순서 유지)
+
+        Returns:
+            [{'key', 'header', 'row', 'created', 'attempted'}, ...]
+        """
+        with self._lock:
+            self._load()
+            entries = list(self._entries.values())[:limit]
+            return [
+                {'key': r['key'], 'header': r['header'], 'row': r['row'],
+                 'created': r.get('created'), 'attempted': r['key'] in self._attempted}
+                for r in entries
+            ]
+
+    def depth(self):
+        with self._lock:
+            self._load()
+            return len(self._entries)
+
+    def failed_count(self):
+        with self._lock:
+            self._load()
+            return len(self._failed)
+
+    def oldest_created(self):
+        """가장 오래된 대기 행의 기록 시각 (없으면 None)"""
+        with self._lock:
+            self._load()
+            for record in self._entries.values():
+                return datetime.fromisoformat(record['created']) if record.get('created') else datetime.now()
+            return None
+
+    def compact(self):
+        """전송 완료된 행의 데이터를 지우고 파일을 다시 씀 (원자적 교체)
+
+        전송 완료 key는 sent 기록으로 남겨 두어, 재시작 후 같은 key가 다시 등록되어도 중복 전송하지 않는다.
+        전송을 포기한 행은 나중에 확인할 수 있도록 데이터와 failed 기록을 함께 남긴다.
+        """
+        with self._lock:
+            self._load()
+            tmp_path = self.path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for key in self._sent:
+                    f.write(json.dumps({'op': 'sent', 'key': key}, ensure_ascii=False) + '\n')
+                for entry, failed in self._failed.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                    f.write(json.dumps(failed, ensure_ascii=False) + '\n')
+                for record in self._entries.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    if record['key'] in self._attempted:
+                        f.write(json.dumps({'op': 'attempt', 'key': record['key']}) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class TokenBucket:
+    """요청 속도 제한 (rate_per_sec만큼 채워지고 최대 capacity개까지 모임)"""
+
+    def __init__(self, rate_per_sec, capacity):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n=1):
+        """토큰 n개를 얻을 때까지 대기. 기다린 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return waited
+                shortfall = (n - self.tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
+
+
+class Uploader:
+    """모든 세션의 outbox 행을 묶어서 Sheets로 보내는 백그라운드 스레드 (프로세스당 1개)"""
+
+    def __init__(self, outbox, upload=None, find_existing=None,
+                 flush_interval=FLUSH_INTERVAL, flush_max_rows=FLUSH_MAX_ROWS,
+                 bucket=None, available=None, is_transient=None):
+        self.outbox = outbox
+        self._upload = upload or sheets_backup.append_rows_to_sheet
+        self._find_existing = find_existing or sheets_backup.find_existing_keys
+        self._available = available or (lambda: sheets_backup.get_backend().available)
+        self._is_transient = is_transient or sheets_backup.is_transient_error
+        self.flush_interval = flush_interval
+        self.flush_max_rows = flush_max_rows
+        self.bucket = bucket or TokenBucket(SHEETS_WRITE_QUOTA_PER_MIN / 60.0, SHEETS_WRITE_BURST)
+        self._wake = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.failures = 0
+        self.last_error = None
+        self.next_attempt = 0.0
+        self._suspects = set()   # 거부된 묶음에 있던 key (한 행씩 다시 보내서 거부된 행을 찾음)
+        self._rejections = {}    # key -> 혼자 보냈을 때 거부된 횟수
+        # 지표
+        self._metrics_lock = threading.Lock()
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.last_flush_rows = 0
+        self.throttle_wait_sec = 0.0
+        self.flush_latencies = deque(maxlen=500)  # 최근 전송 소요 시간 (초)
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="outbox-uploader", daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        """새 행이 들어왔음을 알림 (행 수 기준에 도달했으면 바로 전송)"""
+        self._wake.set()
+
+    def _backoff(self):
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _seconds_until_flush(self):
+        """다음 전송까지 남은 시간 (0이면 지금 전송, None이면 대기열이 비어 있음)"""
+        depth = self.outbox.depth()
+        if depth == 0:
+            return None
+        if not self._available():
+            return IDLE_POLL   # 행은 outbox에 그대로 두고 backend를 쓸 수 있게 되면 보냄
+        backoff = self.next_attempt - time.monotonic()
+        if backoff > 0:
+            return backoff
+        if depth >= self.flush_max_rows:
+            return 0.0
+        oldest = self.outbox.oldest_created()
+        age = (datetime.now() - oldest).total_seconds()
+        return max(0.0, self.flush_interval - age)
+
+    def _run(self):
+        if self.outbox.path.exists():
+            self.outbox.compact()
+        while True:
+            # 대기 시간을 계산하기 전에 비워야 그 사이에 온 notify()가 사라지지 않음
+            self._wake.clear()
+            wait = self._seconds_until_flush()
+            if wait is None:
+                wait = IDLE_POLL
+            elif wait <= 0:
+                self.drain_once()
+                continue
+            self._wake.wait(timeout=wait)
+
+    def drain_once(self):
+        """대기 중인 행(최대 flush_max_rows)을 헤더별로 묶어 전송. 남은 행 수를 반환
+
+        거부된 묶음에 있던 행이 남아 있으면 그중 한 행만 보낸다.
+        """
+        pending = self.outbox.pending(limit=self.flush_max_rows)
+        if not pending:
+            return 0
+        suspects = [entry for entry in pending if entry['key'] in self._suspects]
+        if suspects:
+            pending = suspects[:1]
+        keys = []
+        try:
+            groups = {}
+            for entry in pending:
+                groups.setdefault(tuple(entry['header']), []).append(entry)
+
+            for header, entries in groups.items():
+                header = list(header)
+                keys = []
+                # 전송 도중 중단됐던 행은 시트에 이미 들어갔는지 먼저 확인
+                if any(entry['attempted'] for entry in entries):
+                    self._throttle(len(KEY_COLUMNS))
+                    existing = self._find_existing(header, KEY_COLUMNS)
+                    already_sent = [e['key'] for e in entries if e['attempted'] and e['key'] in existing]
+                    if already_sent:
+                        self.outbox.mark_sent(already_sent)
+                    entries = [e for e in entries if e['key'] not in already_sent]
+                if not entries:
+                    continue
+
+                keys = [e['key'] for e in entries]
+                self._throttle(1)
+                self.outbox.mark_attempt(keys)
+                started = time.perf_counter()
+                self._upload(header, [e['row'] for e in entries])
+                elapsed = time.perf_counter() - started
+                self.outbox.mark_sent(keys)
+                self._suspects.difference_update(keys)
+                for key in keys:
+                    self._rejections.pop(key, None)
+                with self._metrics_lock:
+                    self.flushes += 1
+                    self.rows_flushed += len(keys)
+                    self.last_flush_rows = len(keys)
+                    self.flush_latencies.append(elapsed)
+
+            self.failures = 0
+            self.last_error = None
+            return self.outbox.depth()
+        except Exception as e:
+            self._record_failure(e, keys)
+            return self.outbox.depth()
+
+    def _record_failure(self, error, keys):
+        """전송 실패 처리 (keys: 보내다 실패한 행, 전송 전 단계에서 실패했으면 빈 목록)
+
+        일시 오류는 backoff 후 같은 묶음을 다시 보낸다. 그 밖의 거부는 묶음의 행을 한 행씩 다시 보내고,
+        혼자 보내서 MAX_REJECTIONS번 거부된 행은 failed로 기록한 뒤 바로 다음 행으로 넘어간다.
+        """
+        self.failures += 1
+        self.last_error = str(error)
+        if keys and not self._is_transient(error):
+            if len(keys) > 1:
+                self._suspects.update(keys)
+                self.next_attempt = 0.0
+                return
+            key = keys[0]
+            self._rejections[key] = self._rejections.get(key, 0) + 1
+            if self._rejections[key] >= MAX_REJECTIONS:
+                self.outbox.mark_failed(key, str(error))
+                self._rejections.pop(key)
+                self._suspects.discard(key)
+                self.failures = 0
+                self.next_attempt = 0.0
+                return
+        self.next_attempt = time.monotonic() + self._backoff()
+
+    def _throttle(self, n):
+        waited = self.bucket.acquire(n)
+        if waited:
+            with self._metrics_lock:
+                self.throttle_wait_sec += waited
+
+    def status(self):
+        """대기열 깊이와 전송 지표"""
+        with self._metrics_lock:
+            latencies = sorted(self.flush_latencies)
+            metrics = {
+                'flushes': self.flushes,
+                'rows_flushed': self.rows_flushed,
+                'last_flush_rows': self.last_flush_rows,
+                'throttle_wait_sec': round(self.throttle_wait_sec, 3),
+            }
+
+        def percentile(q):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1)
+
+        oldest = self.outbox.oldest_created()
+        metrics.update({
+            'queue_depth': self.outbox.depth(),
+            'oldest_age_sec': round((datetime.now() - oldest).total_seconds(), 1) if oldest else None,
+            'flush_latency_p50_ms': percentile(0.50),
+            'flush_latency_p95_ms': percentile(0.95),
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'retry_in_sec': round(max(0.0, self.next_attempt - time.monotonic()), 1),
+            'backend_available': self._available(),
+            'dead_lettered': self.outbox.failed_count(),
+        })
+        return metrics
+
+
+_outbox = Outbox()
+_uploader = Uploader(_outbox)
+_resumed = False
+
+
+def queue_backup(df):
+    """결과를 outbox에 기록하고 업로더를 깨움 (네트워크를 기다리지 않음)
+
+    backend를 지금 쓸 수 없어도 기록하며, 업로더가 쓸 수 있게 될 때까지 기다렸다가 보낸다.
+
+    Returns:
+        (성공 여부, 메시지)
+    """
+    try:
+        for row in sheets_backup.dataframe_to_rows(df):
+            _outbox.enqueue(df.columns.tolist(), row)
+    except Exception as e:
+        return False, f"백업 대기열 저장 실패: {str(e)}"
+
+    _uploader.start()
+    _uploader.notify()
+    return True, "백업 대기열에 저장"
+
+
+def resume_pending():
+    """이전 프로세스가 남긴 대기 행이 있으면 업로더 시작 (앱이 매 rerun 호출, 확인은 프로세스당 한 번)"""
+    global _resumed
+    if _resumed:
+        return
+    _resumed = True
+    try:
+        if _outbox.depth():
+            _uploader.start()
+    except Exception as e:  # outbox를 읽지 못해도 과제 진행은 막지 않음
+        print(f"outbox: {type(e).__name__}: {e}", file=sys.stderr)
+
+
+def get_uploader_status():
+    return _uploader.status()
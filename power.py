@@ -0,0 +1,204 @@
+"""조건당 시행 수 결정을 위한 Monte Carlo 검정력 시뮬레이터
+
+(조건당 시행 수 × 참가자 수 × 효과 크기) 격자의 각 점에서 가상 연구를 여러 번 반복해
+interference_negative(negative - neutral 정답 시행 평균 RT)의 집단 평균 = 0 검정(양측 one-sample t)의
+검정력을 추정한다. 참가자 모수와 RT 분포는 simulate.py와 같은 ex-Gaussian 모형을 쓴다.
+
+한 격자점의 반복은 (반복 수, 참가자 수) 행렬로 한 번에 계산한다. ex-Gaussian 시행 k개의 평균은
+정규분포 평균 + Gamma(k, tau)/k 이므로 시행을 하나씩 만들지 않고 참가자 × 조건 평균을 바로 뽑는다
+(method='trials'는 시행 단위로 만들어 평균을 내는 검증용 경로). 격자점들은 프로세스 풀에 나눠 계산한다.
+
+사용법:
+    python power.py                                   # 기본 격자, 검정력 80% 최소 시행 수
+    python power.py --trials 10 20 30 48 --participants 40 80 --effects 15 25 --reps 2000
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from simulate import (EFFECT_SD, ERROR_RATE, FIXATION_DURATION, ITI_MAX, ITI_MIN, MU_SD, RT_MU, RT_SIGMA,
+                      RT_TAU, TAU_SD)
+
+N_REPS = 2000
+ALPHA = 0.05
+TARGET_POWER = 0.8
+TAU_SHARE = 0.6            # 간섭 효과 중 tau(느린 꼬리)로 나타나는 비율 (simulate.CONDITION_EFFECTS와 비슷하게)
+MAX_BATCH_ELEMENTS = 4_000_000
+
+DEFAULT_TRIALS = (6, 8, 10, 12, 16, 20, 24, 32, 40, 48)
+DEFAULT_PARTICIPANTS = (20, 30, 40, 60, 80, 100, 150, 200)
+DEFAULT_EFFECTS_MS = (10, 20, 30)
+
+# 시행 하나의 평균 길이 (fixation + 평균 RT + 평균 ITI, 초) - 세션 길이 추정용
+TRIAL_SECONDS = FIXATION_DURATION + RT_MU + RT_TAU + (ITI_MIN + ITI_MAX) / 2
+
+
+def t_critical(alpha, df):
+    """양측 t 검정 기각값 (Cornish-Fisher 전개, df >= 3에서 오차 < 1e-3)
+
+    Args:
+        alpha: 유의수준
+        df: 자유도 (배열 가능)
+    """
+    z = NormalDist().inv_cdf(1 - alpha / 2)
+    v = np.asarray(df, dtype=np.float64)
+    g1 = (z ** 3 + z) / 4
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384
+    g4 = (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / 92160
+    return z + g1 / v + g2 / v ** 2 + g3 / v ** 3 + g4 / v ** 4
+
+
+def _cell_means(rng, n_trials, mu, sigma, tau, error_rate, method):
+    """참가자 × 조건 칸의 정답 시행 평균 RT (정답 시행이 없으면 nan)
+
+    Args:
+        n_trials: 조건당 시행 수
+        mu, sigma, tau, error_rate: (반복 수, 참가자 수) 배열
+        method: 'sufficient' (평균의 분포에서 바로 추출) 또는 'trials' (시행 단위)
+    """
+    if method == 'trials':
+        shape = mu.shape + (n_trials,)
+        rt = rng.normal(mu[..., None], sigma[..., None], shape) + rng.exponential(1.0, shape) * tau[..., None]
+        correct = rng.random(shape) >= error_rate[..., None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (rt * correct).sum(axis=-1) / correct.sum(axis=-1)
+    k = rng.binomial(n_trials, 1 - error_rate)
+    safe = np.maximum(k, 1)
+    means = mu + sigma * rng.standard_normal(mu.shape) / np.sqrt(safe) + rng.gamma(safe, tau) / safe
+    return np.where(k > 0, means, np.nan)
+
+
+def simulate_power(n_per_condition, n_participants, effect, n_reps=N_REPS, alpha=ALPHA, seed=None,
+                   method='sufficient'):
+    """격자점 하나의 검정력 (반복 전체를 batch 행렬 연산으로)
+
+    Args:
+        n_per_condition: 조건당 시행 수
+        n_participants: 참가자 수
+        effect: interference_negative 집단 평균 (초)
+        n_reps: 가상 연구 반복 수
+        alpha: 유의수준 (양측)
+        seed: 난수 시드 (int, SeedSequence 또는 Generator)
+        method: 'sufficient' 또는 'trials' (_cell_means 참고)
+
+    Returns:
+        dict: power, effect_mean (추정된 간섭 효과 평균, 초), effect_sd (반복 간 SD)
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    per_rep = n_participants * (n_per_condition if method == 'trials' else 1)
+    batch = max(1, min(n_reps, MAX_BATCH_ELEMENTS // max(per_rep, 1)))
+    rejected, estimates = 0, []
+    for start in range(0, n_reps, batch):
+        shape = (min(batch, n_reps - start), n_participants)
+        mu = RT_MU + rng.normal(0, MU_SD, shape)
+        sigma = rng.uniform(0.6, 1.4, shape) * RT_SIGMA
+        tau = np.maximum(RT_TAU + rng.normal(0, TAU_SD, shape), 0.02)
+        error_rate = rng.beta(2, 2 / ERROR_RATE - 2, shape)
+        neutral = _cell_means(rng, n_per_condition, mu, sigma, tau, error_rate, method)
+        negative = _cell_means(
+            rng, n_per_condition,
+            mu + (1 - TAU_SHARE) * effect + rng.normal(0, EFFECT_SD, shape), sigma,
+            np.maximum(tau + TAU_SHARE * effect + rng.normal(0, EFFECT_SD, shape), 0.01),
+            error_rate, method)
+
+        diff = negative - neutral
+        n = np.sum(~np.isnan(diff), axis=1)
+        mean = np.nanmean(diff, axis=1)
+        sd = np.nanstd(diff, axis=1, ddof=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = mean / (sd / np.sqrt(n))
+        rejected += int(np.count_nonzero((n >= 4) & (np.abs(t) > t_critical(alpha, np.maximum(n - 1, 3)))))
+        estimates.append(mean)
+    estimates = np.concatenate(estimates)
+    return {'power': rejected / n_reps, 'effect_mean': np.nanmean(estimates), 'effect_sd': np.nanstd(estimates)}
+
+
+def _run_points(points):
+    """격자점 묶음 계산 (작업자 프로세스)"""
+    return [simulate_power(n, p, effect, n_reps=reps, alpha=alpha, seed=seed, method=method)
+            for n, p, effect, reps, alpha, seed, method in points]
+
+
+def power_grid(trials=DEFAULT_TRIALS, participants=DEFAULT_PARTICIPANTS, effects_ms=DEFAULT_EFFECTS_MS,
+               n_reps=N_REPS, alpha=ALPHA, seed=None, jobs=None, method='sufficient'):
+    """(조건당 시행 수 × 참가자 수 × 효과 크기) 격자 전체의 검정력
+
+    격자점마다 SeedSequence에서 독립 난수열을 나눠 주므로 jobs 수와 관계없이 같은 seed면 같은 결과.
+
+    Args:
+        trials: 조건당 시행 수 목록
+        participants: 참가자 수 목록
+        effects_ms: interference_negative 효과 크기 목록 (ms)
+        n_reps: 격자점당 반복 수
+        alpha: 유의수준
+        seed: 난수 시드
+        jobs: 프로세스 수 (None이면 CPU 수, 1이면 풀 없이)
+        method: 'sufficient' 또는 'trials'
+
+    Returns:
+        pd.DataFrame - n_per_condition, participants, effect_ms, power, effect_mean_ms, session_min
+    """
+    grid = [(n, p, e) for e in effects_ms for p in participants for n in trials]
+    seeds = np.random.SeedSequence(seed).spawn(len(grid))
+    points = [(n, p, e / 1000, n_reps, alpha, s, method) for (n, p, e), s in zip(grid, seeds)]
+    jobs = jobs or os.cpu_count()
+    if jobs <= 1 or len(points) < 2:
+        results = _run_points(points)
+    else:
+        # 작업자당 여러 묶음 (시행 수가 큰 점이 한쪽에 몰리지 않도록 번갈아 나눔)
+        chunks = [points[i::jobs * 4] for i in range(jobs * 4)]
+        order = [i for c in range(jobs * 4) for i in range(c, len(points), jobs * 4)]
+        results = [None] * len(points)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            flat = [r for chunk in pool.map(_run_points, chunks) for r in chunk]
+        for position, result in zip(order, flat):
+            results[position] = result
+
+    df = pd.DataFrame(grid, columns=['n_per_condition', 'participants', 'effect_ms'])
+    df['power'] = [r['power'] for r in results]
+    df['effect_mean_ms'] = [r['effect_mean'] * 1000 for r in results]
+    df['session_min'] = df['n_per_condition'] * 3 * TRIAL_SECONDS / 60
+    return df
+
+
+def minimum_trials(grid, target=TARGET_POWER):
+    """참가자 수 × 효과 크기별로 목표 검정력에 도달하는 최소 조건당 시행 수 (없으면 nan)"""
+    reached = grid[grid['power'] >= target]
+    table = reached.groupby(['effect_ms', 'participants'])['n_per_condition'].min().unstack('participants')
+    return table.reindex(index=sorted(grid['effect_ms'].unique()), columns=sorted(grid['participants'].unique()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--trials', type=int, nargs='+', default=list(DEFAULT_TRIALS), help='조건당 시행 수')
+    parser.add_argument('--participants', type=int, nargs='+', default=list(DEFAULT_PARTICIPANTS))
+    parser.add_argument('--effects', type=float, nargs='+', default=list(DEFAULT_EFFECTS_MS), help='효과 크기 (ms)')
+    parser.add_argument('--reps', type=int, default=N_REPS)
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--target', type=float, default=TARGET_POWER)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--jobs', type=int, default=None, help='프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--out', default=None, help='격자 결과 CSV 저장 경로')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    grid = power_grid(args.trials, args.participants, args.effects, n_reps=args.reps, alpha=args.alpha,
+                      seed=args.seed, jobs=args.jobs)
+    print(f"{len(grid)} grid points × {args.reps} reps in {time.perf_counter() - started:.1f}s")
+    if args.out:
+        grid.to_csv(args.out, index=False)
+    for effect, table in grid.groupby('effect_ms'):
+        print(f"\npower, interference_negative = {effect:g} ms (rows: trials per condition)")
+        print(table.pivot(index='n_per_condition', columns='participants', values='power').round(2))
+    print(f"\nminimum trials per condition for power >= {args.target} (rows: effect ms)")
+    print(minimum_trials(grid, args.target))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""간섭 점수의 permutation split-half 신뢰도
+
+참가자 × 조건마다 정답 시행을 무작위로 두 절반으로 나눠 절반별 간섭 점수를 구하고,
+참가자 간 상관(절반 A vs 절반 B)을 Spearman-Brown으로 보정한다. 이를 수천 번 반복한 분포를 돌려준다.
+
+시행을 (참가자 × 조건, 최대 시행 수) 행렬로 모은 뒤, 분할 batch마다 행별 무작위 key의
+argpartition으로 절반 A를 고르고 행 합계를 한 번에 계산한다 (절반 B = 전체 합 - 절반 A).
+
+사용법:
+    python reliability.py --splits 5000 --seed 1
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis import CONDITIONS, EFFECTS, load_trials, trial_arrays
+
+N_SPLITS = 5000
+# 분할 batch 하나의 원소 수 상한 (batch × 참가자 × 조건 × 최대 시행 수)
+MAX_BATCH_ELEMENTS = 4_000_000
+
+
+def pack_trials(trials):
+    """정답 시행 RT를 (참가자 × 조건, 최대 시행 수) 행렬로 (빈 칸은 NaN)
+
+    Returns:
+        (participants, packed, counts) - packed는 (참가자 수, 3, M) float32, counts는 (참가자 수, 3)
+    """
+    if 'phase' in trials.columns:
+        trials = trials[trials['phase'] == 'experimental']
+    participants, participant_code, condition_code, correct, rt = trial_arrays(trials)
+    use = correct & (condition_code >= 0)
+    k = len(CONDITIONS)
+    group = participant_code[use] * k + condition_code[use]
+    order = np.argsort(group, kind='stable')
+    group, values = group[order], rt[use][order]
+
+    counts = np.bincount(group, minlength=len(participants) * k)
+    width = int(counts.max()) if len(counts) else 0
+    position = np.arange(len(group)) - (np.cumsum(counts) - counts)[group]
+    packed = np.full((len(participants) * k, width), np.nan, dtype=np.float32)
+    packed[group, position] = values
+    return participants, packed.reshape(len(participants), k, width), counts.reshape(-1, k)
+
+
+def _pearson(a, b):
+    """행(분할)마다 참가자 축 Pearson 상관 - a, b는 (분할 수, 참가자 수)"""
+    a = a - a.mean(axis=1, keepdims=True)
+    b = b - b.mean(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+
+
+def spearman_brown(r):
+    """반분 상관을 전체 길이 신뢰도로 보정: 2r / (1 + r)"""
+    return 2 * r / (1 + r)
+
+
+def split_half_distribution(trials, n_splits=N_SPLITS, seed=None):
+    """간섭 효과별 split-half 상관 분포
+
+    조건마다 정답 시행 n개를 무작위로 n//2개(절반 A)와 나머지(절반 B)로 나눈다.
+    모든 조건에서 정답 시행이 2개 이상인 참가자만 사용한다.
+
+    Args:
+        trials: 시행 단위 DataFrame (participant_id, condition, accuracy, rt)
+        n_splits: 무작위 분할 횟수
+        seed: 난수 시드
+
+    Returns:
+        (n, {effect: 길이 n_splits의 반분 상관 배열})
+    """
+    rng = np.random.default_rng(seed)
+    _, packed, counts = pack_trials(trials)
+    keep = (counts >= 2).all(axis=1)
+    packed, counts = packed[keep], counts[keep]
+    n, k, width = packed.shape
+    if n < 3:
+        return n, {effect: np.full(n_splits, np.nan) for effect in EFFECTS}
+
+    rows = packed.reshape(n * k, width)
+    row_counts = counts.reshape(-1)
+    half = row_counts // 2
+    totals = np.nansum(rows, axis=1, dtype=np.float64)
+    # 시행 수가 같은 행끼리 묶어서 패딩 없이 처리
+    groups = [(size, np.flatnonzero(row_counts == size)) for size in np.unique(row_counts)]
+
+    index = {name: i for i, name in enumerate(CONDITIONS)}
+    correlations = {effect: [] for effect in EFFECTS}
+    batch = max(1, min(n_splits, MAX_BATCH_ELEMENTS // max(rows.size, 1)))
+    for start in range(0, n_splits, batch):
+        size = min(batch, n_splits - start)
+        sum_a = np.empty((size, n * k))
+        for count, members in groups:
+            chosen = count // 2
+            values = rows[members, :count]
+            # 무작위 key의 작은 쪽 chosen개 = 크기 chosen인 무작위 부분집합
+            keys = rng.random((size, len(members), count), dtype=np.float32)
+            picked = np.argpartition(keys, chosen - 1, axis=2)[:, :, :chosen]
+            sum_a[:, members] = np.take_along_axis(
+                np.broadcast_to(values, keys.shape), picked, axis=2).sum(axis=2, dtype=np.float64)
+        mean_a = (sum_a / half).reshape(size, n, k)
+        mean_b = ((totals - sum_a) / (row_counts - half)).reshape(size, n, k)
+        for effect, (emotional, baseline) in EFFECTS.items():
+            e, b = index[emotional], index[baseline]
+            correlations[effect].append(_pearson(mean_a[:, :, e] - mean_a[:, :, b],
+                                                 mean_b[:, :, e] - mean_b[:, :, b]))
+    return n, {effect: np.concatenate(values) for effect, values in correlations.items()}
+
+
+def split_half_reliability(trials, n_splits=N_SPLITS, ci=0.95, seed=None):
+    """간섭 효과별 Spearman-Brown 보정 split-half 신뢰도 요약
+
+    Returns:
+        (pd.DataFrame, 분포 dict) - DataFrame(index: effect): n, splits, r_mean,
+        reliability (보정 신뢰도 평균), ci_low, ci_high / 분포는 effect별 보정 신뢰도 배열
+    """
+    n, correlations = split_half_distribution(trials, n_splits=n_splits, seed=seed)
+    alpha = (1 - ci) / 2
+    rows, distributions = {}, {}
+    for effect, r in correlations.items():
+        corrected = spearman_brown(r)
+        distributions[effect] = corrected
+        rows[effect] = {
+            'n': n,
+            'splits': len(r),
+            'r_mean': np.nanmean(r) if n >= 3 else np.nan,
+            'reliability': np.nanmean(corrected) if n >= 3 else np.nan,
+            'ci_low': np.nanquantile(corrected, alpha) if n >= 3 else np.nan,
+            'ci_high': np.nanquantile(corrected, 1 - alpha) if n >= 3 else np.nan,
+        }
+    return pd.DataFrame.from_dict(rows, orient='index'), distributions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--combined', default='data/combined', help='aggregate.py 통합 데이터셋 폴더')
+    parser.add_argument('--responses', default='data/responses', help='참가자별 저장 폴더')
+    parser.add_argument('--splits', type=int, default=N_SPLITS)
+    parser.add_argument('--ci', type=float, default=0.95)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    trials = load_trials(args.combined, args.responses)
+    result, _ = split_half_reliability(trials, n_splits=args.splits, ci=args.ci, seed=args.seed)
+    print(result.round(3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+"""rerun 단위 서버 계측 (opt-in)
+
+환경변수 STROOP_METRICS로 켠다 (쉼표로 여러 개 가능, 없으면 아무것도 하지 않음).
+
+    STROOP_METRICS=jsonl        data/metrics/reruns.jsonl 에 rerun마다 한 줄 (크기 기준 회전)
+    STROOP_METRICS=prometheus   http://127.0.0.1:9464/metrics 에 Prometheus text 형식으로 노출
+    STROOP_METRICS=jsonl,prometheus
+
+Prometheus 주소는 STROOP_METRICS_HOST(기본 127.0.0.1, 같은 서버의 수집기만 접근) / STROOP_METRICS_PORT로 바꾼다.
+
+rerun 하나의 기록:
+    {"ts", "session", "phase", "end", "wall_ms", "cpu_ms", "setup_ms", "elements", "element_bytes", "html_bytes",
+     "state_bytes"}
+
+- phase: 앱이 set_phase()로 마지막에 표시한 화면 (participant_info, instructions, practice, ...)
+- end: st.stop() → 'stop', st.rerun() → 'rerun', 새 위젯 이벤트로 중단 → 'interrupted',
+  처리되지 않은 예외 → 'error', 끝까지 실행 → 'end'
+- setup_ms: rerun 시작부터 첫 set_phase()까지 (session_state 초기화 + CSS)
+- cpu_ms: 스크립트 스레드의 CPU 시간 (time.thread_time)
+- elements / element_bytes: 화면으로 보낸 요소 수와 protobuf 크기
+- html_bytes: st.markdown 본문과 components.html srcdoc 크기 합
+- state_bytes: rerun이 끝날 때 session_state 추정 크기 (session_memory.estimate_bytes).
+  전체 state를 훑어야 하므로 세션의 phase가 바뀐 rerun과 STATE_SAMPLE_EVERY번째 rerun에서만 재고 나머지는 null
+
+계측은 st.stop / st.rerun / DeltaGenerator._enqueue와 Streamlit이 스크립트를 실행하는 함수
+(exec_func_with_error_handling)를 프로세스에서 한 번 감싸서 한다. 기록은 스크립트 실행이 끝나는 시점에
+같은 스레드에서 마무리하므로 다음 rerun까지의 대기 시간은 들어가지 않는다.
+hook은 첫 rerun 도중에 설치되므로 프로세스의 첫 rerun은 기록하지 않는다.
+세션 단위 프로파일링(session_profiler.py)도 같은 rerun/phase 경계를 쓴다.
+
+사용법 (요약):
+    python rerun_metrics.py                        # data/metrics/reruns.jsonl (+ 회전된 파일)
+    python rerun_metrics.py path/to/reruns.jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+METRICS_PATH = Path(os.environ.get("STROOP_METRICS_PATH", "data/metrics/reruns.jsonl"))
+METRICS_HOST = os.environ.get("STROOP_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("STROOP_METRICS_PORT", "9464"))
+SINKS = {s.strip() for s in os.environ.get("STROOP_METRICS", "").split(',') if s.strip()}
+ENABLED = bool(SINKS)
+# 프로파일링을 켤 수 있는 환경변수 (둘 다 없으면 session_profiler를 import하지도 않음)
+PROFILING_POSSIBLE = bool(os.environ.get("STROOP_PROFILE") or os.environ.get("STROOP_PROFILE_ALLOW") == "1")
+
+# JSONL 회전 (파일당 최대 크기, 보관할 이전 파일 수)
+ROTATE_BYTES = 10 * 2 ** 20
+ROTATE_BACKUPS = 5
+
+# Prometheus histogram 구간 (초)
+WALL_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+_logger = None
+
+
+# ========== 앱에서 부르는 함수 ==========
+
+def begin_rerun(profile=None):
+    """스크립트 맨 위에서 호출: 이번 rerun 기록 시작
+
+    Args:
+        profile: URL ?profile= 값 ('cprofile', 'pyinstrument'). STROOP_PROFILE_ALLOW=1 일 때만 받아들이며,
+            이 값이나 STROOP_PROFILE로 프로파일러가 정해지면 이 rerun을 프로파일해서 phase별로
+            data/profiles/에 쓴다 (session_profiler 참고)
+
+    STROOP_METRICS도 없고 프로파일러도 정해지지 않으면 (잘못된 ?profile= 값 포함) hook을 설치하지 않는다.
+    """
+    kind = None
+    if PROFILING_POSSIBLE:
+        import session_profiler
+        kind = session_profiler.resolve(profile)
+    if not ENABLED and kind is None:
+        return
+    if not _installed:
+        # 이번 rerun은 감싸기 전의 실행 함수 안에서 돌고 있어 끝을 알 수 없음
+        _install()
+        return
+    stale = getattr(_local, 'record', None)
+    if stale is not None:
+        # 끝을 기록하지 못한 rerun (정상적으로는 생기지 않음): 버림
+        _local.record = None
+        if stale['profile'] is not None:
+            import session_profiler
+            session_profiler.cancel(stale['profile'])
+    handle = session_profiler.start(kind) if kind else None
+    _local.record = {
+        'phase': 'setup',
+        'end': None,
+        'wall_start': time.perf_counter(),
+        'cpu_start': time.thread_time(),
+        'setup_ms': None,
+        'elements': 0,
+        'element_bytes': 0,
+        'html_bytes': 0,
+        'profile': handle,
+    }
+
+
+def set_phase(name):
+    """이번 rerun이 어느 화면 분기에 있는지 표시 (마지막 값이 기록됨)"""
+    record = getattr(_local, 'record', None)
+    if record is None:
+        return
+    if record['setup_ms'] is None:
+        record['setup_ms'] = (time.perf_counter() - record['wall_start']) * 1000
+    record['phase'] = name
+
+
+# ========== 계측 ==========
+
+def _session_id():
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def _state_bytes(phase):
+    """session_state 추정 크기 (이번 rerun이 측정 대상이 아니면 None)"""
+    import session_memory
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is None or not session_memory.size_due(ctx.session_id, phase):
+        return None
+    state_bytes = sum(session_memory.state_breakdown(ctx.session_state).values())
+    session_memory.record_size(ctx.session_id, phase, state_bytes)
+    return state_bytes
+
+
+def _finish(end):
+    record = _local.record
+    _local.record = None
+    wall_ms = (time.perf_counter() - record['wall_start']) * 1000
+    cpu_ms = (time.thread_time() - record['cpu_start']) * 1000
+    if record['profile'] is not None:
+        import session_profiler
+        session_profiler.stop(record['profile'], _session_id(), record['phase'])
+    if not ENABLED:
+        return
+    result = {
+        'ts': round(time.time(), 3),
+        'session': _session_id(),
+        'phase': record['phase'],
+        'end': end,
+        'wall_ms': round(wall_ms, 3),
+        'cpu_ms': round(cpu_ms, 3),
+        'setup_ms': None if record['setup_ms'] is None else round(record['setup_ms'], 3),
+        'elements': record['elements'],
+        'element_bytes': record['element_bytes'],
+        'html_bytes': record['html_bytes'],
+        'state_bytes': _state_bytes(record['phase']),
+    }
+    if 'jsonl' in SINKS:
+        _logger.info(json.dumps(result, ensure_ascii=False))
+    if 'prometheus' in SINKS:
+        _registry.observe(result)
+
+
+def _wrap_end(original, end):
+    def wrapper(*args, **kwargs):
+        record = getattr(_local, 'record', None)
+        if record is not None:
+            record['end'] = end
+        return original(*args, **kwargs)
+    wrapper.__wrapped__ = original
+    wrapper.__doc__ = original.__doc__
+    return wrapper
+
+
+def _wrap_enqueue(original):
+    def _enqueue(self, delta_type, element_proto, *args, **kwargs):
+        record = getattr(_local, 'record', None)
+        if record is not None:
+            record['elements'] += 1
+            record['element_bytes'] += element_proto.ByteSize()
+            if delta_type == 'markdown':
+                record['html_bytes'] += len(element_proto.body.encode('utf-8'))
+            elif delta_type == 'iframe' and element_proto.HasField('srcdoc'):
+                record['html_bytes'] += len(element_proto.srcdoc.encode('utf-8'))
+        return original(self, delta_type, element_proto, *args, **kwargs)
+    _enqueue.__wrapped__ = original
+    return _enqueue
+
+
+def _wrap_exec(original):
+    def exec_func_with_error_handling(func, ctx):
+        result = original(func, ctx)
+        record = getattr(_local, 'record', None)
+        if record is not None:
+            # (반환값, 오류 없이 끝남, rerun 요청, 조기 종료, 처리되지 않은 예외)
+            rerun_data, uncaught_exception = result[2], result[4]
+            _finish(record['end'] or ('interrupted' if rerun_data else 'error' if uncaught_exception else 'end'))
+        return result
+    exec_func_with_error_handling.__wrapped__ = original
+    return exec_func_with_error_handling
+
+
+def _install():
+    """st.stop / st.rerun / 요소 전송 / 스크립트 실행을 감싸고 sink를 준비 (프로세스당 1회)"""
+    global _installed, _logger
+    if _installed:
+        return
+    with _install_lock:
+        if _installed:
+            return
+        import streamlit as st
+        import streamlit.runtime.scriptrunner.script_runner as script_runner
+        from streamlit.delta_generator import DeltaGenerator
+
+        st.stop = _wrap_end(st.stop, 'stop')
+        st.rerun = _wrap_end(st.rerun, 'rerun')
+        DeltaGenerator._enqueue = _wrap_enqueue(DeltaGenerator._enqueue)
+        script_runner.exec_func_with_error_handling = _wrap_exec(script_runner.exec_func_with_error_handling)
+
+        if 'jsonl' in SINKS:
+            METRICS_PATH.parent.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(METRICS_PATH, maxBytes=ROTATE_BYTES, backupCount=ROTATE_BACKUPS,
+                                          encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _logger = logging.getLogger('stroop.rerun_metrics')
+            _logger.setLevel(logging.INFO)
+            _logger.propagate = False
+            _logger.addHandler(handler)
+        if 'prometheus' in SINKS:
+            _start_http_server(METRICS_HOST, METRICS_PORT)
+        _installed = True
+
+
+# ========== Prometheus ==========
+
+class _Registry:
+    """phase별 histogram/counter (프로세스 전체 누적)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wall = defaultdict(lambda: [0] * (len(WALL_BUCKETS) + 1))   # phase -> 구간별 개수 (+Inf 포함)
+        self.wall_sum = defaultdict(float)
+        self.cpu_sum = defaultdict(float)
+        self.html_bytes = defaultdict(int)
+        self.elements = defaultdict(int)
+        self.ends = defaultdict(int)   # (phase, end) -> 개수
+
+    def observe(self, result):
+        phase, wall = result['phase'], result['wall_ms'] / 1000
+        with self._lock:
+            counts = self.wall[phase]
+            for i, bound in enumerate(WALL_BUCKETS):
+                if wall <= bound:
+                    counts[i] += 1
+            counts[-1] += 1
+            self.wall_sum[phase] += wall
+            self.cpu_sum[phase] += result['cpu_ms'] / 1000
+            self.html_bytes[phase] += result['html_bytes']
+            self.elements[phase] += result['elements']
+            self.ends[(phase, result['end'])] += 1
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines += ['# HELP stroop_rerun_seconds Script rerun wall time by phase',
+                      '# TYPE stroop_rerun_seconds histogram']
+            for phase, counts in sorted(self.wall.items()):
+                for bound, count in zip(WALL_BUCKETS, counts):
+                    lines.append(f'stroop_rerun_seconds_bucket{{phase="{phase}",le="{bound}"}} {count}')
+                lines.append(f'stroop_rerun_seconds_bucket{{phase="{phase}",le="+Inf"}} {counts[-1]}')
+                lines.append(f'stroop_rerun_seconds_sum{{phase="{phase}"}} {self.wall_sum[phase]:.6f}')
+                lines.append(f'stroop_rerun_seconds_count{{phase="{phase}"}} {counts[-1]}')
+            for name, help_text, values, fmt in (
+                    ('stroop_rerun_cpu_seconds_total', 'Script thread CPU time by phase', self.cpu_sum, '.6f'),
+                    ('stroop_rerun_elements_total', 'Elements sent by phase', self.elements, 'd'),
+                    ('stroop_rerun_html_bytes_total', 'Markdown/iframe HTML bytes sent by phase',
+                     self.html_bytes, 'd')):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                lines += [f'{name}{{phase="{phase}"}} {value:{fmt}}' for phase, value in sorted(values.items())]
+            lines += ['# HELP stroop_reruns_total Reruns by phase and how they ended',
+                      '# TYPE stroop_reruns_total counter']
+            lines += [f'stroop_reruns_total{{phase="{phase}",end="{end}"}} {count}'
+                      for (phase, end), count in sorted(self.ends.items())]
+        import session_memory
+        memory = session_memory.get_stats()
+        lines += ['# HELP stroop_sessions Sessions seen within the idle timeout',
+                  '# TYPE stroop_sessions gauge',
+                  f'stroop_sessions {memory["sessions"]}',
+                  '# HELP stroop_session_state_bytes Estimated session_state size summed over tracked sessions',
+                  '# TYPE stroop_session_state_bytes gauge',
+                  f'stroop_session_state_bytes {memory["state_bytes"]}',
+                  '# HELP stroop_sessions_evicted_total Idle in-progress sessions slimmed by the reaper',
+                  '# TYPE stroop_sessions_evicted_total counter',
+                  f'stroop_sessions_evicted_total {memory["evicted"]}',
+                  '# HELP stroop_session_checkpoints_total Checkpoints written for reaped sessions',
+                  '# TYPE stroop_session_checkpoints_total counter',
+                  f'stroop_session_checkpoints_total {memory["checkpoints"]}']
+        return '\n'.join(lines) + '\n'
+
+
+_registry = _Registry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = _registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_http_server(host, port):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='stroop-metrics', daemon=True).start()
+    return server
+
+
+# ========== 요약 ==========
+
+def read_records(path=METRICS_PATH):
+    """JSONL 기록 읽기 (회전된 path.1 ... path.N 포함, 오래된 것부터)"""
+    path = Path(path)
+    rotated = [path.with_name(f"{path.name}.{i}") for i in range(ROTATE_BACKUPS, 0, -1)]
+    records = []
+    for file in [*rotated, path]:
+        if not file.exists():
+            continue
+        with open(file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def summarize(records):
+    """phase별 wall/CPU 백분위수와 평균 요소 수, HTML 크기, session_state 크기, 종료 방식 개수
+
+    Returns:
+        dict: phase -> {n, wall_p50, wall_p95, wall_p99, cpu_p50, cpu_p95, cpu_p99,
+                        elements_mean, html_kb_mean, state_kb_max, ends}
+    """
+    import numpy as np
+
+    by_phase = defaultdict(list)
+    for record in records:
+        by_phase[record['phase']].append(record)
+    summary = {}
+    for phase, rows in sorted(by_phase.items()):
+        wall = np.array([r['wall_ms'] for r in rows])
+        cpu = np.array([r['cpu_ms'] for r in rows])
+        ends = defaultdict(int)
+        for r in rows:
+            ends[r['end']] += 1
+        w50, w95, w99 = np.percentile(wall, [50, 95, 99])
+        c50, c95, c99 = np.percentile(cpu, [50, 95, 99])
+        summary[phase] = {
+            'n': len(rows),
+            'wall_p50': w50, 'wall_p95': w95, 'wall_p99': w99,
+            'cpu_p50': c50, 'cpu_p95': c95, 'cpu_p99': c99,
+            'elements_mean': float(np.mean([r['elements'] for r in rows])),
+            'html_kb_mean': float(np.mean([r['html_bytes'] for r in rows])) / 1024,
+            'state_kb_max': max((r.get('state_bytes') or 0 for r in rows), default=0) / 1024,
+            'ends': dict(ends),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', nargs='?', default=str(METRICS_PATH), help='rerun 기록 JSONL')
+    args = parser.parse_args()
+
+    summary = summarize(read_records(args.path))
+    if not summary:
+        print(f"no records in {args.path}")
+        return
+    print(f"{'phase':<20} {'n':>6} {'wall p50':>9} {'p95':>8} {'p99':>8} {'cpu p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'elems':>6} {'HTML KB':>8} {'state KB':>8}  ends")
+    for phase, s in summary.items():
+        ends = ' '.join(f"{end}={count}" for end, count in sorted(s['ends'].items()))
+        print(f"{phase:<20} {s['n']:6d} {s['wall_p50']:9.1f} {s['wall_p95']:8.1f} {s['wall_p99']:8.1f} "
+              f"{s['cpu_p50']:8.1f} {s['cpu_p95']:8.1f} {s['cpu_p99']:8.1f} {s['elements_mean']:6.1f} "
+              f"{s['html_kb_mean']:8.1f} {s['state_kb_max']:8.1f}  {ends}")
+
+
+if __name__ == '__main__':
+    main()
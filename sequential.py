@@ -0,0 +1,180 @@
+"""순차 효과(carry-over) 분석
+
+본 시행 순서는 create_exp_trials에서 자유롭게 섞이므로, 직전 시행의 조건이 현재 시행 RT에
+주는 영향(예: 부정 단어 다음 시행이 느려짐)과 오답 후 지연(post-error slowing)은 사후에 본다.
+
+시행을 (참가자, 블록, 시행 번호) 순으로 정렬한 뒤 배열을 lag만큼 밀어서 직전 시행 특징을 만든다.
+같은 참가자·블록 안에서 시행 번호가 정확히 lag만큼 앞선 경우만 짝으로 인정하므로
+블록 경계(휴식)를 넘거나 빠진 시행을 건너뛴 짝은 생기지 않는다.
+
+사용법:
+    python sequential.py                    # lag 1, 2 carry-over 효과와 post-error slowing
+    python sequential.py --lags 1 --trim
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis import (CONDITIONS, EFFECTS, N_RESAMPLES, format_ms, load_trials,
+                      summarize_scores, trial_arrays)
+
+LAGS = (1, 2)
+
+
+def _experimental(trials, mask=None):
+    """본 시행만 (mask도 같이 걸러서 반환)"""
+    if 'phase' not in trials.columns:
+        return trials, mask
+    experimental = (trials['phase'] == 'experimental').to_numpy()
+    return trials[experimental], None if mask is None else np.asarray(mask)[experimental]
+
+
+def _iti_before_next(trials):
+    """시행 뒤에 온 ITI (초) - 실측값, 없으면 계획값"""
+    iti = np.full(len(trials), np.nan)
+    for column in ('iti_planned', 'iti_actual'):
+        if column in trials.columns:
+            values = trials[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            iti = np.where(np.isnan(values), iti, values)
+    return iti
+
+
+def lag_index(participant_code, block, trial, lag):
+    """시행마다 lag개 앞 시행의 위치 (같은 참가자·블록에서 시행 번호가 lag만큼 앞선 시행, 없으면 -1)
+
+    Args:
+        participant_code, block, trial: 시행별 정수 배열 (정렬 안 돼 있어도 됨)
+        lag: 몇 시행 앞
+
+    Returns:
+        intp 배열 (원래 순서 기준 위치)
+    """
+    order = np.lexsort((trial, block, participant_code))
+    p, b, t = participant_code[order], block[order], trial[order]
+    previous = np.full(len(order), -1, dtype=np.intp)
+    if len(order) > lag:
+        same = (p[lag:] == p[:-lag]) & (b[lag:] == b[:-lag]) & (t[lag:] - t[:-lag] == lag)
+        previous[order[lag:][same]] = order[:-lag][same]
+    return previous
+
+
+def _sequence_arrays(trials):
+    """(participant_code, block, trial) 정수 배열 - block이 없으면 하나의 블록으로 봄"""
+    participant_code, _ = pd.factorize(trials['participant_id'])
+    block = (trials['block'].to_numpy(dtype=np.float64, na_value=-1).astype(np.int64)
+             if 'block' in trials.columns else np.zeros(len(trials), dtype=np.int64))
+    trial = (trials['trial'].to_numpy(dtype=np.float64, na_value=-1).astype(np.int64)
+             if 'trial' in trials.columns else np.arange(len(trials)))
+    return participant_code, block, trial
+
+
+def lag_features(trials, lags=LAGS):
+    """본 시행마다 직전 시행들의 조건, 정답 여부, ITI
+
+    Args:
+        trials: 시행 단위 DataFrame (participant_id, block, trial, condition, accuracy, rt, iti_*)
+        lags: 만들 lag 목록
+
+    Returns:
+        pd.DataFrame (본 시행 행, trials와 같은 index) - participant_id, block, trial, condition,
+        accuracy, rt와 lag마다 prev{lag}_condition, prev{lag}_accuracy, prev{lag}_iti
+        (prev{lag}_iti는 lag개 앞 시행과 그다음 시행 사이의 ITI, 짝이 없으면 결측)
+    """
+    trials, _ = _experimental(trials)
+    participant_code, block, trial = _sequence_arrays(trials)
+    _, _, condition_code, correct, _ = trial_arrays(trials)
+    accuracy = trials['accuracy'].to_numpy(dtype=np.float64, na_value=np.nan)
+    iti = _iti_before_next(trials)
+
+    columns = [c for c in ('participant_id', 'block', 'trial', 'condition', 'accuracy', 'rt') if c in trials.columns]
+    features = trials[columns].copy()
+    for lag in lags:
+        previous = lag_index(participant_code, block, trial, lag)
+        paired = previous >= 0
+        codes = np.where(paired, condition_code[previous], -1)
+        features[f'prev{lag}_condition'] = pd.Categorical.from_codes(codes, categories=list(CONDITIONS))
+        features[f'prev{lag}_accuracy'] = pd.array(np.where(paired, accuracy[previous], np.nan), dtype='Int8')
+        # lag개 앞 시행 뒤의 ITI = 그 시행과 다음 시행 사이 간격
+        features[f'prev{lag}_iti'] = np.where(paired, iti[previous], np.nan)
+    return features
+
+
+def carryover_scores(trials, lags=LAGS, mask=None):
+    """참가자별 carry-over 간섭 점수와 post-error slowing
+
+    - carryover_{조건}_lag{k}: k개 앞 시행이 정서 조건일 때 - neutral일 때의 현재 시행 평균 RT
+      (현재와 k개 앞 시행 모두 정답인 시행)
+    - post_error_slowing_lag{k}: k개 앞 시행이 오답/timeout일 때 - 정답일 때의 현재 정답 시행 평균 RT
+
+    Args:
+        trials: 시행 단위 DataFrame
+        lags: lag 목록
+        mask: 현재 시행으로 사용할 시행만 True인 bool 배열 (예: trimming 결과, 직전 시행 판단에는 안 씀)
+
+    Returns:
+        pd.DataFrame (index: participant_id, RT 단위는 초)
+    """
+    trials, mask = _experimental(trials, mask)
+    participant_code, block, trial = _sequence_arrays(trials)
+    participants, _, condition_code, correct, rt = trial_arrays(trials)
+    current = correct & (condition_code >= 0)
+    if mask is not None:
+        current &= np.asarray(mask, dtype=bool)
+    n, k = len(participants), len(CONDITIONS)
+    index = {name: i for i, name in enumerate(CONDITIONS)}
+
+    def grouped_means(use, group, n_groups):
+        key = participant_code[use] * n_groups + group[use]
+        counts = np.bincount(key, minlength=n * n_groups).reshape(n, n_groups)
+        sums = np.bincount(key, weights=rt[use], minlength=n * n_groups).reshape(n, n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts
+
+    scores = {}
+    for lag in lags:
+        previous = lag_index(participant_code, block, trial, lag)
+        paired = current & (previous >= 0)
+        previous_condition = np.where(previous >= 0, condition_code[previous], -1)
+        previous_correct = (previous >= 0) & correct[np.maximum(previous, 0)]
+
+        means = grouped_means(paired & previous_correct & (previous_condition >= 0), previous_condition, k)
+        for emotional, baseline in EFFECTS.values():
+            scores[f'carryover_{emotional}_lag{lag}'] = means[:, index[emotional]] - means[:, index[baseline]]
+        after = grouped_means(paired, previous_correct.astype(np.intp), 2)
+        scores[f'post_error_slowing_lag{lag}'] = after[:, 0] - after[:, 1]
+    return pd.DataFrame(scores, index=pd.Index(participants, name='participant_id'))
+
+
+def group_carryover(trials, lags=LAGS, n_resamples=N_RESAMPLES, ci=0.95, seed=None, mask=None):
+    """carry-over 효과와 post-error slowing의 집단 평균, bootstrap 신뢰구간, permutation p값
+
+    Returns:
+        pd.DataFrame (index: 효과 이름) - analysis.summarize_scores와 같은 컬럼 (RT 단위는 초)
+    """
+    scores = carryover_scores(trials, lags, mask)
+    return summarize_scores(scores, n_resamples, ci, np.random.default_rng(seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--combined', default='data/combined', help='aggregate.py 통합 데이터셋 폴더')
+    parser.add_argument('--responses', default='data/responses', help='참가자별 저장 폴더')
+    parser.add_argument('--lags', type=int, nargs='+', default=list(LAGS))
+    parser.add_argument('--resamples', type=int, default=N_RESAMPLES)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--trim', action='store_true', help='trimming.py 기본 기준으로 현재 시행 제외 후 분석')
+    args = parser.parse_args()
+
+    trials = load_trials(args.combined, args.responses)
+    mask = None
+    if args.trim:
+        from trimming import trim_trials
+        mask = (trim_trials(trials) == 'kept').to_numpy()
+    result = group_carryover(trials, lags=args.lags, n_resamples=args.resamples, seed=args.seed, mask=mask)
+    print(f"participants: {trials['participant_id'].nunique()}, trials: {len(trials)}")
+    print(format_ms(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+"""세션별 메모리 추정, 완료 세션 정리, 방치된 세션 회수
+
+- estimate_bytes(): session_state 값들의 크기 추정 (DataFrame은 memory_usage(deep=True),
+  numpy 배열은 nbytes, TrialPlan은 세션이 따로 가진 배열만, 나머지는 sys.getsizeof 재귀)
+- slim(): 데이터가 파일/outbox에 기록된 뒤 반응 기록, 시행 목록, 블록 러너 반환값을 비움
+- 회수: track()으로 등록된 세션이 IDLE_TIMEOUT초 동안 rerun이 없으면 백그라운드 스레드가 진행 중인
+  과제를 data/checkpoints/에 JSON으로 저장하고 slim()한 뒤 session_evicted를 표시한다. 탭을 열어 둔 채
+  떠났거나 닫은 세션도 다시 rerun하지 않아도 회수되며, 돌아오면 다음 rerun에서 세션 종료 안내가 나온다.
+
+환경변수 STROOP_IDLE_TIMEOUT (초, 기본 1800, 0이면 회수하지 않음)
+"""
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from trial_plan import TrialPlan
+
+CHECKPOINT_DIR = Path("data/checkpoints")
+IDLE_TIMEOUT = float(os.environ.get("STROOP_IDLE_TIMEOUT", "1800"))
+REAP_INTERVAL = 60.0
+# state 크기는 phase가 바뀌었을 때와 이 횟수의 rerun마다만 잰다 (전체 state를 훑으므로)
+STATE_SAMPLE_EVERY = 20
+
+# slim() 대상: session_state 키 -> 초기값 (앱의 session state 초기화와 같은 값)
+BULKY_DEFAULTS = {
+    'responses': list,
+    'practice_responses': list,
+    'practice_trials': lambda: None,
+    'exp_trials': lambda: None,
+    'breaks_shown': set,
+    'break_log': list,
+}
+# 블록 러너 / 휴식 타이머 컴포넌트가 돌려준 값 (블록 반응 전체가 들어 있음)
+COMPONENT_KEY_PREFIXES = ('block_runner_', 'break_timer_')
+
+# 체크포인트에 저장할 session_state 키
+CHECKPOINT_KEYS = ('participant_id', 'experiment_mode', 'practice_attempt', 'practice_trial_num', 'trial_num',
+                   'experiment_start_time', 'break_log', 'practice_responses', 'responses')
+
+
+def estimate_bytes(value, _seen=None):
+    """객체 크기 추정 (바이트, 공유 객체는 한 번만)"""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, TrialPlan):
+        return sys.getsizeof(value) + value.nbytes()
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_bytes(k, seen) + estimate_bytes(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_bytes(v, seen) for v in value)
+    return size
+
+
+def _state_items(state):
+    """st.session_state(프록시) 또는 SafeSessionState의 {key: value}"""
+    return state.filtered_state if hasattr(state, 'filtered_state') else state.to_dict()
+
+
+def state_breakdown(state):
+    """session_state 키별 추정 크기 {key: bytes} (큰 것부터)"""
+    seen = set()
+    sizes = {key: estimate_bytes(value, seen) for key, value in _state_items(state).items()}
+    return dict(sorted(sizes.items(), key=lambda item: -item[1]))
+
+
+def slim(state):
+    """저장이 끝난 세션의 큰 값을 비움 (화면 분기에 쓰는 작은 플래그는 유지)"""
+    for key, default in BULKY_DEFAULTS.items():
+        state[key] = default()
+    for key in list(_state_items(state)):
+        if key.startswith(COMPONENT_KEY_PREFIXES):
+            try:
+                del state[key]
+            except KeyError:
+                pass
+
+
+def write_checkpoint(state, directory=CHECKPOINT_DIR):
+    """진행 중인 세션의 반응 기록을 JSON으로 저장
+
+    Returns:
+        저장한 파일 경로
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    data = {key: state[key] for key in CHECKPOINT_KEYS if key in state}
+    data['checkpointed_at'] = datetime.now().isoformat()
+    participant = data.get('participant_id') or 'unknown'
+    path = directory / f"{participant}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_checkpoint.json"
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+class SessionReaper:
+    """rerun이 오래 없는 세션을 회수하는 백그라운드 스레드 (프로세스당 1개)
+
+    세션마다 마지막 rerun 시각, 마지막으로 잰 state 크기, session_state를 들고 있다. IDLE_TIMEOUT을
+    넘긴 세션은 목록에서 빼고 self._lock을 잡은 채 체크포인트 저장과 slim()을 한다. 그 세션이 그 사이
+    rerun을 시작해도 track()의 touch()가 같은 잠금에서 기다리므로, 스크립트가 state를 읽고 쓰는 것은
+    회수가 끝난 뒤(session_evicted 확인)부터다.
+    """
+
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, interval=REAP_INTERVAL):
+        self.idle_timeout = idle_timeout
+        self.interval = interval
+        self._lock = threading.Lock()
+        # session_id -> {'last_seen', 'state', 'state_bytes', 'sampled_phase', 'since_sample'}
+        self._sessions = {}
+        self._thread = None
+        self.evicted = 0
+        self.checkpoints = 0
+
+    def touch(self, session_id, state):
+        """이 세션의 마지막 활동 시각 갱신 (state: 회수할 때 비울 session_state)"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                self._sessions[session_id] = {'last_seen': time.monotonic(), 'state': state,
+                                              'state_bytes': None, 'sampled_phase': None, 'since_sample': 0}
+            else:
+                entry['last_seen'], entry['state'] = time.monotonic(), state
+        self.start()
+
+    def size_due(self, session_id, phase):
+        """이번 rerun에서 state 크기를 잴 차례인지 (phase가 바뀌었거나 STATE_SAMPLE_EVERY번째)"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return False
+            entry['since_sample'] += 1
+            return entry['sampled_phase'] != phase or entry['since_sample'] >= STATE_SAMPLE_EVERY
+
+    def record_size(self, session_id, phase, state_bytes):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry['state_bytes'], entry['sampled_phase'], entry['since_sample'] = state_bytes, phase, 0
+
+    def start(self):
+        if self.idle_timeout <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='stroop-session-reaper', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(min(self.interval, self.idle_timeout / 2))
+            self.reap()
+
+    def reap(self, now=None):
+        """idle_timeout을 넘긴 세션을 목록에서 빼고 회수, 회수한 세션 수 반환"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [sid for sid, entry in self._sessions.items() if now - entry['last_seen'] >= self.idle_timeout]
+            # 목록에서 빼는 것과 회수를 같은 잠금 안에서 (그 사이 돌아온 세션을 비우지 않도록)
+            evicted = sum(self.evict(self._sessions.pop(sid)['state']) for sid in idle)
+        # 프로파일링을 쓴 프로세스라면 이 세션의 메모리에 남은 프로파일도 파일로 내보내고 비움
+        profiler = sys.modules.get('session_profiler')
+        if profiler is not None:
+            for sid in idle:
+                profiler.flush(sid)
+        return evicted
+
+    def evict(self, state):
+        """진행 중인 과제를 체크포인트로 저장하고 비움, 회수했으면 True (reap()이 self._lock을 잡고 호출)"""
+        try:
+            if 'session_evicted' in state or not state['task_started'] or state['task_completed']:
+                return False   # 시작 전 / 이미 완료(저장 후 slim됨) / 이미 회수됨
+            checkpoint = ''
+            if state['responses'] or state['practice_responses']:
+                checkpoint = str(write_checkpoint(state))
+                self.checkpoints += 1
+            slim(state)
+            state['session_evicted'] = checkpoint
+            self.evicted += 1
+            return True
+        except Exception as e:  # 체크포인트 하나가 실패해도 다른 세션 회수는 계속
+            print(f"session reaper: {type(e).__name__}: {e}", file=sys.stderr)
+            return False
+
+    def stats(self):
+        """추적 중인 세션 수와 마지막으로 잰 state 크기 합"""
+        with self._lock:
+            sizes = [entry['state_bytes'] for entry in self._sessions.values() if entry['state_bytes'] is not None]
+            return {'sessions': len(self._sessions), 'state_bytes': sum(sizes), 'evicted': self.evicted,
+                    'checkpoints': self.checkpoints}
+
+
+_reaper = SessionReaper()
+
+
+def track():
+    """스크립트에서 매 rerun 호출: 이 세션의 마지막 활동 시각 갱신"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _reaper.touch(ctx.session_id, ctx.session_state)
+
+
+def size_due(session_id, phase):
+    return _reaper.size_due(session_id, phase)
+
+
+def record_size(session_id, phase, state_bytes):
+    _reaper.record_size(session_id, phase, state_bytes)
+
+
+def get_stats():
+    return _reaper.stats()
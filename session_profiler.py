@@ -0,0 +1,139 @@
+"""세션 단위 프로파일링 (opt-in)
+
+환경변수 STROOP_PROFILE=cprofile|pyinstrument 이면 모든 세션에 켠다.
+URL 파라미터 ?profile=cprofile (또는 ?profile=pyinstrument)로 한 세션만 켜는 것은 운영자가
+STROOP_PROFILE_ALLOW=1 을 준 경우에만 받아들인다 (공개 배포에서 참가자가 켤 수 없도록).
+둘 다 없으면 아무것도 하지 않는다.
+
+rerun 하나를 통째로 프로파일해서, rerun_metrics.set_phase()로 표시된 마지막 phase에 합친다.
+메모리에는 세션마다 지금 phase의 누적 결과 하나만 두고(최대 MAX_OPEN 세션), phase가 바뀌거나
+세션이 추적 목록에서 빠지거나(session_memory) 프로세스가 끝날 때 data/profiles/<session>/ 의 파일에 합쳐 쓴다.
+
+- cprofile     → <phase>.prof (pstats; snakeviz, flameprof, tuna 등으로 flame graph)
+- pyinstrument → <phase>.speedscope.json (https://www.speedscope.app 에서 열기)
+                 + <phase>.pyisession (다음에 합칠 원본)
+"""
+import atexit
+import cProfile
+import os
+import pstats
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from pyinstrument import Profiler as _SamplingProfiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    from pyinstrument.session import Session as _SamplingSession
+    PYINSTRUMENT_AVAILABLE = True
+except ImportError:
+    PYINSTRUMENT_AVAILABLE = False
+
+PROFILES_DIR = Path("data/profiles")
+PROFILERS = ('cprofile', 'pyinstrument')
+DEFAULT_PROFILER = os.environ.get("STROOP_PROFILE") or None
+ALLOW_URL = os.environ.get("STROOP_PROFILE_ALLOW") == "1"
+# 메모리에 누적 결과를 들고 있는 최대 세션 수 (넘으면 가장 오래 안 쓴 세션부터 파일로 내보냄)
+MAX_OPEN = 32
+
+_lock = threading.Lock()
+_open = OrderedDict()   # session -> (phase, kind, pstats.Stats 또는 pyinstrument Session)
+
+
+def resolve(requested):
+    """URL 파라미터 값 → 사용할 프로파일러 이름 (없거나 허용되지 않았거나 쓸 수 없으면 None)"""
+    kind = (requested if ALLOW_URL else None) or DEFAULT_PROFILER
+    if kind not in PROFILERS:
+        return None
+    if kind == 'pyinstrument' and not PYINSTRUMENT_AVAILABLE:
+        return None
+    return kind
+
+
+def start(kind):
+    """현재 스레드(이 세션의 스크립트 실행)에서 프로파일 시작, 시작하지 못하면 None"""
+    if kind == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 다른 프로파일러가 이미 동작 중 (Python 3.12+ sys.monitoring은 프로세스당 1개)
+            return None
+    else:
+        profiler = _SamplingProfiler(async_mode='disabled')
+        profiler.start()
+    return kind, profiler
+
+
+def cancel(handle):
+    """기록하지 않고 프로파일만 멈춤"""
+    kind, profiler = handle
+    if kind == 'cprofile':
+        profiler.disable()
+    else:
+        profiler.stop()
+
+
+def stop(handle, session, phase):
+    """프로파일을 멈추고 이 세션의 지금 phase 누적 결과에 합침 (phase가 바뀌었으면 이전 phase를 파일로)"""
+    cancel(handle)
+    kind, profiler = handle
+    if kind == 'cprofile':
+        result = pstats.Stats(profiler)
+    else:
+        result = profiler.last_session
+        if result is None:
+            return
+
+    with _lock:
+        current = _open.pop(session, None)
+        if current is not None and current[:2] == (phase, kind):
+            result = _combine(kind, current[2], result)
+        elif current is not None:
+            _write(session, *current)
+        _open[session] = (phase, kind, result)
+        while len(_open) > MAX_OPEN:
+            old_session, old = _open.popitem(last=False)
+            _write(old_session, *old)
+
+
+def flush(session=None):
+    """메모리에 있는 누적 결과를 파일로 쓰고 비움 (session이 None이면 전부)"""
+    with _lock:
+        sessions = list(_open) if session is None else [session]
+        for sid in sessions:
+            current = _open.pop(sid, None)
+            if current is not None:
+                _write(sid, *current)
+
+
+def _combine(kind, aggregate, result):
+    if kind == 'cprofile':
+        aggregate.add(result)
+        return aggregate
+    return _SamplingSession.combine(aggregate, result)
+
+
+def _write(session, phase, kind, aggregate):
+    """파일에 이미 있는 같은 phase 결과와 합쳐서 씀"""
+    out_dir = PROFILES_DIR / _safe_name(session or 'unknown')
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if kind == 'cprofile':
+        path = out_dir / f"{phase}.prof"
+        if path.exists():
+            aggregate.add(str(path))
+        aggregate.dump_stats(path)
+    else:
+        path = out_dir / f"{phase}.pyisession"
+        if path.exists():
+            aggregate = _SamplingSession.combine(_SamplingSession.load(path), aggregate)
+        aggregate.save(path)
+        (out_dir / f"{phase}.speedscope.json").write_text(SpeedscopeRenderer().render(aggregate), encoding='utf-8')
+
+
+def _safe_name(name):
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+
+
+atexit.register(flush)
@@ -0,0 +1,265 @@
+"""Google Sheets 백업
+
+시트 전체를 내려받지 않고 1행(헤더)만 확인한 뒤, 데이터는 append_rows 한 번으로 추가한다.
+한 번 확인한 헤더는 프로세스 안에서 기억해 두어 이후 백업은 API 호출 1회로 끝난다.
+인증된 client와 worksheet 핸들도 프로세스 단위로 캐시한다 (st.cache_resource).
+
+백업 대상은 backend로 교체할 수 있다. 기본은 실제 Google Sheets이며,
+환경변수 STROOP_SHEETS_BACKEND=fake 이면 로컬 가짜 시트(fake_sheets.py)를 쓴다.
+"""
+import math
+import os
+import threading
+import time
+
+import streamlit as st
+
+# Google Sheets 백업용
+try:
+    import gspread
+    from google.auth.exceptions import RefreshError, TransportError
+    from google.oauth2.service_account import Credentials
+    GSPREAD_AVAILABLE = True
+except ImportError:
+    GSPREAD_AVAILABLE = False
+
+# Spreadsheet ID (emotional stroop responses)
+SPREADSHEET_ID = "1qz17jEAWlJcP-erMPM99qRE9SPa2m7GqrYzzBnj25NE"
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+# 인증/시트 열기 횟수 (캐시 효과 확인용, get_backup_stats()로 조회)
+_stats_lock = threading.Lock()
+_stats = {
+    'backups': 0,           # 시트 쓰기(append_rows_to_sheet) 호출 수
+    'client_auths': 0,      # Credentials 생성 + gspread.authorize (토큰 발급 1회)
+    'worksheet_opens': 0,   # open_by_key + sheet1 (Drive/Sheets 메타데이터 조회)
+    'auth_retries': 0,      # 인증 오류로 캐시를 비우고 재시도한 횟수
+    'total_seconds': 0.0,   # 백업에 걸린 시간 합계
+}
+
+# 헤더 확인 + 쓰기를 한 세션씩만 하도록 (동시에 끝난 두 세션이 헤더를 중복 추가하지 않게)
+_header_lock = threading.Lock()
+# 이미 헤더를 확인한 워크시트: (spreadsheet id, worksheet id) -> 헤더 tuple
+_verified_headers = {}
+
+
+def dataframe_to_rows(df):
+    """DataFrame을 Sheets에 쓸 수 있는 값 목록으로 변환 (NaN → 빈 칸)"""
+    rows = []
+    for _, row in df.iterrows():
+        rows.append([None if isinstance(v, float) and math.isnan(v) else v for v in row.tolist()])
+    return rows
+
+
+def _worksheet_key(worksheet):
+    return (worksheet.spreadsheet_id, worksheet.id)
+
+
+def append_with_header(worksheet, header, rows):
+    """헤더를 확인하고 데이터 행을 한 번에 추가
+
+    - 시트가 비어 있으면 헤더와 데이터를 append_rows 한 번으로 추가
+    - 1행이 헤더와 다르면 맨 위에 헤더를 삽입 (기존 동작 유지)
+    - 확인한 헤더는 캐시해서 다음 호출부터는 1행도 읽지 않음
+
+    Args:
+        worksheet: gspread Worksheet (또는 같은 메서드를 가진 객체)
+        header: 컬럼 이름 리스트
+        rows: 데이터 행 리스트
+    """
+    key = _worksheet_key(worksheet)
+    header = list(header)
+
+    if _verified_headers.get(key) != tuple(header):
+        with _header_lock:
+            # lock을 기다리는 동안 다른 세션이 헤더를 확인했을 수 있으므로 다시 확인
+            if _verified_headers.get(key) != tuple(header):
+                first_row = worksheet.row_values(1)
+                if len(first_row) == 0:
+                    worksheet.append_rows([header] + rows)
+                    _verified_headers[key] = tuple(header)
+                    return
+                if first_row != header:
+                    # 첫 행이 헤더가 아니면 맨 위에 헤더 삽입
+                    worksheet.insert_row(header, 1)
+                _verified_headers[key] = tuple(header)
+
+    # 데이터 추가는 lock 밖에서 (헤더 확인이 끝난 뒤에는 세션끼리 기다리지 않음)
+    worksheet.append_rows(rows)
+
+
+def forget_header(worksheet):
+    """헤더 캐시 삭제 (시트가 수동으로 바뀌었거나 쓰기가 실패했을 때)"""
+    _verified_headers.pop(_worksheet_key(worksheet), None)
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+@st.cache_resource(show_spinner=False)
+def _get_client():
+    """인증된 gspread client (프로세스당 1개)
+
+    google-auth 세션이 만료된 access token을 자동으로 갱신하므로 재인증은
+    인증 오류가 났을 때만 필요하다.
+    """
+    # Streamlit secrets에서 credentials 가져오기
+    credentials_dict = st.secrets["gcp_service_account"]
+
+    credentials = Credentials.from_service_account_info(
+        dict(credentials_dict),
+        scopes=SCOPES
+    )
+    _count('client_auths')
+    return gspread.authorize(credentials)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_worksheet():
+    """백업 대상 worksheet 핸들 (프로세스당 1개, 첫 번째 시트 사용)"""
+    spreadsheet = _get_client().open_by_key(SPREADSHEET_ID)
+    _count('worksheet_opens')
+    return spreadsheet.sheet1
+
+
+def reset_connection():
+    """캐시된 client/worksheet를 버림 (다음 백업 때 다시 인증)"""
+    _get_worksheet.clear()
+    _get_client.clear()
+
+
+def _is_auth_error(error):
+    """토큰 만료/취소 등 다시 인증하면 해결될 수 있는 오류인지"""
+    if not GSPREAD_AVAILABLE:
+        return False
+    if isinstance(error, (RefreshError, TransportError)):
+        return True
+    if isinstance(error, gspread.exceptions.APIError):
+        return error.response.status_code == 401
+    return False
+
+
+# 다시 보내면 성공할 수 있는 HTTP 상태 (quota/rate limit, 서버 일시 오류)
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)
+
+
+def is_transient_error(error):
+    """인증, rate limit, 서버 일시 오류, 네트워크 오류처럼 다시 보내면 성공할 수 있는지
+
+    그 밖의 오류(400 잘못된 요청 등)는 같은 행을 다시 보내도 계속 거부된다.
+    """
+    if get_backend().is_auth_error(error) or isinstance(error, OSError):
+        return True
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status in TRANSIENT_STATUS
+
+
+class GoogleSheetsBackend:
+    """실제 Google Sheets backend (gspread)"""
+
+    name = 'google'
+    available = GSPREAD_AVAILABLE
+
+    def open_worksheet(self):
+        return _get_worksheet()
+
+    def reset(self):
+        reset_connection()
+
+    def is_auth_error(self, error):
+        return _is_auth_error(error)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """현재 backend (처음 호출 시 STROOP_SHEETS_BACKEND 환경변수로 결정)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if os.environ.get("STROOP_SHEETS_BACKEND") == "fake":
+                from fake_sheets import FakeSheetsBackend
+                _backend = FakeSheetsBackend()
+            else:
+                _backend = GoogleSheetsBackend()
+        return _backend
+
+
+def set_backend(backend):
+    """backend 교체 (벤치마크/오프라인 테스트용). 헤더 캐시도 초기화"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+    with _header_lock:
+        _verified_headers.clear()
+
+
+def get_backup_stats():
+    """백업 통계와 캐시로 절약한 인증 왕복 수
+
+    캐시가 없으면 백업마다 토큰 발급 1회 + 시트 열기 1회가 필요하므로,
+    절약한 왕복 수 = (backups - client_auths) + (backups - worksheet_opens).
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['auth_roundtrips_saved'] = max(0, 2 * stats['backups'] - stats['client_auths'] - stats['worksheet_opens'])
+    stats['mean_seconds'] = stats['total_seconds'] / stats['backups'] if stats['backups'] else None
+    return stats
+
+
+def append_rows_to_sheet(header, rows):
+    """헤더 확인 후 행 추가 (실패 시 예외). 인증 오류는 재인증 후 한 번 재시도"""
+    started = time.perf_counter()
+    backend = get_backend()
+    worksheet = None
+    try:
+        try:
+            worksheet = backend.open_worksheet()
+            append_with_header(worksheet, header, rows)
+        except Exception as e:
+            if not backend.is_auth_error(e):
+                raise
+            # 인증 오류: 캐시된 연결을 버리고 한 번만 다시 시도
+            _count('auth_retries')
+            backend.reset()
+            worksheet = backend.open_worksheet()
+            append_with_header(worksheet, header, rows)
+    except Exception:
+        if worksheet is not None:
+            forget_header(worksheet)
+        raise
+    finally:
+        _count('backups')
+        _count('total_seconds', time.perf_counter() - started)
+
+
+def find_existing_keys(header, key_columns):
+    """시트에 이미 있는 행의 key 집합 (key_columns 값을 '|'로 연결)
+
+    전송 도중 중단된 행을 다시 보내기 전에 중복 여부를 확인하는 용도.
+    필요한 컬럼만 읽는다.
+    """
+    worksheet = get_backend().open_worksheet()
+    columns = [worksheet.col_values(header.index(name) + 1)[1:] for name in key_columns]
+    return {'|'.join(values) for values in zip(*columns)}
+
+
+def backup_to_google_sheets(df):
+    """Google Sheets에 데이터 백업"""
+    if not get_backend().available:
+        return False, "gspread 라이브러리가 설치되지 않았습니다."
+
+    try:
+        append_rows_to_sheet(df.columns.tolist(), dataframe_to_rows(df))
+        return True, "Google Sheets 백업 완료"
+
+    except Exception as e:
+        return False, f"백업 실패: {str(e)}"
@@ -0,0 +1,396 @@
+"""가상 참가자 생성기 (데이터 파이프라인 부하 테스트용)
+
+create_exp_trials와 같은 방식(조건별 무작위 단어 n개, 무작위 색, ITI, 전체 무선화)으로 시행 목록을 만들고,
+조건 효과가 있는 ex-Gaussian RT, 오답, timeout, client/server RT 출처를 참가자 묶음 단위로 한 번에 생성한다.
+
+결과는 두 가지 경로로 쓸 수 있다.
+- 통합 데이터셋(long format): aggregate.py와 같은 형식의 part/manifest로 바로 기록 (analysis.py 등에서 --combined로 읽음)
+- 참가자별 파일: 앱의 save_data와 같은 요약 CSV + _trials.parquet, 선택적으로 outbox 백업 (가짜 시트로 전송)
+
+사용법:
+    python simulate.py --participants 100000                  # data/synthetic 통합 데이터셋
+    python simulate.py --participants 500 --files             # data/synthetic_responses에 참가자별 파일
+    python simulate.py --participants 500 --files --backup    # + outbox 백업 (가짜 시트)
+    python analysis.py --combined data/synthetic
+"""
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+
+from aggregate import _write_part, load_manifest, save_manifest
+from stimulus_store import get_exp_stimuli, get_practice_stimuli
+from trial_data import CATEGORIES, TRIAL_COLUMNS
+
+SYNTHETIC_DIR = Path("data/synthetic")
+SYNTHETIC_RESPONSES_DIR = Path("data/synthetic_responses")
+ID_PREFIX = "SIM"      # 실제 참가자 ID와 섞이지 않도록
+
+# ========== 앱과 같은 과제 설정 (stroop_streamlit_full.py 값 복사 - 앱 모듈은 import하면 화면을 그림) ==========
+MAX_RESPONSE_TIME = 3.0
+ITI_MIN, ITI_MAX = 0.8, 1.2
+FIXATION_DURATION = 0.5
+PRACTICE_FEEDBACK = 1.0      # 연습 시행 피드백 표시 시간 (초)
+BREAK_MIN, BREAK_MAX = 30, 120
+N_PER_CONDITION_FULL = 48
+TRIALS_PER_BLOCK = {48: 36, 10: 15}   # 조건당 시행 수 -> 블록당 시행 수 (full / pilot)
+
+# ========== 생성 모수 (초) ==========
+RT_MU, RT_SIGMA, RT_TAU = 0.55, 0.05, 0.12
+MU_SD, TAU_SD = 0.06, 0.03            # 참가자 간 변산
+# 조건별 (mu, tau) 효과 - 간섭은 주로 tau 꼬리에
+CONDITION_EFFECTS = {'positive': (0.005, 0.005), 'negative': (0.010, 0.015), 'neutral': (0.0, 0.0)}
+EFFECT_SD = 0.01                      # 참가자별 조건 효과 변산
+ERROR_RATE = 0.04                     # 평균 오답률 (참가자마다 beta 분포)
+LAPSE_RATE = 0.005                    # 반응하지 않는 시행 비율 (timeout)
+SERVER_RATE = 0.03                    # 클라이언트 RT를 못 받아 서버 RT로 기록되는 비율
+SERVER_OVERHEAD = 0.08                # 서버 RT에 더해지는 왕복 지연 평균
+ARRIVAL_INTERVAL = 45.0               # 참가자 세션 시작 간격 (초)
+
+CONDITIONS = ('positive', 'negative', 'neutral')
+CHUNK_PARTICIPANTS = 10000            # 통합 데이터셋 part 하나당 참가자 수
+
+# 코드 -> 범주 (trial_data.CATEGORIES 순서와 같게)
+_CONDITION_CODE = {name: CATEGORIES['condition'].index(name) for name in CATEGORIES['condition']}
+_TIMEOUT = CATEGORIES['response'].index('timeout')
+_SOURCE_CODE = {name: CATEGORIES['rt_source'].index(name) for name in CATEGORIES['rt_source']}
+
+
+def _seconds(values):
+    """초 단위 float 배열 -> timedelta64[us]"""
+    return np.round(np.asarray(values) * 1e6).astype(np.int64).astype('timedelta64[us]')
+
+
+def _sample_rows(rng, n_rows, population, k):
+    """행마다 range(population)에서 k개 비복원 추출 (random.sample과 같은 분포, 순서는 나중에 섞음)"""
+    keys = rng.random((n_rows, population), dtype=np.float32)
+    if k >= population:
+        return np.argsort(keys, axis=1)
+    return np.argpartition(keys, k - 1, axis=1)[:, :k]
+
+
+def _responses(rng, color, rt, error_rate, lapse_rate, server_rate):
+    """색과 RT로 반응, 정답 여부, 최종 RT, RT 출처 코드 생성"""
+    error = rng.random(rt.shape) < error_rate
+    response = np.where(error, 1 - color, color).astype(np.int8)
+    source = np.where(rng.random(rt.shape) < server_rate, _SOURCE_CODE['server'], _SOURCE_CODE['client']).astype(np.int8)
+    rt = rt + np.where(source == _SOURCE_CODE['server'], rng.exponential(SERVER_OVERHEAD, rt.shape), 0.0)
+    timeout = (rt >= MAX_RESPONSE_TIME) | (rng.random(rt.shape) < lapse_rate)
+    response[timeout] = _TIMEOUT
+    source[timeout] = _SOURCE_CODE['timeout']
+    rt = np.where(timeout, MAX_RESPONSE_TIME, rt)
+    accuracy = (response == color).astype(np.int8)
+    return response, accuracy, rt, source
+
+
+class SessionBatch:
+    """가상 참가자 묶음 (시행 값은 (참가자 수, 시행 수) 배열, 범주는 trial_data.CATEGORIES 코드)
+
+    exp / practice: dict - word (word_table 인덱스), condition, color, response, accuracy, rt,
+    rt_source, timestamp (datetime64[us]), iti_planned, iti_actual, block, trial
+    """
+
+    def __init__(self, participant_ids, start, exp, practice, breaks, n_per_condition):
+        self.participant_ids = participant_ids
+        self.start = start
+        self.exp = exp
+        self.practice = practice
+        self.breaks = breaks                  # (참가자 수, 블록 수 - 1) 휴식 시간 (초)
+        self.n_per_condition = n_per_condition
+
+    def __len__(self):
+        return len(self.participant_ids)
+
+    def trial_table(self, source_file=False):
+        """시행 단위 pyarrow Table (trial_data.build_trial_table과 같은 스키마, 참가자별 연습 -> 본 시행 순)
+
+        Args:
+            source_file: True면 aggregate.py 통합 데이터셋처럼 맨 앞에 source_file 컬럼 추가
+        """
+        exp_words, practice_words = get_exp_stimuli().word_table, get_practice_stimuli().word_table
+
+        def joined(name, offset=0):
+            return np.concatenate([self.practice[name] + offset, self.exp[name]], axis=1).ravel()
+
+        n_rows = len(self) * (self.practice['rt'].shape[1] + self.exp['rt'].shape[1])
+        per_row = n_rows // max(len(self), 1)
+
+        def dictionary(codes, values, decode=False):
+            array = pa.DictionaryArray.from_arrays(pa.array(codes), pa.array(list(values), pa.large_string()))
+            return array.dictionary_decode() if decode else array
+
+        participant = np.repeat(np.arange(len(self), dtype=np.int32), per_row)
+        phase = np.concatenate([np.zeros_like(self.practice['condition']), np.ones_like(self.exp['condition'])],
+                               axis=1).ravel()
+        columns = {
+            'participant_id': dictionary(participant, self.participant_ids, decode=True),
+            'phase': dictionary(phase.astype(np.int8), CATEGORIES['phase']),
+            'block': pa.array(joined('block')),
+            'trial': pa.array(joined('trial')),
+            # 연습 단어는 본 시행 단어 뒤에 이어 붙인 사전의 인덱스
+            'word': dictionary(joined('word', len(exp_words)).astype(np.int32), exp_words + practice_words,
+                               decode=True),
+            'condition': dictionary(joined('condition'), CATEGORIES['condition']),
+            'color': dictionary(joined('color'), CATEGORIES['color']),
+            'response': dictionary(joined('response'), CATEGORIES['response']),
+            'accuracy': pa.array(joined('accuracy')),
+            'rt': pa.array(joined('rt')),
+            'rt_source': dictionary(joined('rt_source'), CATEGORIES['rt_source']),
+            'timestamp': pa.array(np.datetime_as_string(joined('timestamp'), unit='us'), pa.large_string()),
+            'iti_planned': pa.array(joined('iti_planned'), from_pandas=True),
+            'iti_actual': pa.array(joined('iti_actual'), from_pandas=True),
+        }
+        table = pa.table([columns[name] for name in TRIAL_COLUMNS], names=TRIAL_COLUMNS)
+        if source_file:
+            names = [f"{pid}_synthetic.csv" for pid in self.participant_ids]
+            table = table.add_column(0, 'source_file', dictionary(participant, names, decode=True))
+        return table
+
+    def session(self, i):
+        """i번째 참가자를 앱의 session_state 기록 형식으로 (summary.build_summary_row 인자)
+
+        Returns:
+            dict: participant_id, responses, practice_responses, start_time, end_time, break_log
+        """
+        participant_id = self.participant_ids[i]
+        records = {}
+        for phase, data, words in (('practice', self.practice, get_practice_stimuli().word_table),
+                                   ('experimental', self.exp, get_exp_stimuli().word_table)):
+            rows = []
+            for j in range(data['rt'].shape[1]):
+                rows.append({
+                    'participant_id': participant_id,
+                    'word': words[data['word'][i, j]],
+                    'condition': CATEGORIES['condition'][data['condition'][i, j]],
+                    'color': CATEGORIES['color'][data['color'][i, j]],
+                    'response': CATEGORIES['response'][data['response'][i, j]],
+                    'accuracy': int(data['accuracy'][i, j]),
+                    'rt': float(data['rt'][i, j]),
+                    'rt_source': CATEGORIES['rt_source'][data['rt_source'][i, j]],
+                    'timestamp': data['timestamp'][i, j].item().isoformat(),
+                    'phase': phase,
+                    'block': int(data['block'][i, j]),
+                    'trial': int(data['trial'][i, j]),
+                })
+                if phase == 'experimental':
+                    rows[-1]['iti_planned'] = float(data['iti_planned'][i, j])
+                    rows[-1]['iti_actual'] = float(data['iti_actual'][i, j])
+            records[phase] = rows
+        break_log = [{'block': b + 1, 'duration_sec': round(float(d), 2),
+                      'ended_by': 'auto' if d >= BREAK_MAX else 'key'} for b, d in enumerate(self.breaks[i])]
+        return {
+            'participant_id': participant_id,
+            'responses': records['experimental'],
+            'practice_responses': records['practice'],
+            'start_time': self.start[i].item(),
+            'end_time': (self.exp['timestamp'][i, -1] + _seconds(self.exp['iti_planned'][i, -1])).item(),
+            'break_log': break_log,
+        }
+
+
+def simulate_sessions(n_participants, n_per_condition=N_PER_CONDITION_FULL, seed=None, first_index=0,
+                      effects=None, started_at=None):
+    """가상 참가자 n명의 연습 + 본 시행 기록을 한 번에 생성
+
+    Args:
+        n_participants: 참가자 수
+        n_per_condition: 조건별 시행 수 (48 = full, 10 = pilot)
+        seed: 난수 시드 (int 또는 np.random.Generator)
+        first_index: 참가자 번호 시작값 (ID는 SIM000001 형식)
+        effects: 조건별 (mu, tau) 효과 dict (기본 CONDITION_EFFECTS)
+        started_at: 첫 참가자 시작 시각 (기본 2025-03-01 09:00)
+
+    Returns:
+        SessionBatch
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    effects = effects or CONDITION_EFFECTS
+    exp_stimuli, practice_stimuli = get_exp_stimuli(), get_practice_stimuli()
+    p, n = n_participants, n_per_condition
+    n_trials = n * len(CONDITIONS)
+    per_block = TRIALS_PER_BLOCK.get(n, n_trials)
+
+    # 시행 목록: 조건별 n개 비복원 추출 + 무작위 색 + ITI, 전체 무선화
+    word = np.concatenate([exp_stimuli.word_index(c, _sample_rows(rng, p, exp_stimuli.size(c), n))
+                           for c in CONDITIONS], axis=1).astype(np.int16)
+    condition = np.repeat(np.array([_CONDITION_CODE[c] for c in CONDITIONS], dtype=np.int8), n)[None, :]
+    order = np.argsort(rng.random((p, n_trials), dtype=np.float32), axis=1)
+    word = np.take_along_axis(word, order, axis=1)
+    condition = np.take_along_axis(np.broadcast_to(condition, (p, n_trials)), order, axis=1)
+    color = rng.integers(0, 2, (p, n_trials), dtype=np.int8)
+    iti = rng.uniform(ITI_MIN, ITI_MAX, (p, n_trials))
+
+    # 참가자별 ex-Gaussian 모수 + 조건 효과
+    mu = RT_MU + rng.normal(0, MU_SD, p)
+    sigma = rng.uniform(0.6, 1.4, p) * RT_SIGMA
+    tau = np.maximum(RT_TAU + rng.normal(0, TAU_SD, p), 0.02)
+    effect = np.array([effects[c] for c in CONDITIONS])            # (3, 2)
+    shift = effect[None, :, :] + rng.normal(0, EFFECT_SD, (p, len(CONDITIONS), 2))
+    cell = condition.astype(np.intp)
+    rows = np.arange(p)[:, None]
+    trial_mu = mu[:, None] + shift[rows, cell, 0]
+    trial_tau = np.maximum(tau[:, None] + shift[rows, cell, 1], 0.01)
+    rt = rng.normal(trial_mu, sigma[:, None]) + rng.exponential(1.0, (p, n_trials)) * trial_tau
+    error_rate = rng.beta(2, 2 / ERROR_RATE - 2, p)[:, None]
+    response, accuracy, rt, source = _responses(rng, color, rt, error_rate, LAPSE_RATE, SERVER_RATE)
+
+    # 연습 시행: 연습 단어 전체를 무작위 순서로
+    n_practice = len(practice_stimuli.word_table)
+    practice_word = np.argsort(rng.random((p, n_practice), dtype=np.float32), axis=1).astype(np.int16)
+    practice_color = rng.integers(0, 2, (p, n_practice), dtype=np.int8)
+    practice_rt = rng.normal(mu[:, None] + 0.05, sigma[:, None]) + rng.exponential(1.0, (p, n_practice)) * tau[:, None]
+    practice_response, practice_accuracy, practice_rt, practice_source = _responses(
+        rng, practice_color, practice_rt, error_rate, LAPSE_RATE, SERVER_RATE)
+
+    # 시각: 연습 -> 안내 화면 -> 블록 (블록 사이 휴식)
+    start = (np.datetime64(started_at or datetime(2025, 3, 1, 9, 0), 'us')
+             + _seconds((first_index + np.arange(p)) * ARRIVAL_INTERVAL))
+    practice_duration = FIXATION_DURATION + practice_rt + PRACTICE_FEEDBACK
+    practice_onset = np.cumsum(practice_duration, axis=1) - practice_duration + FIXATION_DURATION
+    exp_start = practice_duration.sum(axis=1) + rng.uniform(20, 60, p)
+    n_blocks = -(-n_trials // per_block)
+    breaks = np.minimum(BREAK_MIN + rng.exponential(15, (p, n_blocks - 1)), BREAK_MAX)
+    duration = FIXATION_DURATION + rt + iti
+    gap = np.zeros((p, n_trials))
+    gap[:, per_block::per_block] = breaks + rng.uniform(2, 5, breaks.shape)   # 휴식 + 블록 안내 화면
+    onset = exp_start[:, None] + np.cumsum(duration + gap, axis=1) - duration + FIXATION_DURATION
+
+    trial = np.arange(1, n_trials + 1, dtype=np.int16)
+    exp = {
+        'word': word, 'condition': condition, 'color': color, 'response': response, 'accuracy': accuracy,
+        'rt': rt, 'rt_source': source, 'iti_planned': iti,
+        # 블록 러너가 재는 실제 ITI (프레임 단위로 조금 길어짐)
+        'iti_actual': iti + rng.uniform(0, 0.017, (p, n_trials)),
+        'timestamp': start[:, None] + _seconds(onset + rt),
+        'block': np.broadcast_to(((trial - 1) // per_block + 1).astype(np.int8), (p, n_trials)),
+        'trial': np.broadcast_to(trial, (p, n_trials)),
+    }
+    practice = {
+        'word': practice_word,
+        'condition': np.full((p, n_practice), _CONDITION_CODE['practice'], dtype=np.int8),
+        'color': practice_color, 'response': practice_response, 'accuracy': practice_accuracy,
+        'rt': practice_rt, 'rt_source': practice_source,
+        'iti_planned': np.full((p, n_practice), np.nan), 'iti_actual': np.full((p, n_practice), np.nan),
+        'timestamp': start[:, None] + _seconds(practice_onset + practice_rt),
+        'block': np.zeros((p, n_practice), dtype=np.int8),
+        'trial': np.broadcast_to(np.arange(1, n_practice + 1, dtype=np.int16), (p, n_practice)),
+    }
+    ids = [f"{ID_PREFIX}{i:06d}" for i in range(first_index + 1, first_index + p + 1)]
+    return SessionBatch(ids, start, exp, practice, breaks, n)
+
+
+def write_combined(n_participants, out_dir=SYNTHETIC_DIR, chunk=CHUNK_PARTICIPANTS, seed=None, **options):
+    """가상 참가자를 통합 데이터셋(aggregate.py 형식)의 trials part로 바로 기록
+
+    참가자 chunk명마다 part 하나를 쓰고 manifest에 참가자별 가상 원본 이름을 등록하므로
+    aggregate.load_combined / analysis.py --combined 로 그대로 읽을 수 있다.
+    기존 데이터셋이 있으면 이어서 추가한다 (참가자 번호도 이어짐).
+
+    Returns:
+        dict: participants, trial_rows, parts, seconds
+    """
+    started = time.perf_counter()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    rng = np.random.default_rng(seed)
+    first = len(manifest['files'])
+    trial_rows = parts = 0
+    for offset in range(0, n_participants, chunk):
+        batch = simulate_sessions(min(chunk, n_participants - offset), seed=rng, first_index=first + offset,
+                                  **options)
+        table = batch.trial_table(source_file=True)
+        part = manifest['next_part']
+        _write_part(out_dir, 'trials', part, table)
+        for pid in batch.participant_ids:
+            manifest['files'][f"{pid}_synthetic.csv"] = {'size': 0, 'mtime_ns': 0, 'part': part}
+        manifest['next_part'] = part + 1
+        save_manifest(out_dir, manifest)
+        trial_rows += table.num_rows
+        parts += 1
+    return {'participants': n_participants, 'trial_rows': trial_rows, 'parts': parts,
+            'seconds': time.perf_counter() - started}
+
+
+def write_session_files(n_participants, responses_dir=SYNTHETIC_RESPONSES_DIR, seed=None, backup=False,
+                        drain_timeout=300.0, **options):
+    """가상 참가자마다 앱과 같은 경로로 저장 (build_summary_row -> save_session -> outbox 백업)
+
+    Args:
+        backup: True면 결과 행을 outbox에 넣고 업로더가 모두 보낼 때까지 기다림.
+            가상 데이터가 실제 시트로 가지 않도록 항상 가짜 시트(fake_sheets)를 쓰고,
+            outbox 파일도 앱과 따로 responses_dir/outbox.jsonl에 둔다.
+        drain_timeout: 백업 대기 최대 시간 (초)
+
+    Returns:
+        dict: participants, files, seconds, backup (업로더 상태, backup=False면 None)
+    """
+    from summary import build_summary_row
+    from trial_data import save_session
+
+    started = time.perf_counter()
+    responses_dir = Path(responses_dir)
+    existing = len(list(responses_dir.glob('*.csv'))) if responses_dir.exists() else 0
+    batch = simulate_sessions(n_participants, seed=seed, first_index=existing, **options)
+
+    box = uploader = None
+    if backup:
+        import outbox
+        import sheets_backup
+        from fake_sheets import FakeSheetsBackend
+        sheets_backup.set_backend(FakeSheetsBackend(latency=0.2))
+        responses_dir.mkdir(parents=True, exist_ok=True)
+        box = outbox.Outbox(responses_dir / 'outbox.jsonl')
+        uploader = outbox.Uploader(box)
+        uploader.start()
+
+    for i in range(len(batch)):
+        session = batch.session(i)
+        df = build_summary_row(**session)
+        save_session(responses_dir, session['participant_id'], df, session['responses'],
+                     session['practice_responses'], saved_at=session['end_time'])
+        if box is not None:
+            # outbox.queue_backup과 같은 순서 (모듈 전역 outbox 대신 별도 파일)
+            for row in sheets_backup.dataframe_to_rows(df):
+                box.enqueue(df.columns.tolist(), row)
+            uploader.notify()
+
+    if box is not None:
+        deadline = time.perf_counter() + drain_timeout
+        while box.depth() > 0 and time.perf_counter() < deadline:
+            time.sleep(0.1)
+    return {'participants': n_participants, 'files': n_participants * 2,
+            'seconds': time.perf_counter() - started, 'backup': uploader.status() if uploader else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--participants', type=int, default=1000)
+    parser.add_argument('--pilot', action='store_true', help='pilot 모드 (조건당 10시행)')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--files', action='store_true', help='참가자별 요약 CSV + _trials.parquet로 저장')
+    parser.add_argument('--backup', action='store_true', help='--files와 함께: outbox -> 가짜 시트 백업까지')
+    parser.add_argument('--out', default=None, help=f'저장 폴더 (기본: {SYNTHETIC_DIR} 또는 {SYNTHETIC_RESPONSES_DIR})')
+    parser.add_argument('--chunk', type=int, default=CHUNK_PARTICIPANTS, help='통합 데이터셋 part당 참가자 수')
+    args = parser.parse_args()
+
+    n_per_condition = 10 if args.pilot else N_PER_CONDITION_FULL
+    if args.files:
+        result = write_session_files(args.participants, args.out or SYNTHETIC_RESPONSES_DIR, seed=args.seed,
+                                     backup=args.backup, n_per_condition=n_per_condition)
+        print(f"wrote {result['files']} files for {result['participants']} participants "
+              f"in {result['seconds']:.2f}s")
+        if result['backup']:
+            print(f"backup (fake sheet): {result['backup']}")
+    else:
+        result = write_combined(args.participants, args.out or SYNTHETIC_DIR, chunk=args.chunk, seed=args.seed,
+                                n_per_condition=n_per_condition)
+        print(f"wrote {result['participants']} participants / {result['trial_rows']} trials "
+              f"in {result['parts']} parts, {result['seconds']:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
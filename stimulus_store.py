@@ -0,0 +1,116 @@
+"""자극 단어 저장소 (프로세스당 1회 로드)
+
+stimuli/*.csv를 참가자마다 다시 읽지 않고 프로세스 안에서 한 번만 읽어 둔다.
+파일의 mtime이 바뀌면 다음 조회 때 다시 읽는다.
+카테고리(positive/negative/neutral)별로 단어와 속성(valence, arousal, familiarity, 품사)을
+배열로 나눠 두므로, 시행 목록 생성은 인덱스 샘플링만 하면 된다.
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STIMULI_DIR = Path(__file__).resolve().parent / "stimuli"
+EXP_STIMULI_PATH = STIMULI_DIR / "final_144_words.csv"
+PRACTICE_STIMULI_PATH = STIMULI_DIR / "final_practice_words.csv"
+
+# 카테고리별로 보관하는 컬럼 (CSV 컬럼명 -> 저장 이름)
+FIELDS = {
+    'word': 'word',
+    'valence': 'valence',
+    'arousal': 'arousal',
+    'familiarity': 'familiarity',
+    '품사': 'pos',
+}
+NUMERIC_FIELDS = ('valence', 'arousal', 'familiarity')
+
+
+class StimulusSet:
+    """CSV 파일 하나의 단어 목록 (카테고리별 배열)
+
+    Args:
+        path: 자극 CSV 경로 (word, category, 품사, valence, arousal, familiarity 컬럼)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.mtime_ns = self.path.stat().st_mtime_ns
+        # utf-8-sig: final_144_words.csv 앞의 BOM 제거
+        df = pd.read_csv(self.path, encoding='utf-8-sig')
+
+        self.categories = {}
+        # 모든 단어를 카테고리 순서대로 이어 붙인 표 (시행 계획은 이 표의 인덱스만 저장)
+        self.word_table = ()
+        self.offsets = {}
+        for category, group in df.groupby('category', sort=False):
+            arrays = {}
+            for column, name in FIELDS.items():
+                if name in NUMERIC_FIELDS:
+                    arrays[name] = group[column].to_numpy(dtype=np.float64)
+                else:
+                    arrays[name] = group[column].to_numpy(dtype=object)
+            self.categories[category] = arrays
+            self.offsets[category] = len(self.word_table)
+            self.word_table += tuple(arrays['word'])
+
+    def __len__(self):
+        return sum(len(arrays['word']) for arrays in self.categories.values())
+
+    def size(self, category):
+        """카테고리의 단어 수"""
+        return len(self.categories[category]['word'])
+
+    def field(self, category, name='word'):
+        """카테고리의 속성 배열 (word, valence, arousal, familiarity, pos)"""
+        return self.categories[category][name]
+
+    def words(self, category=None):
+        """단어 배열 (category가 None이면 모든 카테고리를 이어 붙임)"""
+        if category is not None:
+            return self.field(category, 'word')
+        return np.concatenate([arrays['word'] for arrays in self.categories.values()])
+
+    def word_index(self, category, idx):
+        """카테고리 안의 idx번째 단어의 word_table 인덱스"""
+        return self.offsets[category] + idx
+
+
+_lock = threading.Lock()
+_loaded = {}  # 경로 -> StimulusSet
+_stats = {'loads': 0, 'hits': 0}
+
+
+def get_stimuli(path=EXP_STIMULI_PATH):
+    """캐시된 StimulusSet (파일이 바뀌었으면 다시 로드)
+
+    Args:
+        path: 자극 CSV 경로
+    """
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    with _lock:
+        stimuli = _loaded.get(path)
+        if stimuli is not None and stimuli.mtime_ns == mtime_ns:
+            _stats['hits'] += 1
+            return stimuli
+        stimuli = StimulusSet(path)
+        _loaded[path] = stimuli
+        _stats['loads'] += 1
+        return stimuli
+
+
+def get_exp_stimuli():
+    """본 시행 단어 (final_144_words.csv)"""
+    return get_stimuli(EXP_STIMULI_PATH)
+
+
+def get_practice_stimuli():
+    """연습 단어 (final_practice_words.csv)"""
+    return get_stimuli(PRACTICE_STIMULI_PATH)
+
+
+def get_store_stats():
+    """CSV를 실제로 읽은 횟수(loads)와 캐시 사용 횟수(hits)"""
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,101 @@
+"""Stroop 과제용 커스텀 컴포넌트
+
+빌드 도구 없이 정적 HTML/JS로 작성되어 Streamlit 서버가 그대로 서빙한다.
+"""
+from pathlib import Path
+
+import streamlit.components.v1 as components
+
+_FRONTEND_ROOT = Path(__file__).parent
+
+_block_runner = components.declare_component(
+    "block_runner", path=str(_FRONTEND_ROOT / "block_runner")
+)
+_break_timer = components.declare_component(
+    "break_timer", path=str(_FRONTEND_ROOT / "break_timer")
+)
+_event_bridge = components.declare_component(
+    "event_bridge", path=str(_FRONTEND_ROOT / "event_bridge")
+)
+
+
+def block_runner(trials, block, first_trial, fixation_ms, max_response_ms, key=None):
+    """한 블록의 시행 전체를 브라우저에서 실행하는 컴포넌트
+
+    Fixation, 자극 제시, timeout, ITI를 모두 클라이언트에서 처리하고
+    블록이 끝나면 모든 반응을 한 번에 반환한다. 블록 진행 중에는
+    서버 rerun이 발생하지 않는다.
+
+    Args:
+        trials: 블록 시행 목록 ({'text', 'letterColor', 'condition', 'iti_ms'} dict 리스트)
+            - iti_ms: 서버가 미리 정한 해당 시행 반응 후 ITI (ms)
+        block: 블록 번호 (1부터)
+        first_trial: 블록 첫 시행의 전체 trial 번호 (0부터)
+        fixation_ms: 블록 첫 시행의 fixation 시간 (ms)
+        max_response_ms: 최대 응답 시간 (ms)
+        key: Streamlit 위젯 key (블록마다 달라야 함)
+
+    Returns:
+        블록 진행 중이면 None, 완료되면
+        {'block', 'first_trial', 'responses': [{'trial_index', 'response',
+        'rt_ms', 'onset_epoch_ms', 'iti_actual_ms'}, ...]}
+    """
+    return _block_runner(
+        trials=trials,
+        block=block,
+        first_trial=first_trial,
+        fixation_ms=fixation_ms,
+        max_response_ms=max_response_ms,
+        key=key,
+        default=None,
+    )
+
+
+def break_timer(block, num_blocks, break_min_s, break_max_s, key=None):
+    """블록 사이 휴식 화면 (카운트다운과 N 키 해제를 브라우저에서 처리)
+
+    break_min_s 전에는 남은 시간만 보여주고, 이후 N 키로 진행할 수 있다.
+    break_max_s가 지나면 자동으로 종료된다. 휴식이 끝날 때 한 번만 값을 보낸다.
+
+    Args:
+        block: 방금 끝난 블록 번호
+        num_blocks: 전체 블록 수
+        break_min_s: 최소 휴식 시간 (초)
+        break_max_s: 최대 휴식 시간 (초)
+        key: Streamlit 위젯 key (휴식마다 달라야 함)
+
+    Returns:
+        휴식 중이면 None, 끝나면 {'block', 'duration_sec', 'ended_by': 'key' | 'auto'}
+    """
+    return _break_timer(
+        block=block,
+        num_blocks=num_blocks,
+        break_min_s=break_min_s,
+        break_max_s=break_max_s,
+        key=key,
+        default=None,
+    )
+
+
+def event_bridge(screen, key="event_bridge"):
+    """세션 동안 한 번만 마운트되는 키보드/타이머/RT 측정 컴포넌트
+
+    같은 key, 같은 위치로 매 rerun 그리면 iframe은 그대로 두고 screen 인자만 바뀐다
+    (화면마다 스크립트를 새로 주입하지 않음).
+
+    Args:
+        screen: 현재 화면 설명 (id는 세션 안에서 화면마다 달라야 함)
+            - {'id', 'kind': 'idle'}
+            - {'id', 'kind': 'key', 'keys': ['KeyN'], 'enable_after_ms'}
+            - {'id', 'kind': 'trial', 'keys': {'KeyF': 'red', 'KeyJ': 'green'},
+               'stimulus_delay_ms', 'max_response_ms'}
+            - {'id', 'kind': 'timer', 'after_ms'}
+        key: Streamlit 위젯 key (세션 동안 고정)
+
+    Returns:
+        마지막 이벤트 또는 None
+        {'screen', 'kind', 'seq', 'busy_ms', ['key'] | ['response', 'rt_ms']}
+        - busy_ms: 화면 시작부터 이벤트까지 브라우저 메인 스레드 long task 시간 합 (ms)
+        - rt_ms: 'trial' 화면에서 자극 onset부터 키 입력까지 (timeout이면 None)
+    """
+    return _event_bridge(screen=screen, key=key, default=None)
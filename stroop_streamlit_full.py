@@ -1,13 +1,20 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import pandas as pd
 import time
-from pathlib import Path
 from datetime import datetime
 import random
 
+import rerun_metrics
+import session_memory
+from outbox import queue_backup, resume_pending
+from stimulus_store import get_exp_stimuli, get_practice_stimuli
+from stroop_components import block_runner, break_timer, event_bridge
+from summary import build_summary_row
+from trial_data import save_session
+from trial_plan import TrialPlan
+
 # ========== Timing 상수 ==========
 MAX_RESPONSE_TIME = 3.0  # 최대 응답 시간 (초)
+BRIDGE_TIMEOUT_MARGIN = 2.0  # event_bridge timeout이 이만큼 늦으면 서버가 대신 timeout 처리 (초)
 ITI_MIN = 0.8  # ITI 최소 (초)
 ITI_MAX = 1.2  # ITI 최대 (초)
 FIXATION_DURATION = 0.5  # Fixation 지속 시간 (초)
@@ -24,21 +31,6 @@ TRIALS_PER_BLOCK_PILOT = 15  # pilot: 블록당 15 시행 (2블록)
 N_PER_CONDITION_PILOT = 10  # pilot: 조건당 10개 = 30 trials
 N_PER_CONDITION_FULL = 48   # full: 조건당 48개 = 144 trials
 
-# Google Sheets 백업용
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-    GSPREAD_AVAILABLE = True
-except ImportError:
-    GSPREAD_AVAILABLE = False
-
-# 클라이언트 사이드 RT 측정용
-try:
-    from streamlit_javascript import st_javascript
-    ST_JAVASCRIPT_AVAILABLE = True
-except ImportError:
-    ST_JAVASCRIPT_AVAILABLE = False
-
 # 페이지 설정
 st.set_page_config(
     page_title="Emotional Word Stroop Task",
@@ -46,6 +38,10 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# rerun 계측 (STROOP_METRICS 환경변수가 있을 때만 기록)
+# STROOP_PROFILE_ALLOW=1 일 때만 ?profile=cprofile 또는 ?profile=pyinstrument 로 이 세션만 phase별 프로파일 (data/profiles/)
+rerun_metrics.begin_rerun(profile=st.query_params.get("profile"))
+
 # CSS 스타일 추가 (GitHub 원본 스타일 재현: 검정 배경, 버튼 없음)
 st.markdown("""
 <style>
@@ -295,6 +291,25 @@ st.markdown("""
         color: #FFFFFF !important;
     }
 
+    /* Stroop 컴포넌트 (블록 러너, 휴식 타이머) - 화면 전체에 고정 */
+    iframe[title^="stroop_components."]:not([title="stroop_components.event_bridge"]) {
+        position: fixed;
+        top: 0;
+        left: 0;
+        width: 100vw !important;
+        height: 100vh !important;
+        border: none;
+        z-index: 1000;
+    }
+
+    /* 키보드/타이머 컴포넌트 - 보이지 않게 (스크립트만 동작) */
+    iframe[title="stroop_components.event_bridge"] {
+        position: fixed;
+        width: 0 !important;
+        height: 0 !important;
+        border: none;
+    }
+
     /* 지시사항 버튼 중앙 정렬 (columns 밖에 있는 버튼) */
     div[data-testid="stButton"] {
         display: flex !important;
@@ -309,6 +324,11 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# 키보드 입력 / 타이머 / RT 측정 컴포넌트 자리: 매 rerun 같은 위치에 같은 key로 그려서
+# iframe을 세션 동안 한 번만 만든다 (show_event_bridge 참고)
+bridge_slot = st.empty()
+IDLE_SCREEN = {'id': 'idle', 'kind': 'idle'}
+
 # Session state 초기화 (개별 체크 - 기존 세션에서도 작동)
 if 'task_started' not in st.session_state:
     st.session_state.task_started = False
@@ -342,32 +362,29 @@ if 'task_completed' not in st.session_state:
     st.session_state.task_completed = False
 if 'last_response_correct' not in st.session_state:
     st.session_state.last_response_correct = None
-if 'pending_client_rt' not in st.session_state:
-    st.session_state.pending_client_rt = None
-if 'showing_iti' not in st.session_state:
-    st.session_state.showing_iti = False
-if 'iti_start_time' not in st.session_state:
-    st.session_state.iti_start_time = None
-if 'current_iti_duration' not in st.session_state:
-    st.session_state.current_iti_duration = None
 if 'last_was_timeout' not in st.session_state:
     st.session_state.last_was_timeout = False
 if 'showing_break' not in st.session_state:
     st.session_state.showing_break = False
 if 'breaks_shown' not in st.session_state:
     st.session_state.breaks_shown = set()  # 이미 휴식 화면을 보여준 블록 번호
-if 'break_start_time' not in st.session_state:
-    st.session_state.break_start_time = None  # 휴식 시작 시간
+if 'break_log' not in st.session_state:
+    st.session_state.break_log = []  # 휴식별 실제 시간 [{'block', 'duration_sec', 'ended_by'}]
 if 'show_block_key_reminder' not in st.session_state:
     st.session_state.show_block_key_reminder = False  # 블록 시작 전 키 안내 표시
-if 'block_first_trial_num' not in st.session_state:
-    st.session_state.block_first_trial_num = 0  # 현재 블록의 첫 시행 번호
 if 'experiment_start_time' not in st.session_state:
     st.session_state.experiment_start_time = None  # 본 시행 시작 시간
 if 'showing_practice_redo' not in st.session_state:
     st.session_state.showing_practice_redo = False
 if 'practice_attempt' not in st.session_state:
     st.session_state.practice_attempt = 1  # 연습 시도 횟수
+if 'data_saved' not in st.session_state:
+    st.session_state.data_saved = False  # 결과 파일 + 백업 outbox 기록 완료 (이후 큰 값은 비움)
+
+# 마지막 활동 시각 갱신 (오래 방치된 세션은 백그라운드 스레드가 체크포인트 저장 후 비움, session_memory 참고)
+session_memory.track()
+# 이전 프로세스가 outbox에 남긴 백업 행이 있으면 업로더 시작
+resume_pending()
 
 # 실험 모드 감지 (URL 파라미터)
 if 'experiment_mode' not in st.session_state:
@@ -383,55 +400,22 @@ else:
     TOTAL_TRIALS = N_PER_CONDITION * 3  # 144
 
 
-def read_client_rt():
-    """localStorage에서 클라이언트 사이드 RT를 읽고 클리어"""
-    if not ST_JAVASCRIPT_AVAILABLE:
-        return None
-
-    try:
-        # localStorage에서 RT 읽고 바로 삭제 (atomic operation)
-        rt_str = st_javascript("""
-            (function() {
-                const rt = localStorage.getItem('stroopClientRT');
-                if (rt !== null) {
-                    localStorage.removeItem('stroopClientRT');
-                    return rt;
-                }
-                return null;
-            })()
-        """)
-
-        if rt_str is not None and rt_str != "null" and rt_str != 0:
-            return float(rt_str)
-    except Exception:
-        pass
-    return None
-
-
 def create_practice_trials():
     """Practice trials 생성 - final_practice_words.csv에서 neutral 단어 사용
 
     각 단어를 빨강/초록으로 무작위 배정하여 연습 시행 생성
     """
-    # final_practice_words.csv에서 연습 단어 로드
-    practice_path = Path("stimuli/final_practice_words.csv")
-    df = pd.read_csv(practice_path)
+    # final_practice_words.csv 단어 (프로세스당 1회 로드된 저장소 사용)
+    stimuli = get_practice_stimuli()
 
     colors = ['red', 'green']
-    trials = []
-
-    for _, row in df.iterrows():
-        color = random.choice(colors)
-        trials.append({
-            'text': row['word'],
-            'letterColor': color,
-            'corrAns': color,
-            'condition': 'practice'
-        })
 
     # 전체 무선화
-    random.shuffle(trials)
-    return pd.DataFrame(trials)
+    word_idx = list(range(len(stimuli.word_table)))
+    random.shuffle(word_idx)
+    trial_colors = [random.choice(colors) for _ in word_idx]
+
+    return TrialPlan(stimuli.word_table, word_idx, ['practice'] * len(word_idx), trial_colors)
 
 
 def create_exp_trials(n_per_condition=10):
@@ -441,44 +425,59 @@ def create_exp_trials(n_per_condition=10):
         n_per_condition: 조건별 단어 수 (기본 10 = pilot, 최대 48 = full)
     """
 
-    # final_144_words.csv에서 단어 로드
-    stimuli_path = Path("stimuli/final_144_words.csv")
-    df = pd.read_csv(stimuli_path)
+    # final_144_words.csv 단어 (프로세스당 1회 로드된 저장소 사용)
+    stimuli = get_exp_stimuli()
 
     colors = ['red', 'green']
 
     trials = []
-    # 조건별로 n개씩 랜덤 샘플링
+    # 조건별로 n개씩 랜덤 샘플링 (인덱스만 뽑음)
     for condition in ['positive', 'negative', 'neutral']:
-        cond_words = df[df['category'] == condition].sample(n=n_per_condition)
-        for _, row in cond_words.iterrows():
-            color = random.choice(colors)
-            trials.append({
-                'text': row['word'],
-                'letterColor': color,
-                'corrAns': color,
-                'condition': row['category']
-            })
+        for idx in random.sample(range(stimuli.size(condition)), n_per_condition):
+            trials.append((
+                stimuli.word_index(condition, idx),
+                condition,
+                random.choice(colors),
+                random.uniform(ITI_MIN, ITI_MAX)  # 반응 후 ITI (초) - 클라이언트가 이 값대로 실행
+            ))
 
     # 전체 무선화
     random.shuffle(trials)
-    return pd.DataFrame(trials)
+    word_idx, conditions, trial_colors, itis = zip(*trials)
+    return TrialPlan(stimuli.word_table, word_idx, conditions, trial_colors, iti=itis)
 
 
-def record_response(trial, response, is_practice=False, client_rt=None, is_timeout=False):
-    """반응 기록 함수
+def make_response_data(trial, response, accuracy, rt, rt_source, is_practice=False, timestamp=None):
+    """반응 기록 한 행 생성 (연습/본 시행 공통 형식)"""
+    return {
+        'participant_id': st.session_state.participant_id,
+        'word': trial['text'],
+        'condition': trial.get('condition', 'practice'),
+        'color': trial['letterColor'],
+        'response': response,
+        'accuracy': accuracy,
+        'rt': rt,
+        'rt_source': rt_source,  # 'client', 'server', 'timeout' or 'server_timeout'
+        'timestamp': timestamp or datetime.now().isoformat(),
+        'phase': 'practice' if is_practice else 'experimental'
+    }
+
+
+def record_practice_response(trial, response, client_rt=None, is_timeout=False, timeout_source='timeout'):
+    """연습 시행 반응 기록 (본 시행은 record_block_responses가 블록 단위로 기록)
 
     Args:
         trial: 현재 trial 정보
         response: 참가자 반응 ('red', 'green', 'timeout')
-        is_practice: 연습 시행 여부
         client_rt: 클라이언트 사이드에서 측정된 RT (ms) - 우선 사용
         is_timeout: timeout 여부
+        timeout_source: timeout의 rt_source ('timeout': event_bridge 타이머,
+            'server_timeout': bridge 이벤트가 오지 않아 서버가 대신 판정)
     """
     # Timeout 처리
     if is_timeout:
         rt = MAX_RESPONSE_TIME
-        rt_source = 'timeout'
+        rt_source = timeout_source
         response = 'timeout'
         accuracy = 0
         st.session_state.last_was_timeout = True
@@ -495,127 +494,62 @@ def record_response(trial, response, is_practice=False, client_rt=None, is_timeo
         accuracy = 1 if response == correct_answer else 0
         st.session_state.last_was_timeout = False
 
-    response_data = {
-        'participant_id': st.session_state.participant_id,
-        'word': trial['text'],
-        'condition': trial.get('condition', 'practice'),
-        'color': trial['letterColor'],
-        'response': response,
-        'accuracy': accuracy,
-        'rt': rt,
-        'rt_source': rt_source,  # 'client' or 'server'
-        'timestamp': datetime.now().isoformat(),
-        'phase': 'practice' if is_practice else 'experimental'
-    }
-
-    if is_practice:
-        st.session_state.practice_responses.append(response_data)
-        st.session_state.last_response_correct = accuracy
-        st.session_state.practice_trial_num += 1
-        # 피드백은 다음 trial 렌더링 시 함께 표시됨 (phase 없음)
-    else:
-        st.session_state.responses.append(response_data)
-        st.session_state.trial_num += 1
-        # 실험 시행: ITI 시작
-        st.session_state.showing_iti = True
-        st.session_state.iti_start_time = time.time()
-        st.session_state.current_iti_duration = random.uniform(ITI_MIN, ITI_MAX)
+    response_data = make_response_data(trial, response, accuracy, rt, rt_source, is_practice=True)
+    # 시행 위치 (연습은 block 0, trial은 1부터)
+    response_data['block'] = 0
+    response_data['trial'] = st.session_state.practice_trial_num + 1
 
+    st.session_state.practice_responses.append(response_data)
+    st.session_state.last_response_correct = accuracy
+    st.session_state.practice_trial_num += 1
+    # 피드백은 다음 trial 렌더링 시 함께 표시됨 (phase 없음)
     st.session_state.start_time = None
 
-    # 완료 체크
-    if not is_practice and st.session_state.trial_num >= len(st.session_state.exp_trials):
-        st.session_state.task_completed = True
-        st.session_state.showing_iti = False  # ITI 종료
-
     st.rerun()
 
 
-def create_summary_row():
-    """참가자별 요약 데이터 생성 (한 행)"""
-    if len(st.session_state.responses) == 0:
-        return None
+def record_block_responses(block_trials, result):
+    """블록 러너 컴포넌트가 반환한 한 블록의 반응을 한 번에 기록
 
-    # Experimental 데이터만 사용
-    exp_df = pd.DataFrame(st.session_state.responses)
+    Args:
+        block_trials: 블록 시행 목록 (dict 리스트, 컴포넌트에 넘긴 순서)
+        result: 컴포넌트 반환값 {'block', 'first_trial', 'responses': [...]}
+    """
+    for trial, resp in zip(block_trials, result['responses']):
+        # 기존과 동일하게 반응 시점을 timestamp로 기록 (timeout은 최대 응답 시간 경과 시점)
+        rt_ms = resp['rt_ms'] if resp['rt_ms'] is not None else MAX_RESPONSE_TIME * 1000
+        timestamp = datetime.fromtimestamp((resp['onset_epoch_ms'] + rt_ms) / 1000).isoformat()
+        if resp['response'] == 'timeout':
+            response_data = make_response_data(trial, 'timeout', 0, MAX_RESPONSE_TIME, 'timeout', timestamp=timestamp)
+        else:
+            accuracy = 1 if resp['response'] == trial.get('corrAns', trial['letterColor']) else 0
+            response_data = make_response_data(trial, resp['response'], accuracy, rt_ms / 1000, 'client', timestamp=timestamp)
+        response_data['block'] = result['block']
+        response_data['trial'] = resp['trial_index'] + 1
+        # ITI는 클라이언트가 실행하므로 서버는 계획값과 실측값만 기록
+        response_data['iti_planned'] = trial['iti']
+        response_data['iti_actual'] = resp['iti_actual_ms'] / 1000 if resp.get('iti_actual_ms') is not None else None
+        st.session_state.responses.append(response_data)
 
-    # 기본 정보
-    end_time = datetime.now()
-    start_time = st.session_state.experiment_start_time
+    st.session_state.trial_num += len(result['responses'])
 
-    # 총 소요시간 계산 (초 단위)
-    if start_time:
-        total_duration = (end_time - start_time).total_seconds()
-    else:
-        total_duration = None
+    # 완료 체크
+    if st.session_state.trial_num >= len(st.session_state.exp_trials):
+        st.session_state.task_completed = True
 
-    summary = {
-        'participant_id': st.session_state.participant_id,
-        'date': end_time.strftime("%Y-%m-%d"),
-        'timestamp_start': start_time.isoformat() if start_time else None,
-        'timestamp_end': end_time.isoformat(),
-        'total_duration_sec': round(total_duration, 2) if total_duration else None,
-    }
+    st.rerun()
 
-    # 조건별 요약 통계 (정답 trial만 사용하여 RT 계산)
-    for condition in ['positive', 'negative', 'neutral']:
-        cond_data = exp_df[exp_df['condition'] == condition]
-        correct_data = cond_data[cond_data['accuracy'] == 1]
-
-        summary[f'rt_{condition}_mean'] = round(correct_data['rt'].mean(), 4) if len(correct_data) > 0 else None
-        summary[f'rt_{condition}_sd'] = round(correct_data['rt'].std(), 4) if len(correct_data) > 1 else None
-        summary[f'acc_{condition}'] = round(cond_data['accuracy'].mean(), 4) if len(cond_data) > 0 else None
-        summary[f'n_{condition}'] = len(cond_data)
-
-    # 간섭 점수 (negative/positive RT - neutral RT)
-    if summary.get('rt_neutral_mean') and summary.get('rt_negative_mean'):
-        summary['interference_negative'] = round(summary['rt_negative_mean'] - summary['rt_neutral_mean'], 4)
-    if summary.get('rt_neutral_mean') and summary.get('rt_positive_mean'):
-        summary['interference_positive'] = round(summary['rt_positive_mean'] - summary['rt_neutral_mean'], 4)
-
-    # 전체 통계
-    correct_all = exp_df[exp_df['accuracy'] == 1]
-    summary['rt_overall_mean'] = round(correct_all['rt'].mean(), 4) if len(correct_all) > 0 else None
-    summary['acc_overall'] = round(exp_df['accuracy'].mean(), 4)
-    summary['n_total'] = len(exp_df)
-
-    # Practice 원시 데이터
-    practice_df = pd.DataFrame(st.session_state.practice_responses)
-    for i, (_, row) in enumerate(practice_df.iterrows(), 1):
-        summary[f'p{i}_word'] = row['word']
-        summary[f'p{i}_color'] = row['color']
-        summary[f'p{i}_resp'] = row['response']
-        summary[f'p{i}_acc'] = row['accuracy']
-        summary[f'p{i}_rt'] = round(row['rt'], 4)
-
-    # Practice 요약
-    if len(practice_df) > 0:
-        practice_correct = practice_df[practice_df['accuracy'] == 1]
-        summary['practice_acc'] = round(practice_df['accuracy'].mean(), 4)
-        summary['practice_rt_mean'] = round(practice_correct['rt'].mean(), 4) if len(practice_correct) > 0 else None
-
-    # Experimental 원시 데이터 (trial별로 컬럼에 추가)
-    # 항상 144개 trial 컬럼 생성 (pilot 모드에서도 동일한 헤더 유지)
-    FULL_TRIAL_COUNT = 144
-    for i in range(1, FULL_TRIAL_COUNT + 1):
-        if i <= len(exp_df):
-            row = exp_df.iloc[i - 1]
-            summary[f't{i}_word'] = row['word']
-            summary[f't{i}_cond'] = row['condition'][:3]  # pos/neg/neu
-            summary[f't{i}_color'] = row['color']
-            summary[f't{i}_resp'] = row['response']
-            summary[f't{i}_acc'] = row['accuracy']
-            summary[f't{i}_rt'] = round(row['rt'], 4)
-        else:
-            # Pilot 모드: 나머지 컬럼은 빈 값
-            summary[f't{i}_word'] = None
-            summary[f't{i}_cond'] = None
-            summary[f't{i}_color'] = None
-            summary[f't{i}_resp'] = None
-            summary[f't{i}_acc'] = None
-            summary[f't{i}_rt'] = None
 
-    return pd.DataFrame([summary])
+def create_summary_row():
+    """참가자별 요약 데이터 생성 (한 행, summary.build_summary_row 참고)"""
+    return build_summary_row(
+        participant_id=st.session_state.participant_id,
+        responses=st.session_state.responses,
+        practice_responses=st.session_state.practice_responses,
+        start_time=st.session_state.experiment_start_time,
+        end_time=datetime.now(),
+        break_log=st.session_state.break_log,
+    )
 
 
 def save_data():
@@ -624,73 +558,51 @@ def save_data():
         df = create_summary_row()
 
         if df is not None:
-            # data/responses 폴더 생성
-            output_dir = Path("data/responses")
-            output_dir.mkdir(parents=True, exist_ok=True)
-
-            # 파일명: participant_id_timestamp.csv
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = output_dir / f"{st.session_state.participant_id}_{timestamp}.csv"
-
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            # data/responses/participant_id_timestamp.csv + _trials.parquet
+            filename = save_session("data/responses", st.session_state.participant_id, df,
+                                    st.session_state.responses, st.session_state.practice_responses)
             return filename, df
     return None, None
 
 
-def backup_to_google_sheets(df):
-    """Google Sheets에 데이터 백업"""
-    if not GSPREAD_AVAILABLE:
-        return False, "gspread 라이브러리가 설치되지 않았습니다."
-
-    try:
-        # Streamlit secrets에서 credentials 가져오기
-        credentials_dict = st.secrets["gcp_service_account"]
-
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets',
-            'https://www.googleapis.com/auth/drive'
-        ]
-
-        credentials = Credentials.from_service_account_info(
-            dict(credentials_dict),
-            scopes=scopes
-        )
+def show_event_bridge(screen):
+    """event_bridge를 고정 자리(bridge_slot)에 그리고 이 화면에서 생긴 이벤트만 반환
 
-        gc = gspread.authorize(credentials)
+    화면 분기마다 st.stop() 전에 한 번 호출한다. 컴포넌트 값에 남아 있는
+    이전 화면의 이벤트는 screen id가 달라 무시된다.
 
-        # Spreadsheet ID (emotional stroop responses)
-        SPREADSHEET_ID = "1qz17jEAWlJcP-erMPM99qRE9SPa2m7GqrYzzBnj25NE"
-        spreadsheet = gc.open_by_key(SPREADSHEET_ID)
-
-        # 첫 번째 시트 사용
-        worksheet = spreadsheet.sheet1
+    Args:
+        screen: event_bridge 화면 설명 (id는 세션 안에서 화면마다 고유)
 
-        # 기존 데이터가 있는지 확인
-        existing_data = worksheet.get_all_values()
+    Returns:
+        이 화면의 이벤트 dict 또는 None
+    """
+    with bridge_slot:
+        event = event_bridge(screen)
+    if event is not None and event.get('screen') == screen['id']:
+        return event
+    return None
 
-        # 헤더 확인 및 추가
-        expected_headers = df.columns.tolist()
-        if len(existing_data) == 0 or existing_data[0] != expected_headers:
-            if len(existing_data) == 0:
-                worksheet.append_row(expected_headers)
-            else:
-                # 첫 행이 헤더가 아니면 맨 위에 헤더 삽입
-                worksheet.insert_row(expected_headers, 1)
 
-        # 데이터 추가
-        for _, row in df.iterrows():
-            worksheet.append_row(row.tolist())
+def n_key_screen(screen_id, enable_after_ms=0):
+    """N 키로 넘어가는 안내 화면"""
+    return {'id': screen_id, 'kind': 'key', 'keys': ['KeyN'], 'enable_after_ms': enable_after_ms}
 
-        return True, "Google Sheets 백업 완료"
 
-    except Exception as e:
-        return False, f"백업 실패: {str(e)}"
+# ========== 메인 앱 로직 ==========
 
+# 0. 오래 방치되어 회수된 세션 (진행 기록은 data/checkpoints/에 저장됨)
+if 'session_evicted' in st.session_state:
+    rerun_metrics.set_phase("evicted")
+    show_event_bridge(IDLE_SCREEN)
+    st.warning("오랫동안 입력이 없어 세션이 종료되었습니다. 진행 기록은 저장되었습니다. 실험 진행자에게 알려주세요.")
+    st.stop()
 
-# ========== 메인 앱 로직 ==========
 
 # 1. 참가자 정보 입력 화면
 if not st.session_state.task_started:
+    rerun_metrics.set_phase("participant_info")
+    show_event_bridge(IDLE_SCREEN)
     st.title("Emotional Word Stroop Task")
     st.markdown("### 참가자 정보")
     if st.session_state.experiment_mode == "pilot":
@@ -718,6 +630,7 @@ if not st.session_state.task_started:
 # 2. Practice Instructions (여러 화면으로 분리)
 if not st.session_state.practice_completed and not st.session_state.showing_practice_redo:
     if not st.session_state.practice_instructions_shown:
+        rerun_metrics.set_phase("instructions")
         # 지시사항 페이지 정의 (2줄씩)
         instruction_pages = [
             {
@@ -814,8 +727,11 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
             ''', unsafe_allow_html=True)
 
         clicked = st.button(page["button"], key=f"instruction_btn_{current_page}", type="primary")
+        # N 키 (2초 후 활성화)
+        n_pressed = show_event_bridge(n_key_screen(
+            f"instructions_{st.session_state.practice_attempt}_{current_page}", enable_after_ms=2000))
 
-        if clicked:
+        if clicked or n_pressed is not None:
             if is_last_page:
                 st.session_state.practice_instructions_shown = True
                 st.session_state.instruction_page = 0
@@ -823,71 +739,19 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
                 st.session_state.instruction_page += 1
             st.rerun()
 
-        # N 키 리스너 (3초 후 활성화)
-        components.html(f'''
-        <script>
-        (function() {{
-            const pageNum = {current_page};
-            const DELAY_MS = 2000;
-
-            if (window.instructionKeyHandlerInstalled === pageNum) return;
-            window.instructionKeyHandlerInstalled = pageNum;
-            window.instructionKeyEnabled = false;
-
-            // 3초 후 N 키 활성화
-            setTimeout(() => {{
-                window.instructionKeyEnabled = true;
-            }}, DELAY_MS);
-
-            function handleInstructionKey(e) {{
-                if ((e.key === 'n' || e.key === 'N' || e.code === 'KeyN') && window.instructionKeyEnabled) {{
-                    e.preventDefault();
-                    const btn = parent.document.querySelector('button[kind="primary"]');
-                    if (btn) {{
-                        btn.click();
-                        parent.document.removeEventListener('keydown', handleInstructionKey);
-                        window.instructionKeyHandlerInstalled = null;
-                    }}
-                }}
-            }}
-
-            parent.document.addEventListener('keydown', handleInstructionKey);
-        }})();
-        </script>
-        ''', height=0)
-
         st.stop()
 
     # Practice Trial 진행
     if st.session_state.practice_trial_num < len(st.session_state.practice_trials):
+        rerun_metrics.set_phase("practice")
 
-        trial = st.session_state.practice_trials.iloc[st.session_state.practice_trial_num]
-
-        # 클라이언트 사이드 RT 읽기 (이전 시행에서 저장된 값)
-        client_rt = read_client_rt()
-        if client_rt is not None:
-            st.session_state.pending_client_rt = client_rt
+        trial = st.session_state.practice_trials[st.session_state.practice_trial_num]
 
         # 첫 시행 여부
         is_first_trial = st.session_state.practice_trial_num == 0
         has_feedback = st.session_state.last_response_correct is not None or st.session_state.last_was_timeout
         color_hex_map = {'red': '#FF0000', 'green': '#00FF00'}
 
-        # Timeout 체크 (연습 시행도 동일하게 적용)
-        if st.session_state.start_time is not None:
-            elapsed = time.time() - st.session_state.start_time
-            # 첫 시행은 fixation 있음 (0.5초), 피드백 있으면 1.3초, 없으면 0.3초
-            if is_first_trial:
-                timeout_offset = FIXATION_DURATION
-            elif has_feedback:
-                timeout_offset = 1.3  # 피드백 1초 + 자극 fadeIn 0.3초
-            else:
-                timeout_offset = 0.3
-            if elapsed >= MAX_RESPONSE_TIME + timeout_offset:
-                # Timeout 발생
-                record_response(trial, "timeout", is_practice=True, is_timeout=True)
-                st.stop()
-
         if is_first_trial:
             # 첫 시행: Fixation + 자극 (기존 애니메이션)
             # 검정 오버레이로 다른 요소 숨김 + fixation + stimulus
@@ -963,8 +827,7 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
 
         st.markdown("<br>", unsafe_allow_html=True)
 
-        # 키보드 이벤트 리스너 (F, J) - 클라이언트 사이드 RT 측정 + Timeout
-        from streamlit.components.v1 import html
+        # 키보드 반응 / timeout / RT 측정은 event_bridge가 담당 (자극 onset 기준, timeout도 bridge 타이머만 사용)
         # 첫 시행은 fixation 500ms, 피드백 있으면 1300ms (피드백 1000ms + fadeIn 300ms), 그 외 300ms
         if is_first_trial:
             stimulus_delay = 500
@@ -972,186 +835,38 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
             stimulus_delay = 1300  # 피드백 1초 + 자극 fadeIn 0.3초
         else:
             stimulus_delay = 300
-        html(f"""
-        <script>
-        (function() {{
-            const tryNum = {st.session_state.practice_trial_num};
-            const MAX_RESPONSE_TIME = {int(MAX_RESPONSE_TIME * 1000)};  // ms
-            const STIMULUS_DELAY = {stimulus_delay};  // ms (첫 시행 500ms, 피드백 있으면 1300ms, 그 외 300ms)
-
-            // 현재 trial 번호를 parent에 기록 (backup에서 trial 변경 감지용)
-            parent.window._stroopCurrentPracticeTrial = tryNum;
-
-            // 반응 버튼 숨기기 (키보드로만 반응)
-            function hideResponseButtons() {{
-                const allButtons = parent.document.querySelectorAll('button');
-                allButtons.forEach((btn) => {{
-                    const text = btn.textContent || btn.innerText;
-                    if (text.includes('🔴') || text.includes('🟢') || text.includes('빨강') || text.includes('초록')) {{
-                        btn.style.position = 'fixed';
-                        btn.style.bottom = '0';
-                        btn.style.left = '0';
-                        btn.style.opacity = '0.01';
-                        btn.style.width = '1px';
-                        btn.style.height = '1px';
-                        btn.style.overflow = 'hidden';
-                        btn.style.zIndex = '-1';
-                    }}
-                }});
-            }}
-            setTimeout(hideResponseButtons, 50);
-
-            // 자극 표시 시점 기록 (첫 시행: fixation 0.5초 후, 이후: 0.3초 후)
-            window.stimulusShownTime = performance.now() + STIMULUS_DELAY;
-            console.log('Practice stimulus will be shown at:', window.stimulusShownTime, '(delay:', STIMULUS_DELAY, 'ms)');
-
-            // Timeout 플래그
-            window.stroopResponseMade = false;
-
-            // Remove ALL previous listeners and timers
-            if (window.stroopKeyHandler) {{
-                parent.document.removeEventListener('keydown', window.stroopKeyHandler);
-            }}
-            if (window.stroopTimeoutTimer) {{
-                clearTimeout(window.stroopTimeoutTimer);
-            }}
-
-            // Timeout 핸들러 - 3초 후 자동으로 timeout 버튼 클릭
-            window.stroopTimeoutTimer = setTimeout(function() {{
-                if (!window.stroopResponseMade) {{
-                    console.log('Practice Timeout! No response within', MAX_RESPONSE_TIME, 'ms');
-                    localStorage.setItem('stroopClientRT', 'timeout');
-                    const allButtons = parent.document.querySelectorAll('button');
-                    allButtons.forEach((btn) => {{
-                        const text = btn.textContent || btn.innerText;
-                        if (text.includes('timeout')) {{
-                            btn.click();
-                        }}
-                    }});
-                }}
-            }}, STIMULUS_DELAY + MAX_RESPONSE_TIME);
-
-            // Define new handler
-            window.stroopKeyHandler = function(event) {{
-                const code = event.code;  // Physical key code (KeyF, KeyJ)
-
-                // Use event.code to detect physical keys (works with Korean/English keyboard)
-                if (code !== 'KeyF' && code !== 'KeyJ') {{
-                    return;
-                }}
-
-                // 이미 응답한 경우 무시 (빠른 더블 클릭 방지)
-                if (window.stroopResponseMade) {{
-                    console.log('Response already made, ignoring key:', code);
-                    return;
-                }}
-
-                event.preventDefault();
-                event.stopPropagation();
-
-                // 응답 완료 플래그
-                window.stroopResponseMade = true;
-                if (window.stroopTimeoutTimer) {{
-                    clearTimeout(window.stroopTimeoutTimer);
-                }}
-
-                // 클라이언트 사이드 RT 계산
-                const keyPressTime = performance.now();
-                const clientRT = Math.max(0, keyPressTime - window.stimulusShownTime);
-                console.log('Practice Client RT:', clientRT.toFixed(2), 'ms');
-
-                // RT를 localStorage에 저장 (Python에서 읽기 위함)
-                localStorage.setItem('stroopClientRT', clientRT.toString());
-
-                // Find and click buttons (with retry and fallback to timeout)
-                function findAndClickButton(color, retryCount) {{
-                    const allButtons = parent.document.querySelectorAll('button');
-                    let redBtn = null, greenBtn = null, timeoutBtn = null;
-
-                    allButtons.forEach((btn) => {{
-                        const text = btn.textContent || btn.innerText;
-                        if (text.includes('🔴') || text.includes('빨강')) redBtn = btn;
-                        if (text.includes('🟢') || text.includes('초록')) greenBtn = btn;
-                        if (text === 'timeout') timeoutBtn = btn;
-                    }});
-
-                    console.log('Practice buttons found - Red:', !!redBtn, 'Green:', !!greenBtn, 'Timeout:', !!timeoutBtn, 'Total:', allButtons.length);
-
-                    let targetBtn = (color === 'red') ? redBtn : greenBtn;
-
-                    if (targetBtn) {{
-                        console.log('Practice clicking', color, 'button');
-                        targetBtn.click();
-
-                        // Backup: trial이 안 바뀌면 timeout 버튼 클릭 (polling 방식)
-                        let _backupChecks = 0;
-                        const _backupInterval = setInterval(() => {{
-                            _backupChecks++;
-                            if (parent.window._stroopCurrentPracticeTrial !== tryNum) {{
-                                clearInterval(_backupInterval);
-                                return;
-                            }}
-                            const currentButtons = parent.document.querySelectorAll('button');
-                            const hasTrialButtons = [...currentButtons].some(btn => {{
-                                const text = btn.textContent || btn.innerText;
-                                return text.includes('빨강') || text.includes('초록');
-                            }});
-                            if (!hasTrialButtons) {{
-                                clearInterval(_backupInterval);
-                                return;
-                            }}
-                            if (_backupChecks >= 4) {{
-                                clearInterval(_backupInterval);
-                                console.error('Practice button click did not trigger page change after 2s! Clicking timeout as backup.');
-                                const backupTimeoutBtn = [...currentButtons].find(btn => btn.textContent === 'timeout');
-                                if (backupTimeoutBtn) backupTimeoutBtn.click();
-                            }}
-                        }}, 500);
-                    }} else if (retryCount < 3) {{
-                        console.log('Practice button not found, retrying... (attempt', retryCount + 1, ')');
-                        setTimeout(() => findAndClickButton(color, retryCount + 1), 100);
-                    }} else {{
-                        // Fallback: 버튼 못 찾으면 timeout 버튼 클릭해서 다음으로 넘어감
-                        console.error('Practice FAILED to find button after 3 retries! Clicking timeout as fallback.');
-                        if (timeoutBtn) {{
-                            timeoutBtn.click();
-                        }}
-                    }}
-                }}
-
-                // Click the appropriate button based on physical key code
-                const color = (code === 'KeyF') ? 'red' : 'green';
-                findAndClickButton(color, 0);
-            }};
+        key_response = show_event_bridge({
+            'id': f"practice_{st.session_state.practice_attempt}_{st.session_state.practice_trial_num}",
+            'kind': 'trial',
+            'keys': {'KeyF': 'red', 'KeyJ': 'green'},
+            'stimulus_delay_ms': stimulus_delay,
+            'max_response_ms': int(MAX_RESPONSE_TIME * 1000),
+        })
+        if key_response is not None:
+            if key_response['response'] == 'timeout':
+                record_practice_response(trial, "timeout", is_timeout=True)
+            else:
+                record_practice_response(trial, key_response['response'], client_rt=key_response['rt_ms'])
 
-            // Add the new listener
-            parent.document.addEventListener('keydown', window.stroopKeyHandler);
-            console.log('Practice keyboard handler installed for trial', tryNum, 'with timeout:', MAX_RESPONSE_TIME, 'ms');
-        }})();
-        </script>
-        """, height=0)
+        # bridge 이벤트 없이 timeout 시점 + 여유 시간이 지난 뒤의 rerun이면 (bridge가 멈춘 경우) 서버에서 timeout
+        elapsed = time.time() - st.session_state.start_time
+        if elapsed >= stimulus_delay / 1000 + MAX_RESPONSE_TIME + BRIDGE_TIMEOUT_MARGIN:
+            record_practice_response(trial, "timeout", is_timeout=True, timeout_source='server_timeout')
 
-        # 반응 버튼
-        col1, col2, col3 = st.columns([2, 2, 1])
+        # 반응 버튼 (숨김, 마우스/테스트용 대체 입력 - RT는 서버 기준)
+        col1, col2, _ = st.columns([2, 2, 1])
 
         with col1:
             if st.button("🔴 빨강 (F)", key=f"practice_red_{st.session_state.practice_trial_num}", use_container_width=True, type="primary"):
-                client_rt = st.session_state.pending_client_rt
-                st.session_state.pending_client_rt = None
-                record_response(trial, "red", is_practice=True, client_rt=client_rt)
+                record_practice_response(trial, "red")
 
         with col2:
             if st.button("🟢 초록 (J)", key=f"practice_green_{st.session_state.practice_trial_num}", use_container_width=True, type="primary"):
-                client_rt = st.session_state.pending_client_rt
-                st.session_state.pending_client_rt = None
-                record_response(trial, "green", is_practice=True, client_rt=client_rt)
+                record_practice_response(trial, "green")
 
-        with col3:
-            # 숨겨진 timeout 버튼 (연습 시행)
-            if st.button("timeout", key=f"practice_timeout_{st.session_state.practice_trial_num}"):
-                record_response(trial, "timeout", is_practice=True, is_timeout=True)
 
     else:
+        rerun_metrics.set_phase("practice_end")
         # 마지막 trial 피드백 표시 후 자동 진행
         has_feedback = st.session_state.last_response_correct is not None or st.session_state.last_was_timeout
 
@@ -1182,8 +897,19 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
                 unsafe_allow_html=True
             )
 
-            # 숨겨진 버튼 + 1초 후 JavaScript로 자동 클릭 (time.sleep 대신)
-            if st.button("practice_complete", key="practice_complete_btn"):
+            # 숨겨진 버튼 (event_bridge 타이머 대신 눌러도 같은 동작)
+            st.markdown('''
+            <style>
+            div[data-testid="stButton"]:has(button[kind="secondary"]) {
+                display: none !important;
+            }
+            </style>
+            ''', unsafe_allow_html=True)
+
+            # 피드백 1초 뒤 자동 진행 (event_bridge 타이머, time.sleep 대신)
+            timer_done = show_event_bridge(
+                {'id': f"practice_end_{st.session_state.practice_attempt}", 'kind': 'timer', 'after_ms': 1000})
+            if st.button("practice_complete", key="practice_complete_btn") or timer_done is not None:
                 # Practice 정확도 계산
                 practice_responses = st.session_state.practice_responses
                 if len(practice_responses) > 0:
@@ -1202,30 +928,6 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
                 st.session_state.last_was_timeout = False
                 st.rerun()
 
-            # 버튼 숨기기 + 1초 후 자동 클릭
-            components.html("""
-            <script>
-            (function() {
-                // 버튼 즉시 숨기기
-                const hideBtn = () => {
-                    const btn = [...parent.document.querySelectorAll('button')].find(b => b.textContent === 'practice_complete');
-                    if (btn) {
-                        btn.style.display = 'none';
-                    }
-                };
-                hideBtn();
-                setTimeout(hideBtn, 50);  // 렌더링 후에도 숨기기
-
-                // 1초 후 클릭
-                setTimeout(() => {
-                    const btn = [...parent.document.querySelectorAll('button')].find(b => b.textContent === 'practice_complete');
-                    if (btn) {
-                        btn.click();
-                    }
-                }, 1000);
-            })();
-            </script>
-            """, height=0)
         else:
             # 피드백 없이 도달한 경우 - 마지막 피드백 버튼이 클릭되길 기다림
             # (정상적으로는 has_feedback이 True여야 하지만, 엣지 케이스 방지)
@@ -1235,8 +937,19 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
             </div>
             ''', unsafe_allow_html=True)
 
+            # 숨겨진 버튼 (event_bridge 타이머 대신 눌러도 같은 동작)
+            st.markdown('''
+            <style>
+            div[data-testid="stButton"]:has(button[kind="secondary"]) {
+                display: none !important;
+            }
+            </style>
+            ''', unsafe_allow_html=True)
+
             # 1초 후 자동으로 완료 처리
-            if st.button("auto_complete", key="auto_complete_btn"):
+            timer_done = show_event_bridge(
+                {'id': f"practice_end_{st.session_state.practice_attempt}", 'kind': 'timer', 'after_ms': 1000})
+            if st.button("auto_complete", key="auto_complete_btn") or timer_done is not None:
                 practice_responses = st.session_state.practice_responses
                 if len(practice_responses) > 0:
                     correct_count = sum(1 for r in practice_responses if r['accuracy'] == 1)
@@ -1253,36 +966,13 @@ if not st.session_state.practice_completed and not st.session_state.showing_prac
                 st.session_state.last_was_timeout = False
                 st.rerun()
 
-            # 버튼 숨기기 + 1초 후 자동 클릭
-            components.html("""
-            <script>
-            (function() {
-                // 버튼 즉시 숨기기
-                const hideBtn = () => {
-                    const btn = [...parent.document.querySelectorAll('button')].find(b => b.textContent === 'auto_complete');
-                    if (btn) {
-                        btn.style.display = 'none';
-                    }
-                };
-                hideBtn();
-                setTimeout(hideBtn, 50);
-
-                // 1초 후 클릭
-                setTimeout(() => {
-                    const btn = [...parent.document.querySelectorAll('button')].find(b => b.textContent === 'auto_complete');
-                    if (btn) {
-                        btn.click();
-                    }
-                }, 1000);
-            })();
-            </script>
-            """, height=0)
 
     st.stop()
 
 
 # 2.5 Practice Redo 화면 (정확도 50% 미만)
 if st.session_state.showing_practice_redo:
+    rerun_metrics.set_phase("practice_redo")
     st.markdown('''
     <div style="display: flex; flex-direction: column; align-items: center; justify-content: center;
                 height: 60vh; color: white; text-align: center;">
@@ -1301,7 +991,9 @@ if st.session_state.showing_practice_redo:
     </style>
     ''', unsafe_allow_html=True)
 
-    if st.button("다시 연습하기", key=f"redo_practice_{st.session_state.practice_attempt}", type="primary"):
+    n_pressed = show_event_bridge(n_key_screen(f"redo_{st.session_state.practice_attempt}"))
+    if st.button("다시 연습하기", key=f"redo_practice_{st.session_state.practice_attempt}", type="primary") \
+            or n_pressed is not None:
         # 연습 초기화 (지시사항부터 다시)
         st.session_state.practice_trial_num = 0
         st.session_state.practice_responses = []
@@ -1314,36 +1006,12 @@ if st.session_state.showing_practice_redo:
         st.session_state.last_was_timeout = False
         st.rerun()
 
-    # N 키 리스너
-    components.html(f'''
-    <script>
-    (function() {{
-        const attempt = {st.session_state.practice_attempt};
-        if (window.redoKeyHandlerInstalled === attempt) return;
-        window.redoKeyHandlerInstalled = attempt;
-
-        function handleRedoKey(e) {{
-            if (e.key === 'n' || e.key === 'N' || e.code === 'KeyN') {{
-                e.preventDefault();
-                const btn = parent.document.querySelector('button[kind="primary"]');
-                if (btn) {{
-                    btn.click();
-                    parent.document.removeEventListener('keydown', handleRedoKey);
-                    window.redoKeyHandlerInstalled = null;
-                }}
-            }}
-        }}
-
-        parent.document.addEventListener('keydown', handleRedoKey);
-    }})();
-    </script>
-    ''', height=0)
-
     st.stop()
 
 
 # 3. Experimental Instructions (페이지별 표시)
 if not st.session_state.instructions_exp_shown:
+    rerun_metrics.set_phase("exp_instructions")
     exp_instruction_pages = [
         {
             "lines": [
@@ -1431,8 +1099,10 @@ if not st.session_state.instructions_exp_shown:
         ''', unsafe_allow_html=True)
 
     clicked = st.button(page["button"], key=f"exp_instruction_btn_{current_page}", type="primary")
+    # N 키 (2초 후 활성화)
+    n_pressed = show_event_bridge(n_key_screen(f"exp_instructions_{current_page}", enable_after_ms=2000))
 
-    if clicked:
+    if clicked or n_pressed is not None:
         if is_last_page:
             st.session_state.instructions_exp_shown = True
             st.session_state.exp_instruction_page = 0
@@ -1444,74 +1114,33 @@ if not st.session_state.instructions_exp_shown:
             st.session_state.exp_instruction_page += 1
         st.rerun()
 
-    # N 키 리스너 (3초 후 활성화)
-    components.html(f'''
-    <script>
-    (function() {{
-        const pageNum = {current_page};
-        const DELAY_MS = 2000;
-
-        if (window.expInstructionKeyHandlerInstalled === pageNum) return;
-        window.expInstructionKeyHandlerInstalled = pageNum;
-        window.expInstructionKeyEnabled = false;
-
-        // 3초 후 N 키 활성화
-        setTimeout(() => {{
-            window.expInstructionKeyEnabled = true;
-        }}, DELAY_MS);
-
-        function handleExpInstructionKey(e) {{
-            if ((e.key === 'n' || e.key === 'N' || e.code === 'KeyN') && window.expInstructionKeyEnabled) {{
-                e.preventDefault();
-                const btn = parent.document.querySelector('button[kind="primary"]');
-                if (btn) {{
-                    btn.click();
-                    parent.document.removeEventListener('keydown', handleExpInstructionKey);
-                    window.expInstructionKeyHandlerInstalled = null;
-                }}
-            }}
-        }}
-
-        parent.document.addEventListener('keydown', handleExpInstructionKey);
-    }})();
-    </script>
-    ''', height=0)
-
     st.stop()
 
 
 # 4. Task 완료 화면
 if st.session_state.task_completed:
-    # 이전 trial의 반응 오버레이 제거
-    components.html('''
-    <script>
-    (function() {
-        const overlay = parent.document.getElementById('response-overlay');
-        if (overlay) overlay.remove();
-    })();
-    </script>
-    ''', height=0)
+    rerun_metrics.set_phase("complete")
+    show_event_bridge(IDLE_SCREEN)
     st.title("✅ 과제 완료!")
     st.markdown("모든 시행을 완료했습니다. 감사합니다!")
 
     # 데이터 저장 (한 번만 실행)
-    if 'final_df' not in st.session_state:
+    if not st.session_state.data_saved:
         saved_file, df = save_data()
         if df is not None:
-            st.session_state.final_df = df
-            # Google Sheets 백업 (한 번만)
-            backup_success, backup_msg = backup_to_google_sheets(df)
-            st.session_state.backup_result = (backup_success, backup_msg)
+            # Google Sheets 백업: 로컬 outbox에 기록만 하고 전송은 백그라운드 업로더가 담당 (네트워크 대기 없음)
+            st.session_state.backup_result = queue_backup(df)
+            st.session_state.data_saved = True
+            # 파일과 outbox에 기록했으므로 반응 기록/시행 목록은 세션에서 비움 (탭이 열려 있어도 메모리 반환)
+            session_memory.slim(st.session_state)
 
     # 저장된 결과 표시
-    if 'final_df' in st.session_state:
-        df = st.session_state.final_df
-
+    if st.session_state.data_saved:
         # 백업 결과 표시
         if 'backup_result' in st.session_state:
             backup_success, backup_msg = st.session_state.backup_result
             if backup_success:
-                st.info("📊 데이터가 자동으로 백업되었습니다.")
+                st.info("📊 데이터가 저장되었으며 자동으로 백업됩니다.")
             else:
                 st.warning(f"⚠️ Google Sheets 백업 실패: {backup_msg}")
 
@@ -1532,138 +1161,37 @@ if st.session_state.trial_num < len(st.session_state.exp_trials):
                       st.session_state.trial_num < len(st.session_state.exp_trials) and
                       completed_block not in st.session_state.breaks_shown)  # 아직 안 보여준 블록만
 
-    # 블록 시작 시 휴식 화면 표시
-    if is_block_start and not st.session_state.showing_break:
+    # 블록 시작 시 휴식 화면 표시 (카운트다운/N 키는 브라우저에서 처리, 종료 시 1회 rerun)
+    if is_block_start:
+        rerun_metrics.set_phase("break")
+        show_event_bridge(IDLE_SCREEN)
         st.session_state.showing_break = True
-        st.session_state.break_start_time = time.time()
-        st.rerun()
-
-    # 휴식 화면 표시 중
-    if st.session_state.showing_break:
-        # 이전 trial의 반응 오버레이 제거
-        components.html('''
-        <script>
-        (function() {
-            const overlay = parent.document.getElementById('response-overlay');
-            if (overlay) overlay.remove();
-        })();
-        </script>
-        ''', height=0)
-        # break_start_time이 없으면 지금 시작
-        if st.session_state.break_start_time is None:
-            st.session_state.break_start_time = time.time()
-        elapsed_break = time.time() - st.session_state.break_start_time
-        remaining_min = int(max(0, BREAK_MIN - elapsed_break))
-        remaining_max = int(max(0, BREAK_MAX - elapsed_break))
-        can_continue = elapsed_break >= BREAK_MIN
-
-        # 최대 시간 초과 시 자동 진행
-        if elapsed_break >= BREAK_MAX:
-            new_breaks = st.session_state.breaks_shown.copy()
-            new_breaks.add(completed_block)
-            st.session_state.breaks_shown = new_breaks
-            st.session_state.showing_break = False
-            st.session_state.break_start_time = None
-            st.session_state.show_block_key_reminder = True  # 키 안내 화면 표시
-            st.rerun()
-
-        # 휴식 화면 UI (단순 버전)
-        if can_continue:
-            st.markdown(f'''
-            <style>
-            .n-key-button-break {{
-                display: inline-block;
-                background-color: #333;
-                border: 2px solid #666;
-                border-radius: 8px;
-                padding: 12px 32px;
-                font-size: 20px;
-                color: #ccc;
-                margin-bottom: 40px;
-            }}
-            .n-key-button-break span {{
-                color: white;
-                font-weight: bold;
-            }}
-            </style>
-            <div style="display: flex; flex-direction: column; align-items: center; justify-content: center;
-                        height: 70vh; color: white; text-align: center;">
-                <h1 style="font-size: 48px; margin-bottom: 40px;">블록 {completed_block}/{num_blocks} 완료!</h1>
-                <div class="n-key-button-break"><span>N</span> 키를 눌러 다음 블록 시작</div>
-                <p style="font-size: 20px; color: #666;">{remaining_max}초 후 자동 시작</p>
-            </div>
-            ''', unsafe_allow_html=True)
-        else:
-            st.markdown(f'''
-            <div style="display: flex; flex-direction: column; align-items: center; justify-content: center;
-                        height: 70vh; color: white; text-align: center;">
-                <h1 style="font-size: 48px; margin-bottom: 40px;">블록 {completed_block}/{num_blocks} 완료!</h1>
-                <p style="font-size: 28px; margin-bottom: 60px;">잠시 휴식하세요.</p>
-                <p style="font-size: 28px; color: #888;">{remaining_min}초 후에 시작할 수 있습니다</p>
-            </div>
-            ''', unsafe_allow_html=True)
-
-        # 숨겨진 버튼
-        st.markdown('''
-        <style>
-        div[data-testid="stButton"]:has(button[kind="primary"]) {
-            display: none !important;
-        }
-        </style>
-        ''', unsafe_allow_html=True)
+        break_result = break_timer(
+            block=completed_block,
+            num_blocks=num_blocks,
+            break_min_s=BREAK_MIN,
+            break_max_s=BREAK_MAX,
+            key=f"break_timer_{completed_block}",
+        )
 
-        if st.button("continue_break", key=f"continue_block_{completed_block}", type="primary"):
+        if break_result is not None and break_result.get('block') == completed_block:
+            st.session_state.break_log.append({
+                'block': completed_block,
+                'duration_sec': round(break_result['duration_sec'], 2),
+                'ended_by': break_result['ended_by'],
+            })
             new_breaks = st.session_state.breaks_shown.copy()
             new_breaks.add(completed_block)
             st.session_state.breaks_shown = new_breaks
             st.session_state.showing_break = False
-            st.session_state.break_start_time = None
             st.session_state.show_block_key_reminder = True  # 키 안내 화면 표시
             st.rerun()
 
-        # N 키 리스너 (자동 새로고침 제거)
-        components.html(f'''
-        <script>
-        (function() {{
-            const blockNum = {completed_block};
-            const canContinue = {'true' if can_continue else 'false'};
-
-            if (window.breakKeyHandlerInstalled !== blockNum) {{
-                window.breakKeyHandlerInstalled = blockNum;
-
-                function handleBreakKey(e) {{
-                    if ((e.key === 'n' || e.key === 'N' || e.code === 'KeyN') && canContinue) {{
-                        e.preventDefault();
-                        const btn = parent.document.querySelector('button[kind="primary"]');
-                        if (btn) {{
-                            btn.click();
-                            parent.document.removeEventListener('keydown', handleBreakKey);
-                            window.breakKeyHandlerInstalled = null;
-                        }}
-                    }}
-                }}
-
-                parent.document.addEventListener('keydown', handleBreakKey);
-            }}
-        }})();
-        </script>
-        ''', height=0)
-
-        # Streamlit 기반 자동 새로고침 (1초마다)
-        time.sleep(1)
-        st.rerun()
+        st.stop()
 
     # 블록 시작 전 키 안내 화면
     if st.session_state.show_block_key_reminder:
-        # 이전 trial의 반응 오버레이 제거
-        components.html('''
-        <script>
-        (function() {
-            const overlay = parent.document.getElementById('response-overlay');
-            if (overlay) overlay.remove();
-        })();
-        </script>
-        ''', height=0)
+        rerun_metrics.set_phase("block_key_reminder")
         st.markdown('''
         <style>
         .n-key-button-block {
@@ -1707,325 +1235,39 @@ if st.session_state.trial_num < len(st.session_state.exp_trials):
         </style>
         ''', unsafe_allow_html=True)
 
-        if st.button("start_block", key="start_block_after_break", type="secondary"):
+        n_pressed = show_event_bridge(n_key_screen(f"block_start_{current_block}"))
+        if st.button("start_block", key="start_block_after_break", type="secondary") or n_pressed is not None:
             st.session_state.show_block_key_reminder = False
-            st.session_state.block_first_trial_num = st.session_state.trial_num
             st.rerun()
 
-        # N 키 리스너
-        components.html('''
-        <script>
-        (function() {
-            if (!window.blockKeyReminderHandlerInstalled) {
-                window.blockKeyReminderHandlerInstalled = true;
-
-                function handleKey(e) {
-                    if (e.key === 'n' || e.key === 'N' || e.code === 'KeyN') {
-                        e.preventDefault();
-                        const btn = parent.document.querySelector('button[kind="secondary"]');
-                        if (btn) {
-                            btn.click();
-                            parent.document.removeEventListener('keydown', handleKey);
-                            window.blockKeyReminderHandlerInstalled = false;
-                        }
-                    }
-                }
-
-                parent.document.addEventListener('keydown', handleKey);
-            }
-        })();
-        </script>
-        ''', height=0)
-        st.stop()
-
-    # ITI 표시 중인 경우 (단일 sleep으로 처리하여 rerun 최소화)
-    if st.session_state.showing_iti:
-        elapsed_iti = time.time() - st.session_state.iti_start_time
-        remaining = st.session_state.current_iti_duration - elapsed_iti
-
-        # timeout 피드백 표시 (필요 시)
-        if st.session_state.last_was_timeout:
-            st.markdown('''
-            <div style="position: fixed; top: 50px; left: 50%; transform: translateX(-50%);
-                        background-color: rgba(255, 165, 0, 0.2);
-                        border: 2px solid #FFA500;
-                        color: #FFA500;
-                        padding: 15px 30px;
-                        border-radius: 8px;
-                        font-size: 24px;
-                        font-weight: bold;
-                        z-index: 999;">
-                너무 느립니다
-            </div>
-            ''', unsafe_allow_html=True)
-
-        # 남은 ITI 시간만큼 한 번에 sleep (rerun 횟수 최소화)
-        if remaining > 0:
-            time.sleep(remaining)
-
-        # ITI 완료 → 다음 trial로
-        st.session_state.showing_iti = False
-        st.session_state.iti_start_time = None
-        st.session_state.last_was_timeout = False
-        st.rerun()
         st.stop()
 
-    trial = st.session_state.exp_trials.iloc[st.session_state.trial_num]
-
-    # 클라이언트 사이드 RT 읽기 (이전 시행에서 저장된 값)
-    client_rt = read_client_rt()
-    if client_rt is not None:
-        st.session_state.pending_client_rt = client_rt
+    # 블록 단위 시행: fixation/자극/timeout/ITI를 모두 브라우저에서 실행하고
+    # 블록이 끝나면 반응을 한 번에 받음 (블록당 서버 rerun 1회)
+    rerun_metrics.set_phase("block")
+    show_event_bridge(IDLE_SCREEN)
+    block_first_trial = st.session_state.trial_num
+    block_last_trial = min((completed_block + 1) * trials_per_block, len(st.session_state.exp_trials))
+    block_trials = st.session_state.exp_trials.records(block_first_trial, block_last_trial)
+    for block_trial in block_trials:
+        block_trial['iti_ms'] = int(round(block_trial['iti'] * 1000))
+
+    block_result = block_runner(
+        trials=block_trials,
+        block=current_block,
+        first_trial=block_first_trial,
+        fixation_ms=int(FIXATION_DURATION * 1000),
+        max_response_ms=int(MAX_RESPONSE_TIME * 1000),
+        key=f"block_runner_{current_block}",
+    )
+
+    # 이번 블록의 결과일 때만 기록 (이전 블록 값 재전송 방지)
+    if block_result is not None and block_result.get('first_trial') == block_first_trial:
+        record_block_responses(block_trials, block_result)
 
-    # 첫 시행 여부 (블록 내 첫 시행 - 각 블록 시작 시 fixation cross 표시)
-    is_first_trial = st.session_state.trial_num == st.session_state.block_first_trial_num
-
-    # Timeout 체크 (서버 사이드)
-    if st.session_state.start_time is not None:
-        elapsed = time.time() - st.session_state.start_time
-        timeout_offset = FIXATION_DURATION if is_first_trial else 0.3
-        if elapsed >= MAX_RESPONSE_TIME + timeout_offset:
-            # Timeout 발생
-            record_response(trial, "timeout", is_timeout=True)
-            st.stop()
-
-    # 첫 시행만 Fixation cross, 이후는 바로 자극 표시
-    color_hex_map = {'red': '#FF0000', 'green': '#00FF00'}
-
-    if is_first_trial:
-        # 첫 시행: Fixation + 자극 (기존 애니메이션)
-        # 검정 오버레이로 다른 요소 숨김 + fixation + stimulus
-        st.markdown(
-            f'''
-            <style>
-            .black-overlay {{
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100vw;
-                height: 100vh;
-                background-color: #000000;
-                z-index: 998;
-            }}
-            </style>
-            <div class="black-overlay"></div>
-            <div class="fixation-cross">+</div>
-            <div class="stimulus-container" style="opacity: 0;">
-                <h1 style="color:{color_hex_map[trial["letterColor"]]}; font-size:80px; font-weight:bold; text-align:center;">{trial["text"]}</h1>
-            </div>
-            ''',
-            unsafe_allow_html=True
-        )
-    else:
-        # 이후 시행: Fixation 없이 바로 자극
-        st.markdown(
-            f'''
-            <div class="stimulus-container-immediate">
-                <h1 style="color:{color_hex_map[trial["letterColor"]]}; font-size:80px; font-weight:bold; text-align:center;">{trial["text"]}</h1>
-            </div>
-            ''',
-            unsafe_allow_html=True
-        )
-
-    # 반응시간 측정 시작
-    if st.session_state.start_time is None:
-        st.session_state.start_time = time.time()
-
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    # 키보드 이벤트 리스너 (F, J) - 클라이언트 사이드 RT 측정 + Timeout
-    from streamlit.components.v1 import html
-    # 첫 시행은 fixation 500ms, 이후 시행은 300ms
-    stimulus_delay = 500 if is_first_trial else 300
-    html(f"""
-    <script>
-    (function() {{
-        const tryNum = {st.session_state.trial_num};
-        const MAX_RESPONSE_TIME = {int(MAX_RESPONSE_TIME * 1000)};  // ms
-        const STIMULUS_DELAY = {stimulus_delay};  // ms (첫 시행 500ms, 이후 300ms)
-
-        // 현재 trial 번호를 parent에 기록 (backup에서 trial 변경 감지용)
-        parent.window._stroopCurrentTrial = tryNum;
-
-        // 자극 표시 시점 기록 (첫 시행: fixation 0.5초 후, 이후: 0.3초 후)
-        window.stimulusShownTime = performance.now() + STIMULUS_DELAY;
-        console.log('Stimulus will be shown at:', window.stimulusShownTime, '(delay:', STIMULUS_DELAY, 'ms)');
-
-        // Timeout 플래그
-        window.stroopResponseMade = false;
-
-        // Remove ALL previous listeners and timers
-        if (window.stroopKeyHandler) {{
-            parent.document.removeEventListener('keydown', window.stroopKeyHandler);
-        }}
-        if (window.stroopTimeoutTimer) {{
-            clearTimeout(window.stroopTimeoutTimer);
-        }}
-
-        // 이전 반응 오버레이 제거
-        const prevOverlay = parent.document.getElementById('response-overlay');
-        if (prevOverlay) {{
-            prevOverlay.remove();
-        }}
-
-        // Timeout 핸들러 - 3초 후 자동으로 timeout 버튼 클릭
-        window.stroopTimeoutTimer = setTimeout(function() {{
-            if (!window.stroopResponseMade) {{
-                console.log('Timeout! No response within', MAX_RESPONSE_TIME, 'ms');
-                // Timeout으로 localStorage에 저장
-                localStorage.setItem('stroopClientRT', 'timeout');
-                // timeout 버튼 찾아서 클릭
-                const allButtons = parent.document.querySelectorAll('button');
-                allButtons.forEach((btn) => {{
-                    const text = btn.textContent || btn.innerText;
-                    if (text.includes('timeout')) {{
-                        btn.click();
-                    }}
-                }});
-            }}
-        }}, STIMULUS_DELAY + MAX_RESPONSE_TIME);
-
-        // Define new handler
-        window.stroopKeyHandler = function(event) {{
-            const code = event.code;  // Physical key code (KeyF, KeyJ)
-
-            // Use event.code to detect physical keys (works with Korean/English keyboard)
-            if (code !== 'KeyF' && code !== 'KeyJ') {{
-                return;
-            }}
-
-            // 이미 응답한 경우 무시 (빠른 더블 클릭 방지)
-            if (window.stroopResponseMade) {{
-                console.log('Response already made, ignoring key:', code);
-                return;
-            }}
-
-            event.preventDefault();
-            event.stopPropagation();
-
-            // 응답 완료 플래그
-            window.stroopResponseMade = true;
-            if (window.stroopTimeoutTimer) {{
-                clearTimeout(window.stroopTimeoutTimer);
-            }}
-
-            // 즉시 자극 숨기기 (검은 오버레이로 덮기)
-            let overlay = parent.document.getElementById('response-overlay');
-            if (!overlay) {{
-                overlay = parent.document.createElement('div');
-                overlay.id = 'response-overlay';
-                overlay.style.cssText = 'position:fixed;top:0;left:0;width:100vw;height:100vh;background:#000;z-index:9999;';
-                parent.document.body.appendChild(overlay);
-            }} else {{
-                overlay.style.display = 'block';
-                overlay.innerHTML = '';
-            }}
-            // 안전장치: 3초 후 overlay 자동 제거
-            setTimeout(() => {{
-                const ol = parent.document.getElementById('response-overlay');
-                if (ol) ol.remove();
-            }}, 3000);
-
-            // 클라이언트 사이드 RT 계산
-            const keyPressTime = performance.now();
-            const clientRT = Math.max(0, keyPressTime - window.stimulusShownTime);
-            console.log('Client RT:', clientRT.toFixed(2), 'ms');
-
-            // RT를 localStorage에 저장 (Python에서 읽기 위함)
-            localStorage.setItem('stroopClientRT', clientRT.toString());
-
-            // Find and click buttons (with retry and fallback to timeout)
-            function findAndClickButton(color, retryCount) {{
-                const allButtons = parent.document.querySelectorAll('button');
-                let redBtn = null, greenBtn = null, timeoutBtn = null;
-
-                allButtons.forEach((btn) => {{
-                    const text = btn.textContent || btn.innerText;
-                    if (text.includes('🔴') || text.includes('빨강')) redBtn = btn;
-                    if (text.includes('🟢') || text.includes('초록')) greenBtn = btn;
-                    if (text === 'timeout') timeoutBtn = btn;
-                }});
-
-                console.log('Buttons found - Red:', !!redBtn, 'Green:', !!greenBtn, 'Timeout:', !!timeoutBtn, 'Total:', allButtons.length);
-
-                let targetBtn = (color === 'red') ? redBtn : greenBtn;
-
-                if (targetBtn) {{
-                    console.log('Clicking', color, 'button');
-                    targetBtn.click();
-
-                    // Backup: trial이 안 바뀌면 timeout 버튼 클릭 (polling 방식)
-                    let _backupChecks = 0;
-                    const _backupInterval = setInterval(() => {{
-                        _backupChecks++;
-                        // trial 번호가 바뀌었으면 정상 전환된 것
-                        if (parent.window._stroopCurrentTrial !== tryNum) {{
-                            clearInterval(_backupInterval);
-                            return;
-                        }}
-                        // 버튼이 사라졌으면 ITI/휴식 화면으로 전환된 것
-                        const currentButtons = parent.document.querySelectorAll('button');
-                        const hasTrialButtons = [...currentButtons].some(btn => {{
-                            const text = btn.textContent || btn.innerText;
-                            return text.includes('빨강') || text.includes('초록');
-                        }});
-                        if (!hasTrialButtons) {{
-                            clearInterval(_backupInterval);
-                            return;
-                        }}
-                        // 2초(4회) 경과 후에도 같은 trial이면 클릭 실패 → timeout 클릭
-                        if (_backupChecks >= 4) {{
-                            clearInterval(_backupInterval);
-                            console.error('Button click did not trigger page change after 2s! Clicking timeout as backup.');
-                            const backupTimeoutBtn = [...currentButtons].find(btn => btn.textContent === 'timeout');
-                            if (backupTimeoutBtn) backupTimeoutBtn.click();
-                        }}
-                    }}, 500);
-                }} else if (retryCount < 3) {{
-                    console.log('Button not found, retrying... (attempt', retryCount + 1, ')');
-                    setTimeout(() => findAndClickButton(color, retryCount + 1), 100);
-                }} else {{
-                    // Fallback: 버튼 못 찾으면 timeout 버튼 클릭해서 다음으로 넘어감
-                    console.error('FAILED to find button after 3 retries! Clicking timeout as fallback.');
-                    if (timeoutBtn) {{
-                        timeoutBtn.click();
-                    }}
-                    // 서버 사이드 timeout이 처리하므로 reload 불필요
-                }}
-            }}
-
-            // Click the appropriate button based on physical key code
-            const color = (code === 'KeyF') ? 'red' : 'green';
-            findAndClickButton(color, 0);
-        }};
-
-        // Add the new listener
-        parent.document.addEventListener('keydown', window.stroopKeyHandler);
-        console.log('Keyboard handler installed for trial', tryNum, 'with timeout:', MAX_RESPONSE_TIME, 'ms');
-    }})();
-    </script>
-    """, height=0)
-
-    # 반응 버튼
-    col1, col2, col3 = st.columns([2, 2, 1])
-
-    with col1:
-        if st.button("🔴 빨강 (F)", key=f"red_{st.session_state.trial_num}", use_container_width=True, type="primary"):
-            client_rt = st.session_state.pending_client_rt
-            st.session_state.pending_client_rt = None
-            record_response(trial, "red", client_rt=client_rt)
-
-    with col2:
-        if st.button("🟢 초록 (J)", key=f"green_{st.session_state.trial_num}", use_container_width=True, type="primary"):
-            client_rt = st.session_state.pending_client_rt
-            st.session_state.pending_client_rt = None
-            record_response(trial, "green", client_rt=client_rt)
-
-    with col3:
-        # 숨겨진 timeout 버튼
-        if st.button("timeout", key=f"timeout_{st.session_state.trial_num}"):
-            record_response(trial, "timeout", is_timeout=True)
+    st.stop()
 
 else:
+    rerun_metrics.set_phase("complete")
     st.session_state.task_completed = True
     st.rerun()
@@ -0,0 +1,223 @@
+"""참가자별 요약 행 (wide format) 생성
+
+헤더(컬럼 순서)는 연습 시행 수별로 프로세스당 한 번만 계산하고,
+조건별 RT/정확도/SD는 bincount 한 번으로 구한 뒤 t{i}_* / p{i}_* 값은
+헤더의 해당 위치에 slice로 채운다.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from trimming import KEPT, REASONS, trim_codes
+
+CONDITIONS = ('positive', 'negative', 'neutral')
+CONDITION_CODES = {name: code for code, name in enumerate(CONDITIONS)}
+
+# 항상 144개 trial 컬럼 생성 (pilot 모드에서도 동일한 헤더 유지)
+FULL_TRIAL_COUNT = 144
+# 블록 사이 휴식 컬럼 수 (pilot 모드에서도 3개 유지)
+FULL_BREAK_COUNT = 3
+
+TRIAL_FIELDS = ('word', 'cond', 'color', 'resp', 'acc', 'rt')
+PRACTICE_FIELDS = ('word', 'color', 'resp', 'acc', 'rt')
+
+
+@lru_cache(maxsize=None)
+def summary_schema(n_practice):
+    """요약 행의 컬럼 목록과 구간 시작 위치
+
+    Args:
+        n_practice: 연습 시행 수 (p{i}_* 컬럼 수 결정)
+
+    Returns:
+        (columns, offsets) - columns는 pd.Index, offsets는 구간 이름 -> 시작 위치
+    """
+    columns = ['participant_id', 'date', 'timestamp_start', 'timestamp_end', 'total_duration_sec']
+    for condition in CONDITIONS:
+        columns += [f'rt_{condition}_mean', f'rt_{condition}_sd', f'acc_{condition}', f'n_{condition}']
+    columns += ['interference_negative', 'interference_positive',
+                'rt_overall_mean', 'acc_overall', 'n_total']
+
+    offsets = {'practice': len(columns)}
+    columns += [f'p{i}_{field}' for i in range(1, n_practice + 1) for field in PRACTICE_FIELDS]
+    columns += ['practice_acc', 'practice_rt_mean']
+
+    offsets['trials'] = len(columns)
+    columns += [f't{i}_{field}' for i in range(1, FULL_TRIAL_COUNT + 1) for field in TRIAL_FIELDS]
+
+    offsets['breaks'] = len(columns)
+    columns += [f'break{i}_sec' for i in range(1, FULL_BREAK_COUNT + 1)]
+
+    # trimming 적용 통계 (기존 컬럼 순서 유지를 위해 맨 뒤에 추가)
+    offsets['trim'] = len(columns)
+    columns += [f'rt_{condition}_mean_trim' for condition in CONDITIONS]
+    columns += ['interference_negative_trim', 'interference_positive_trim']
+    columns += [f'n_excluded_{reason}' for reason in REASONS[1:]]
+
+    return pd.Index(columns), offsets
+
+
+def _round(value):
+    return round(float(value), 4)
+
+
+def condition_stats(conditions, accuracy, rt):
+    """조건별 n, 정확도, 정답 시행 RT 평균/SD (한 번의 grouped pass)
+
+    Args:
+        conditions: 시행별 조건 이름 리스트
+        accuracy: 시행별 정확도 배열 (0/1)
+        rt: 시행별 RT 배열 (초)
+
+    Returns:
+        dict: n, acc, rt_mean, rt_sd 배열 (CONDITIONS 순서, 값이 없으면 nan)
+    """
+    code = np.fromiter((CONDITION_CODES[c] for c in conditions), dtype=np.intp, count=len(conditions))
+    k = len(CONDITIONS)
+    correct = accuracy == 1
+    correct_code = code[correct]
+    correct_rt = rt[correct]
+
+    n = np.bincount(code, minlength=k)
+    n_correct = np.bincount(correct_code, minlength=k)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        acc = np.bincount(code, weights=accuracy, minlength=k) / n
+        rt_mean = np.bincount(correct_code, weights=correct_rt, minlength=k) / n_correct
+        squares = np.bincount(correct_code, weights=(correct_rt - rt_mean[correct_code]) ** 2, minlength=k)
+        rt_sd = np.sqrt(squares / (n_correct - 1))
+    rt_sd[n_correct < 2] = np.nan
+    return {'n': n, 'acc': acc, 'rt_mean': rt_mean, 'rt_sd': rt_sd}
+
+
+def trimmed_stats(conditions, accuracy, rt):
+    """trimming 적용 후 조건별 평균 RT, 간섭 점수, 이유별 제외 시행 수 (trim 컬럼 순서)"""
+    code = np.fromiter((CONDITION_CODES[c] for c in conditions), dtype=np.intp, count=len(conditions))
+    reasons = trim_codes(code, rt, accuracy == 1, len(CONDITIONS))
+    kept = reasons == KEPT
+    n = np.bincount(code[kept], minlength=len(CONDITIONS))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(code[kept], weights=rt[kept], minlength=len(CONDITIONS)) / n
+    rt_means = {condition: _round(means[k]) if n[k] > 0 else None for k, condition in enumerate(CONDITIONS)}
+
+    values = [rt_means[condition] for condition in CONDITIONS]
+    for condition in ('negative', 'positive'):
+        if rt_means['neutral'] is not None and rt_means[condition] is not None:
+            values.append(round(rt_means[condition] - rt_means['neutral'], 4))
+        else:
+            values.append(None)
+    excluded = np.bincount(reasons[reasons >= 0], minlength=len(REASONS))
+    values += [int(count) for count in excluded[1:]]
+    return values
+
+
+def build_summary_row(participant_id, responses, practice_responses, start_time, end_time, break_log):
+    """참가자별 요약 데이터 생성 (한 행)
+
+    Args:
+        participant_id: 참가자 ID
+        responses: 본 시행 반응 기록 (make_response_data dict 리스트)
+        practice_responses: 연습 시행 반응 기록
+        start_time: 실험 시작 시각 (datetime 또는 None)
+        end_time: 종료 시각 (datetime)
+        break_log: 휴식 기록 [{'block', 'duration_sec', ...}]
+
+    Returns:
+        pd.DataFrame (한 행) 또는 반응이 없으면 None
+    """
+    if len(responses) == 0:
+        return None
+
+    columns, offsets = summary_schema(len(practice_responses))
+    values = [None] * len(columns)
+
+    # 기본 정보 (총 소요시간은 초 단위)
+    total_duration = (end_time - start_time).total_seconds() if start_time else None
+    values[0:5] = [
+        participant_id,
+        end_time.strftime("%Y-%m-%d"),
+        start_time.isoformat() if start_time else None,
+        end_time.isoformat(),
+        round(total_duration, 2) if total_duration else None,
+    ]
+
+    # Experimental 데이터: 시행별 값을 한 번에 열 단위로 꺼냄
+    words, conditions, colors, resps, accs, rts = zip(*(
+        (r['word'], r['condition'], r['color'], r['response'], r['accuracy'], r['rt']) for r in responses
+    ))
+    accuracy = np.asarray(accs, dtype=np.float64)
+    rt = np.asarray(rts, dtype=np.float64)
+
+    # 조건별 요약 통계 (정답 trial만 사용하여 RT 계산)
+    stats = condition_stats(conditions, accuracy, rt)
+    pos = 5
+    rt_means = {}
+    for k, condition in enumerate(CONDITIONS):
+        n = int(stats['n'][k])
+        rt_mean = _round(stats['rt_mean'][k]) if not np.isnan(stats['rt_mean'][k]) else None
+        rt_means[condition] = rt_mean
+        values[pos:pos + 4] = [
+            rt_mean,
+            _round(stats['rt_sd'][k]) if not np.isnan(stats['rt_sd'][k]) else None,
+            _round(stats['acc'][k]) if n > 0 else None,
+            n,
+        ]
+        pos += 4
+
+    # 간섭 점수 (negative/positive RT - neutral RT)
+    if rt_means['neutral'] and rt_means['negative']:
+        values[pos] = round(rt_means['negative'] - rt_means['neutral'], 4)
+    if rt_means['neutral'] and rt_means['positive']:
+        values[pos + 1] = round(rt_means['positive'] - rt_means['neutral'], 4)
+
+    # 전체 통계
+    correct = accuracy == 1
+    values[pos + 2:pos + 5] = [
+        _round(rt[correct].mean()) if correct.any() else None,
+        _round(accuracy.mean()),
+        len(responses),
+    ]
+
+    # Practice 원시 데이터 + 요약
+    start = offsets['practice']
+    n_practice = len(practice_responses)
+    if n_practice > 0:
+        p_words, p_colors, p_resps, p_accs, p_rts = zip(*(
+            (r['word'], r['color'], r['response'], r['accuracy'], r['rt']) for r in practice_responses
+        ))
+        block = start + n_practice * len(PRACTICE_FIELDS)
+        width = len(PRACTICE_FIELDS)
+        values[start + 0:block:width] = p_words
+        values[start + 1:block:width] = p_colors
+        values[start + 2:block:width] = p_resps
+        values[start + 3:block:width] = p_accs
+        values[start + 4:block:width] = np.round(np.asarray(p_rts, dtype=np.float64), 4).tolist()
+
+        p_accuracy = np.asarray(p_accs, dtype=np.float64)
+        p_correct = p_accuracy == 1
+        values[block] = _round(p_accuracy.mean())
+        values[block + 1] = _round(np.asarray(p_rts, dtype=np.float64)[p_correct].mean()) if p_correct.any() else None
+
+    # Experimental 원시 데이터 (trial별 컬럼, pilot 모드의 나머지 컬럼은 빈 값)
+    start = offsets['trials']
+    n_trials = min(len(responses), FULL_TRIAL_COUNT)
+    width = len(TRIAL_FIELDS)
+    block = start + n_trials * width
+    values[start + 0:block:width] = words[:n_trials]
+    values[start + 1:block:width] = [c[:3] for c in conditions[:n_trials]]  # pos/neg/neu
+    values[start + 2:block:width] = colors[:n_trials]
+    values[start + 3:block:width] = resps[:n_trials]
+    values[start + 4:block:width] = accs[:n_trials]
+    values[start + 5:block:width] = np.round(rt[:n_trials], 4).tolist()
+
+    # 블록 사이 휴식 시간
+    start = offsets['breaks']
+    break_durations = {b['block']: b['duration_sec'] for b in break_log}
+    values[start:start + FULL_BREAK_COUNT] = [break_durations.get(i) for i in range(1, FULL_BREAK_COUNT + 1)]
+
+    # trimming 후 조건별 평균 RT와 제외 시행 수 (trimming.py 기본 기준)
+    start = offsets['trim']
+    values[start:] = trimmed_stats(conditions, accuracy, rt)
+
+    # dtype=object: 컬럼별 dtype 추론(921개)을 건너뜀 - CSV/시트에 쓰는 값은 동일
+    return pd.DataFrame(np.array([values], dtype=object), columns=columns, dtype=object, copy=False)
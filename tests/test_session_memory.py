@@ -0,0 +1,75 @@
+"""session_memory 회수 테스트: rerun하지 않는 세션도 체크포인트 저장 후 비워지는지"""
+import json
+import time
+
+import pandas as pd
+from streamlit.runtime.state import SafeSessionState, SessionState
+
+import session_memory
+from session_memory import SessionReaper
+
+
+def _session_state(**values):
+    """스크립트 스레드 밖에서 쓰는 실제 Streamlit session_state"""
+    state = SafeSessionState(SessionState(), lambda: None)
+    defaults = {'task_started': True, 'task_completed': False, 'participant_id': 'P01',
+                'experiment_mode': 'full', 'practice_attempt': 1, 'practice_trial_num': 6, 'trial_num': 36,
+                'responses': [{'trial': i, 'response': 'red', 'rt': 0.6} for i in range(36)],
+                'practice_responses': [{'trial': i, 'response': 'green', 'rt': 0.7} for i in range(6)],
+                'practice_trials': [{'text': '단어', 'letterColor': 'red'}] * 6,
+                'exp_trials': pd.DataFrame({'text': ['단어'] * 144, 'letterColor': ['red'] * 144}),
+                'breaks_shown': {1}, 'break_log': [{'block': 1, 'duration_sec': 40.0}],
+                'block_runner_1': {'block': 1, 'responses': [{'trial_index': i} for i in range(36)]}}
+    for key, value in {**defaults, **values}.items():
+        state[key] = value
+    return state
+
+
+def _reaper(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)   # 체크포인트는 data/checkpoints/ (작업 폴더 기준)
+    reaper = SessionReaper(idle_timeout=60.0)
+    monkeypatch.setattr(reaper, 'start', lambda: None)   # reap()은 테스트에서 직접 호출
+    return reaper
+
+
+def test_idle_session_is_checkpointed_and_slimmed_without_rerun(monkeypatch, tmp_path):
+    reaper = _reaper(monkeypatch, tmp_path)
+    state = _session_state()
+    reaper.touch('abandoned', state)
+    size_before = sum(session_memory.state_breakdown(state).values())
+
+    # 그 세션은 다시 rerun하지 않음 (touch 없음)
+    assert reaper.reap(now=time.monotonic() + 61) == 1
+
+    checkpoints = list((tmp_path / session_memory.CHECKPOINT_DIR).glob('P01_*_checkpoint.json'))
+    assert len(checkpoints) == 1
+    assert (tmp_path / state['session_evicted']) == checkpoints[0]
+    saved = json.loads(checkpoints[0].read_text(encoding='utf-8'))
+    assert len(saved['responses']) == 36 and len(saved['practice_responses']) == 6
+
+    assert state['responses'] == [] and state['practice_responses'] == []
+    assert state['exp_trials'] is None and state['practice_trials'] is None
+    assert 'block_runner_1' not in state
+    assert sum(session_memory.state_breakdown(state).values()) < size_before / 10
+    assert reaper.stats() == {'sessions': 0, 'state_bytes': 0, 'evicted': 1, 'checkpoints': 1}
+
+
+def test_active_session_is_not_reaped(monkeypatch, tmp_path):
+    reaper = _reaper(monkeypatch, tmp_path)
+    state = _session_state()
+    reaper.touch('active', state)
+
+    assert reaper.reap(now=time.monotonic() + 30) == 0
+    assert 'session_evicted' not in state and len(state['responses']) == 36
+    assert not (tmp_path / session_memory.CHECKPOINT_DIR).exists()
+
+
+def test_completed_session_is_dropped_without_checkpoint(monkeypatch, tmp_path):
+    reaper = _reaper(monkeypatch, tmp_path)
+    state = _session_state(task_completed=True)
+    reaper.touch('done', state)
+
+    assert reaper.reap(now=time.monotonic() + 61) == 0
+    assert 'session_evicted' not in state
+    assert not (tmp_path / session_memory.CHECKPOINT_DIR).exists()
+    assert reaper.stats()['sessions'] == 0
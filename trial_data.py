@@ -0,0 +1,145 @@
+"""시행 단위(long format) 데이터 저장/로드
+
+요약 CSV(참가자당 한 행, t{i}_* 컬럼)와 별도로, 시행마다 한 행인 표를 Parquet으로 저장한다.
+condition/color/response/phase는 categorical dtype이라 분석 스크립트가 CSV를 읽고
+melt할 필요 없이 바로 읽을 수 있다.
+"""
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Parquet 저장용 (없으면 long format 저장만 건너뜀)
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+TRIAL_COLUMNS = [
+    'participant_id', 'phase', 'block', 'trial', 'word', 'condition', 'color',
+    'response', 'accuracy', 'rt', 'rt_source', 'timestamp', 'iti_planned', 'iti_actual',
+]
+
+# categorical 값 목록 (파일마다 같은 category 순서 유지)
+CATEGORIES = {
+    'phase': ['practice', 'experimental'],
+    'condition': ['positive', 'negative', 'neutral', 'practice'],
+    'color': ['red', 'green'],
+    'response': ['red', 'green', 'timeout'],
+    'rt_source': ['client', 'server', 'timeout', 'server_timeout'],
+}
+
+# 요약 CSV의 t{i}_cond 약어 -> 조건 이름
+CONDITION_ABBREVIATIONS = {'pos': 'positive', 'neg': 'negative', 'neu': 'neutral'}
+
+
+def _apply_dtypes(df):
+    for column, categories in CATEGORIES.items():
+        df[column] = pd.Categorical(df[column], categories=categories)
+    df['block'] = df['block'].astype('Int8')
+    df['trial'] = df['trial'].astype('Int16')
+    df['accuracy'] = df['accuracy'].astype('Int8')
+    for column in ('rt', 'iti_planned', 'iti_actual'):
+        df[column] = df[column].astype(np.float64)
+    return df
+
+
+def build_trial_table(responses, practice_responses):
+    """연습 + 본 시행 반응 기록을 시행당 한 행인 DataFrame으로
+
+    Args:
+        responses: 본 시행 반응 기록 (make_response_data dict 리스트)
+        practice_responses: 연습 시행 반응 기록
+
+    Returns:
+        pd.DataFrame (TRIAL_COLUMNS 순서, categorical dtype 적용)
+    """
+    rows = list(practice_responses) + list(responses)
+    data = {column: [r.get(column) for r in rows] for column in TRIAL_COLUMNS}
+    return _apply_dtypes(pd.DataFrame(data, columns=TRIAL_COLUMNS))
+
+
+def write_trial_table(df, path):
+    """시행 표를 Parquet으로 저장 (pyarrow가 없으면 None)"""
+    if not PARQUET_AVAILABLE:
+        return None
+    path = Path(path)
+    df.to_parquet(path, index=False, compression='zstd')
+    return path
+
+
+def save_session(output_dir, participant_id, summary_df, responses, practice_responses, saved_at=None):
+    """참가자 한 명의 결과 파일 저장 (요약 CSV + 같은 이름의 _trials.parquet)
+
+    Args:
+        output_dir: 저장 폴더 (없으면 생성)
+        participant_id: 참가자 ID (파일명 앞부분)
+        summary_df: 요약 행 DataFrame (summary.build_summary_row)
+        responses: 본 시행 반응 기록
+        practice_responses: 연습 시행 반응 기록
+        saved_at: 파일명에 넣을 시각 (기본: 지금)
+
+    Returns:
+        요약 CSV 경로 (participant_id_YYYYmmdd_HHMMSS.csv)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = (saved_at or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    filename = output_dir / f"{participant_id}_{timestamp}.csv"
+    summary_df.to_csv(filename, index=False, encoding='utf-8-sig')
+
+    # 시행 단위 long format (분석용)
+    trial_df = build_trial_table(responses, practice_responses)
+    write_trial_table(trial_df, filename.with_name(f"{filename.stem}_trials.parquet"))
+    return filename
+
+
+def load_trial_data(directory="data/responses"):
+    """directory 안의 모든 *_trials.parquet를 하나의 DataFrame으로 (pyarrow 필요)"""
+    if not PARQUET_AVAILABLE:
+        raise ImportError("시행 데이터를 읽으려면 pyarrow가 필요합니다: pip install pyarrow")
+    paths = sorted(Path(directory).glob("*_trials.parquet"))
+    if not paths:
+        return _apply_dtypes(pd.DataFrame(columns=TRIAL_COLUMNS))
+    # 파일별 read_parquet + concat 대신 pyarrow로 한 번에 읽음 (categorical dtype 유지)
+    return pq.read_table([str(p) for p in paths]).to_pandas()
+
+
+def summary_to_trials(summary_df, trials_per_block=36):
+    """요약 CSV(wide)를 본 시행 long format으로 변환 (Parquet 이전에 저장된 데이터용)
+
+    요약 행에는 rt_source/timestamp/ITI가 없으므로 해당 컬럼은 빈 값.
+
+    Args:
+        summary_df: 요약 행 DataFrame (여러 참가자 가능)
+        trials_per_block: 블록당 시행 수 (block 번호 계산용, full = 36)
+    """
+    word = summary_df.filter(regex=r'^t\d+_word$')
+    n_trials = word.shape[1]
+    n_participants = len(summary_df)
+
+    def field(name):
+        return summary_df[[f't{i}_{name}' for i in range(1, n_trials + 1)]].to_numpy().ravel()
+
+    trial = np.tile(np.arange(1, n_trials + 1), n_participants)
+    df = pd.DataFrame({
+        'participant_id': np.repeat(summary_df['participant_id'].to_numpy(), n_trials),
+        'phase': 'experimental',
+        'block': (trial - 1) // trials_per_block + 1,
+        'trial': trial,
+        'word': field('word'),
+        'condition': pd.Series(field('cond')).map(CONDITION_ABBREVIATIONS),
+        'color': field('color'),
+        'response': field('resp'),
+        'accuracy': field('acc'),
+        'rt': field('rt'),
+        'rt_source': None,
+        'timestamp': None,
+        'iti_planned': np.nan,
+        'iti_actual': np.nan,
+    }, columns=TRIAL_COLUMNS)
+    # pilot 모드의 빈 시행 컬럼 제거
+    df = df[df['word'].notna()].reset_index(drop=True)
+    return _apply_dtypes(df)
@@ -0,0 +1,99 @@
+"""세션별 시행 계획 (배열 기반)
+
+시행 목록을 세션마다 pandas DataFrame으로 들고 있지 않고, 시행마다
+단어 인덱스 / 조건 코드 / 색 코드 / ITI 만 작은 numpy 배열로 저장한다.
+단어 문자열은 프로세스 전체가 공유하는 stimulus_store의 word_table을 참조한다.
+
+plan[i]는 기존 DataFrame 행처럼 trial['text'], trial.get('corrAns') 로 읽을 수 있는
+Trial 레코드를 돌려준다.
+"""
+import numpy as np
+
+CONDITIONS = ('positive', 'negative', 'neutral', 'practice')
+COLORS = ('red', 'green')
+
+CONDITION_CODES = {name: code for code, name in enumerate(CONDITIONS)}
+COLOR_CODES = {name: code for code, name in enumerate(COLORS)}
+
+
+class Trial:
+    """시행 하나 (DataFrame 행과 같은 키로 접근 가능)"""
+
+    __slots__ = ('text', 'letterColor', 'corrAns', 'condition', 'iti')
+
+    def __init__(self, text, letterColor, condition, iti=None):
+        self.text = text
+        self.letterColor = letterColor
+        self.corrAns = letterColor  # 정답 = 글자 색
+        self.condition = condition
+        self.iti = iti
+
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except (AttributeError, TypeError):
+            raise KeyError(name) from None
+
+    def get(self, name, default=None):
+        value = getattr(self, name, None) if isinstance(name, str) else None
+        return default if value is None else value
+
+    def to_dict(self):
+        """컴포넌트로 넘길 dict (iti가 없으면 생략)"""
+        record = {
+            'text': self.text,
+            'letterColor': self.letterColor,
+            'corrAns': self.corrAns,
+            'condition': self.condition,
+        }
+        if self.iti is not None:
+            record['iti'] = self.iti
+        return record
+
+
+class TrialPlan:
+    """시행 목록 (병렬 배열)
+
+    Args:
+        word_table: 단어 문자열 표 (stimulus_store의 StimulusSet.word_table, 세션 간 공유)
+        word_idx: 시행별 word_table 인덱스
+        condition: 시행별 조건 이름 (CONDITIONS 중 하나)
+        color: 시행별 글자 색 ('red' / 'green')
+        iti: 시행별 ITI (초), 연습 시행처럼 ITI가 없으면 None
+    """
+
+    __slots__ = ('word_table', 'word_idx', 'condition_code', 'color_code', 'iti')
+
+    def __init__(self, word_table, word_idx, condition, color, iti=None):
+        self.word_table = word_table
+        self.word_idx = np.asarray(word_idx, dtype=np.int16)
+        self.condition_code = np.fromiter((CONDITION_CODES[c] for c in condition), dtype=np.int8)
+        self.color_code = np.fromiter((COLOR_CODES[c] for c in color), dtype=np.int8)
+        self.iti = None if iti is None else np.asarray(iti, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.word_idx)
+
+    def __getitem__(self, i):
+        return Trial(
+            self.word_table[self.word_idx[i]],
+            COLORS[self.color_code[i]],
+            CONDITIONS[self.condition_code[i]],
+            None if self.iti is None else float(self.iti[i]),
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def records(self, start=0, stop=None):
+        """start~stop 시행을 dict 리스트로 (블록 러너 컴포넌트 인자용)"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self[i].to_dict() for i in range(start, stop)]
+
+    def nbytes(self):
+        """세션이 따로 들고 있는 배열 크기 (공유 word_table 제외)"""
+        size = self.word_idx.nbytes + self.condition_code.nbytes + self.color_code.nbytes
+        if self.iti is not None:
+            size += self.iti.nbytes
+        return size
@@ -0,0 +1,144 @@
+"""RT trimming / outlier 제외
+
+정답 시행 RT 평균을 내기 전에 적용하는 시행 제외 규칙 (순서대로 적용):
+
+1. error: 오답/timeout
+2. too_fast / too_slow: 절대 기준 (예상 반응, 최대 응답 시간 근처의 lapse)
+3. sd_outlier: 참가자 × 조건별 평균에서 sd_cutoff × SD 이상 벗어난 시행 (2번을 통과한 시행 기준)
+4. min_trials: 남은 시행이 min_trials 미만인 참가자 × 조건 칸은 전부 제외
+
+모든 단계는 (참가자 × 조건) 그룹 코드에 대한 bincount로 한 번에 계산하므로
+세션 한 명(summary)과 통합 데이터셋 전체(batch)에 같은 함수를 쓴다.
+
+사용법:
+    python trimming.py                          # 통합 데이터셋 제외 현황
+    python trimming.py --min-rt 0.25 --sd 3
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from analysis import CONDITIONS, load_trials, trial_arrays
+
+# ========== 기본 기준 ==========
+MIN_RT = 0.2       # 이보다 빠른 반응은 예상 반응 (초)
+MAX_RT = 2.5       # 이보다 느린 반응은 lapse (초, 최대 응답 시간 3초)
+SD_CUTOFF = 2.5    # 참가자 × 조건별 평균 ± 2.5 SD
+MIN_TRIALS = 5     # 참가자 × 조건별 최소 남은 시행 수 (pilot 조건당 10시행 고려)
+
+# 제외 이유 코드 (0 = 사용)
+REASONS = ('kept', 'error', 'too_fast', 'too_slow', 'sd_outlier', 'min_trials')
+KEPT, ERROR, TOO_FAST, TOO_SLOW, SD_OUTLIER, FEW_TRIALS = range(len(REASONS))
+
+
+def trim_codes(group, rt, correct, n_groups, min_rt=MIN_RT, max_rt=MAX_RT,
+               sd_cutoff=SD_CUTOFF, min_trials=MIN_TRIALS):
+    """시행별 제외 이유 코드 (배열 버전)
+
+    Args:
+        group: 시행별 그룹 코드 (참가자 × 조건, 0 ~ n_groups-1, 대상이 아니면 -1)
+        rt: 시행별 RT 배열 (초)
+        correct: 시행별 정답 여부 bool 배열
+        n_groups: 그룹 수
+        min_rt, max_rt: 절대 기준 (None이면 적용 안 함)
+        sd_cutoff: SD 기준 (None이면 적용 안 함)
+        min_trials: 최소 남은 시행 수 (None이면 적용 안 함)
+
+    Returns:
+        int8 배열 (REASONS 인덱스), group이 -1인 시행은 -1
+    """
+    group = np.asarray(group, dtype=np.intp)
+    rt = np.asarray(rt, dtype=np.float64)
+    codes = np.full(len(rt), KEPT, dtype=np.int8)
+    codes[~np.asarray(correct, dtype=bool) | np.isnan(rt)] = ERROR
+    if min_rt is not None:
+        codes[(codes == KEPT) & (rt < min_rt)] = TOO_FAST
+    if max_rt is not None:
+        codes[(codes == KEPT) & (rt > max_rt)] = TOO_SLOW
+    codes[group < 0] = -1
+
+    if sd_cutoff is not None:
+        kept = codes == KEPT
+        g, x = group[kept], rt[kept]
+        n = np.bincount(g, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(g, weights=x, minlength=n_groups) / n
+            sd = np.sqrt(np.bincount(g, weights=(x - mean[g]) ** 2, minlength=n_groups) / (n - 1))
+        # SD를 구할 수 없는 그룹(시행 2개 미만)은 SD 기준 적용 안 함
+        limit = np.where(np.isnan(sd), np.inf, sd_cutoff * sd)
+        outlier = np.zeros(len(rt), dtype=bool)
+        outlier[kept] = np.abs(x - mean[g]) > limit[g]
+        codes[outlier] = SD_OUTLIER
+
+    if min_trials is not None:
+        kept = codes == KEPT
+        remaining = np.bincount(group[kept], minlength=n_groups)
+        too_few = np.zeros(len(rt), dtype=bool)
+        too_few[kept] = remaining[group[kept]] < min_trials
+        codes[too_few] = FEW_TRIALS
+    return codes
+
+
+def trim_trials(trials, **criteria):
+    """시행 단위 DataFrame에 trimming 적용
+
+    본 시행(phase == 'experimental')의 정서 조건 시행만 대상이며, 나머지 시행의 reason은 NaN.
+
+    Args:
+        trials: 시행 단위 DataFrame (participant_id, condition, accuracy, rt, [phase])
+        **criteria: trim_codes의 min_rt, max_rt, sd_cutoff, min_trials
+
+    Returns:
+        pd.Series (trials와 같은 index, categorical reason) - 사용할 시행은 reason == 'kept'
+    """
+    participants, participant_code, condition_code, correct, rt = trial_arrays(trials)
+    k = len(CONDITIONS)
+    group = np.where(condition_code >= 0, participant_code * k + condition_code, -1)
+    if 'phase' in trials.columns:
+        group[(trials['phase'] != 'experimental').to_numpy()] = -1
+    codes = trim_codes(group, rt, correct, len(participants) * k, **criteria)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=list(REASONS)), index=trials.index, name='reason')
+
+
+def exclusion_report(reasons, by=None):
+    """제외 이유별 시행 수와 비율
+
+    Args:
+        reasons: trim_trials 결과
+        by: 묶어서 볼 Series (예: trials['condition']), None이면 전체
+
+    Returns:
+        pd.DataFrame (이유별 시행 수 + 비율 %)
+    """
+    reasons = reasons.dropna()
+    if by is None:
+        counts = reasons.value_counts().reindex(list(REASONS), fill_value=0).to_frame('trials')
+        counts['percent'] = counts['trials'] / max(len(reasons), 1) * 100
+        return counts
+    table = pd.crosstab(by.loc[reasons.index], reasons).reindex(columns=list(REASONS), fill_value=0)
+    table['excluded_percent'] = (1 - table['kept'] / table.sum(axis=1)) * 100
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--combined', default='data/combined', help='aggregate.py 통합 데이터셋 폴더')
+    parser.add_argument('--responses', default='data/responses', help='참가자별 저장 폴더')
+    parser.add_argument('--min-rt', type=float, default=MIN_RT)
+    parser.add_argument('--max-rt', type=float, default=MAX_RT)
+    parser.add_argument('--sd', type=float, default=SD_CUTOFF)
+    parser.add_argument('--min-trials', type=int, default=MIN_TRIALS)
+    args = parser.parse_args()
+
+    trials = load_trials(args.combined, args.responses)
+    reasons = trim_trials(trials, min_rt=args.min_rt, max_rt=args.max_rt,
+                          sd_cutoff=args.sd, min_trials=args.min_trials)
+    print(f"participants: {trials['participant_id'].nunique()}, trials: {reasons.notna().sum()}")
+    print(exclusion_report(reasons).round(2))
+    print()
+    print(exclusion_report(reasons, by=trials['condition'].astype(str)).round(2))
+
+
+if __name__ == '__main__':
+    main()